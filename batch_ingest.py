@@ -0,0 +1,194 @@
+import argparse
+import os
+import tarfile
+import zipfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from cv_pipeline import EMPLOYEE_COLUMNS, parse_cv_text
+from identity import IdentityIndex
+from pdf_cache import extract_pdf_text
+
+# Nombre de CV d'archive en cours par processus (borne la mémoire des contenus transmis au pool)
+_ARCHIVE_TASKS_PER_WORKER = 4
+
+# Schéma colonnaire des lignes employés (mêmes 16 colonnes que extend.main)
+EMPLOYEE_SCHEMA = pa.schema(
+    [pa.field("ID", pa.int64()), pa.field("Nom", pa.string()), pa.field("Prénom", pa.string()),
+     pa.field("Âge", pa.int64())]
+    + [pa.field(column, pa.string()) for column in EMPLOYEE_COLUMNS[4:]]
+)
+
+
+# Fonction pour lister les CV PDF d'un répertoire ou d'une archive (zip/tar)
+def list_cv_sources(source):
+    if os.path.isdir(source):
+        tasks = []
+        for root, _, files in os.walk(source):
+            for name in files:
+                if name.lower().endswith(".pdf"):
+                    tasks.append((None, os.path.join(root, name)))
+        return sorted(tasks)
+    if zipfile.is_zipfile(source):
+        with zipfile.ZipFile(source) as archive:
+            return [(source, name) for name in sorted(archive.namelist()) if name.lower().endswith(".pdf")]
+    if tarfile.is_tarfile(source):
+        with tarfile.open(source) as archive:
+            return [(source, member.name) for member in sorted(archive.getmembers(), key=lambda m: m.name)
+                    if member.isfile() and member.name.lower().endswith(".pdf")]
+    raise ValueError(f"Source non supportée (répertoire, zip ou tar attendu) : {source}")
+
+
+# Fonction pour lire les CV d'une archive en un seul passage : (nom, contenu) ; un tar (même compressé)
+# est lu en flux dans l'ordre de l'archive : chaque membre n'est décompressé qu'une fois
+def iter_archive_cvs(archive_path):
+    if zipfile.is_zipfile(archive_path):
+        with zipfile.ZipFile(archive_path) as archive:
+            for name in sorted(archive.namelist()):
+                if name.lower().endswith(".pdf"):
+                    yield name, archive.read(name)
+        return
+    with tarfile.open(archive_path, "r|*") as archive:
+        for member in archive:
+            if member.isfile() and member.name.lower().endswith(".pdf"):
+                yield member.name, archive.extractfile(member).read()
+
+
+# Résultats dans l'ordre des tâches, avec au plus window tâches soumises à la fois
+def _bounded_map(executor, function, tasks, window):
+    pending = deque()
+    for task in tasks:
+        pending.append(executor.submit(function, task))
+        if len(pending) >= window:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+# Résultats remis dans l'ordre trié des noms (un tar est lu dans l'ordre de l'archive) : seules les lignes
+# arrivées en avance sont gardées en mémoire, pas le contenu des PDF
+def _in_order(results, names):
+    waiting = {}
+    position = 0
+    for result in results:
+        waiting.setdefault(result[0], deque()).append(result)
+        while position < len(names) and waiting.get(names[position]):
+            yield waiting[names[position]].popleft()
+            position += 1
+
+
+# Traitement d'un CV dans un processus du pool : tâche (nom, contenu) ou (chemin, None) ;
+# renvoie (nom du fichier, ligne, erreur)
+def process_cv(task):
+    name, content = task
+    try:
+        if content is None:
+            with open(name, "rb") as f:
+                content = f.read()
+        cv_text = extract_pdf_text(content)
+        if not cv_text.strip():
+            raise ValueError("aucun texte extrait du PDF")
+        return name, parse_cv_text(cv_text), None
+    except Exception as e:
+        return name, None, f"{type(e).__name__}: {e}"
+
+
+# Conversion d'une ligne au schéma colonnaire (l'âge vide devient nul)
+def _to_record(row):
+    record = {column: row.get(column, "") for column in EMPLOYEE_COLUMNS}
+    record["Âge"] = row["Âge"] if isinstance(row["Âge"], int) else None
+    return record
+
+
+# Écriture en flux des lignes vers un fichier Parquet ou Arrow IPC
+class _TableWriter:
+    def __init__(self, output):
+        self.output = output
+        if output.lower().endswith((".arrow", ".feather", ".ipc")):
+            self._sink = pa.OSFile(output, "wb")
+            self._writer = pa.ipc.new_file(self._sink, EMPLOYEE_SCHEMA)
+        else:
+            self._sink = None
+            self._writer = pq.ParquetWriter(output, EMPLOYEE_SCHEMA)
+
+    def write(self, records):
+        if records:
+            self._writer.write_table(pa.Table.from_pylist(records, schema=EMPLOYEE_SCHEMA))
+
+    def close(self):
+        self._writer.close()
+        if self._sink is not None:
+            self._sink.close()
+
+
+def ingest_cvs(source, output, workers=None, batch_size=256, progress=None):
+    """
+    Transforme en lot les CV PDF d'un répertoire ou d'une archive en table employés colonnaire.
+    Les CV sont traités dans un pool de processus (une archive est lue une seule fois par le processus
+    principal, qui transmet le contenu des CV au pool) ; les lignes sont écrites par lots au fur et à
+    mesure et les échecs sont collectés sans interrompre le lot. Chaque personne reçoit un
+    identifiant stable (index des identités) ; le CV d'une personne déjà lue avec le même contenu est ignoré.
+    Retourne un dictionnaire {"rows": nombre de lignes écrites, "duplicates": nombre de CV en double,
+    "failures": [(fichier, erreur)]}.
+    """
+    sources = list_cv_sources(source)
+    workers = workers or os.cpu_count() or 1
+    chunksize = max(1, min(16, len(sources) // (workers * 4) or 1))
+
+    identities = IdentityIndex()
+    failures = []
+    written = 0
+    duplicates = 0
+    batch = []
+    writer = _TableWriter(output)
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            if os.path.isdir(source):
+                results = executor.map(process_cv, [(path, None) for _, path in sources], chunksize=chunksize)
+            else:
+                results = _in_order(_bounded_map(executor, process_cv, iter_archive_cvs(source),
+                                                 workers * _ARCHIVE_TASKS_PER_WORKER), [name for _, name in sources])
+            for done, (name, row, error) in enumerate(results, 1):
+                if error is not None:
+                    failures.append((name, error))
+                else:
+                    rows, report = identities.merge_rows(pd.DataFrame([row], columns=EMPLOYEE_COLUMNS))
+                    if report.duplicates:
+                        duplicates += 1
+                    else:
+                        batch.append(_to_record(dict(row, ID=int(rows['ID'].iloc[0]), Nom=rows['Nom'].iloc[0])))
+                if len(batch) >= batch_size:
+                    writer.write(batch)
+                    written += len(batch)
+                    batch = []
+                if progress is not None:
+                    progress(done, len(sources))
+        writer.write(batch)
+        written += len(batch)
+    finally:
+        writer.close()
+    return {"rows": written, "duplicates": duplicates, "failures": failures}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ingestion en lot de CV PDF vers une table employés Parquet/Arrow.")
+    parser.add_argument("source", help="Répertoire ou archive (zip/tar) contenant les CV PDF")
+    parser.add_argument("-o", "--output", default="employees.parquet", help="Fichier de sortie (.parquet ou .arrow)")
+    parser.add_argument("-w", "--workers", type=int, default=None, help="Nombre de processus (par défaut : nombre de cœurs)")
+    parser.add_argument("--batch-size", type=int, default=256, help="Nombre de lignes par lot écrit")
+    args = parser.parse_args()
+
+    result = ingest_cvs(args.source, args.output, workers=args.workers, batch_size=args.batch_size)
+    print(f"{result['rows']} ligne(s) écrite(s) dans {args.output}")
+    if result["duplicates"]:
+        print(f"{result['duplicates']} CV en double ignoré(s)")
+    for name, error in result["failures"]:
+        print(f"Échec : {name} : {error}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,204 @@
+import argparse
+import gc
+import json
+import math
+import platform
+import statistics
+import sys
+import time
+from datetime import datetime, timezone
+
+import pandas as pd
+
+from cv_pipeline import clean_sections, parse_cv_text, segment_text_into_sections
+from keyword_index import EmployeeKeywordIndex
+from pdf_cache import extract_pdf_text_uncached, iter_pdf_pages
+from project_analysis import REQUIRED_SKILLS_SECTION, scan_key_information, score_employees
+from ratings import RatingsStore
+from recommendation_core import DEFAULT_WEIGHTS, ActivityRecommender
+from similarity import SimilarityEngine
+from synthetic_data import generate_cv_pdf, generate_employees, generate_project_pdf
+
+# Tailles des tables d'employés mesurées par défaut (100000 et 1000000 sur demande)
+DEFAULT_SIZES = [1000, 10000]
+
+# Écart relatif du temps au-delà duquel une mesure est signalée comme régression
+DEFAULT_THRESHOLD = 0.2
+
+
+# Durée minimale d'un échantillon : les appels courts sont répétés pour limiter le bruit de mesure
+MIN_SAMPLE_TIME = 0.05
+
+
+# Mesure d'une fonction (l'appel reçoit un compteur d'itérations) : un appel de chauffe qui calibre
+# le nombre d'appels par échantillon, puis repeat échantillons ; temps par appel en secondes
+def _measure(func, repeat, min_sample_time=MIN_SAMPLE_TIME):
+    start = time.perf_counter()
+    func(0)
+    warmup = time.perf_counter() - start
+    number = max(1, math.ceil(min_sample_time / warmup)) if warmup > 0 else 1
+
+    # Ramasse-miettes suspendu pendant les échantillons (comme timeit)
+    times = []
+    iteration = 1
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            for _ in range(number):
+                func(iteration)
+                iteration += 1
+            times.append((time.perf_counter() - start) / number)
+    finally:
+        if gc_enabled:
+            gc.enable()
+    return {"median_s": statistics.median(times), "min_s": min(times), "repeat": repeat, "number": number}
+
+
+def _result(benchmark, size, measure):
+    return dict(benchmark=benchmark, size=size, **measure,
+                rows_per_s=size / measure["median_s"] if measure["median_s"] > 0 else None)
+
+
+# Compétences requises d'une description de projet lue page par page
+def _required_skills(pdf):
+    return scan_key_information(iter_pdf_pages(pdf, "\n"), [REQUIRED_SKILLS_SECTION]).get(REQUIRED_SKILLS_SECTION, "")
+
+
+def run_benchmarks(sizes=DEFAULT_SIZES, repeat=5, documents=20, pages=3, seed=0, log=print):
+    """
+    Mesure les étapes des deux pipelines sur des données synthétiques reproductibles :
+    extraction des PDF, segmentation et nettoyage des CV, informations clés des projets (par document),
+    puis pour chaque taille de table : normalisation des ratings, similarité, recommandation
+    d'activités de bout en bout (CV -> activités) et recommend_employees (PDF de projet -> employés).
+    Retourne la liste des mesures (temps par appel médian et minimal en secondes, débit en lignes par seconde).
+    """
+    results = []
+
+    def record(benchmark, size, func):
+        result = _result(benchmark, size, _measure(func, repeat))
+        log(f"{benchmark:<32} {size:>9}  médiane {result['median_s'] * 1000:10.2f} ms")
+        results.append(result)
+
+    cvs = [generate_cv_pdf(index, pages, seed) for index in range(documents)]
+    projects = [generate_project_pdf(index, pages, seed) for index in range(documents)]
+    cv_texts = [extract_pdf_text_uncached(cv) for cv in cvs]
+
+    record("pdf.extraction", documents, lambda _: [extract_pdf_text_uncached(cv) for cv in cvs])
+    record("cv.segmentation", documents, lambda _: [clean_sections(segment_text_into_sections(text)[0])
+                                                    for text in cv_texts])
+    record("project.key_information", documents, lambda _: [_required_skills(pdf) for pdf in projects])
+
+    required = [_required_skills(pdf) for pdf in projects]
+    for size in sizes:
+        data = generate_employees(size, seed)
+        names = data["Nom"].drop_duplicates().to_numpy()
+
+        record("ratings.normalization", size, lambda _: RatingsStore.from_frame(data).to_frame())
+        record("similarity.build", size, lambda _: SimilarityEngine(data))
+        engine = SimilarityEngine(data)
+        # Une cible différente à chaque répétition (les similarités d'une cible sont mises en cache)
+        record("similarity.top_similar", size,
+               lambda iteration: engine.top_similar(names[iteration % len(names)], DEFAULT_WEIGHTS, 5))
+
+        recommender = ActivityRecommender(data)
+        record("recommend_activities.end_to_end", size,
+               lambda iteration: recommender.recommend(pd.DataFrame([parse_cv_text(cv_texts[iteration % documents])])))
+        record("recommender.build", size, lambda _: ActivityRecommender(data))
+
+        record("keyword_index.build", size, lambda _: EmployeeKeywordIndex(data))
+        index = EmployeeKeywordIndex(data)
+        record("recommend_employees", size,
+               lambda iteration: score_employees(data, required[iteration % documents], 5, index))
+        record("recommend_employees.end_to_end", size,
+               lambda iteration: score_employees(data, _required_skills(projects[iteration % documents]), 5, index))
+        del data, engine, recommender, index
+    return results
+
+
+# Fonction pour construire le rapport JSON d'une exécution
+def build_report(results, **parameters):
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "parameters": parameters,
+        "results": results
+    }
+
+
+def compare_reports(baseline, current, threshold=DEFAULT_THRESHOLD, statistic="min_s"):
+    """
+    Compare deux rapports mesure par mesure (même étape, même taille) sur le temps minimal
+    (le moins sensible au bruit) ou médian.
+    Statut : "régression" si le rapport actuel/référence dépasse 1 + threshold,
+    "amélioration" s'il est sous 1 / (1 + threshold), "stable" sinon.
+    """
+    reference = {(result["benchmark"], result["size"]): result for result in baseline["results"]}
+    rows = []
+    for result in current["results"]:
+        base = reference.get((result["benchmark"], result["size"]))
+        if base is None or base[statistic] <= 0:
+            continue
+        ratio = result[statistic] / base[statistic]
+        if ratio > 1 + threshold:
+            status = "régression"
+        elif ratio < 1 / (1 + threshold):
+            status = "amélioration"
+        else:
+            status = "stable"
+        rows.append({"benchmark": result["benchmark"], "size": result["size"], "baseline_s": base[statistic],
+                     "current_s": result[statistic], "ratio": ratio, "status": status})
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Banc d'essai reproductible des pipelines de recommandation.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    run_parser = subparsers.add_parser("run", help="Exécuter les mesures et écrire le rapport JSON")
+    run_parser.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES)),
+                            help="Tailles des tables d'employés, séparées par des virgules (ex. 1000,10000,100000,1000000)")
+    run_parser.add_argument("--repeat", type=int, default=5, help="Nombre d'échantillons par mesure")
+    run_parser.add_argument("--documents", type=int, default=20, help="Nombre de CV et de projets PDF générés")
+    run_parser.add_argument("--pages", type=int, default=3, help="Nombre de pages par PDF")
+    run_parser.add_argument("--seed", type=int, default=0)
+    run_parser.add_argument("-o", "--output", default=None, help="Fichier JSON du rapport (sinon sortie standard)")
+    compare_parser = subparsers.add_parser("compare", help="Comparer deux rapports et signaler les régressions")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                                help="Écart relatif toléré (0.2 = 20 %%)")
+    compare_parser.add_argument("--statistic", choices=["min_s", "median_s"], default="min_s",
+                                help="Temps comparé : minimal (par défaut) ou médian")
+    args = parser.parse_args()
+
+    if args.command == "run":
+        sizes = [int(size) for size in args.sizes.split(",") if size]
+        log = (lambda message: print(message, file=sys.stderr)) if args.output is None else print
+        results = run_benchmarks(sizes, args.repeat, args.documents, args.pages, args.seed, log)
+        report = build_report(results, sizes=sizes, repeat=args.repeat, documents=args.documents,
+                              pages=args.pages, seed=args.seed)
+        if args.output:
+            with open(args.output, "w", encoding="utf-8") as f:
+                json.dump(report, f, ensure_ascii=False, indent=1)
+            print(f"{len(results)} mesure(s) écrite(s) dans {args.output}")
+        else:
+            print(json.dumps(report, ensure_ascii=False, indent=1))
+        return
+
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)
+    with open(args.current, encoding="utf-8") as f:
+        current = json.load(f)
+    rows = compare_reports(baseline, current, args.threshold, args.statistic)
+    for row in rows:
+        print(f"{row['benchmark']:<32} {row['size']:>9}  {row['baseline_s'] * 1000:10.2f} ms -> "
+              f"{row['current_s'] * 1000:10.2f} ms  x{row['ratio']:.2f}  {row['status']}")
+    regressions = [row for row in rows if row["status"] == "régression"]
+    print(f"{len(rows)} mesure(s) comparée(s), {len(regressions)} régression(s)")
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,104 +1,58 @@
 import streamlit as st
 import pandas as pd
-import re
-import fitz  # PyMuPDF
 import os
-
-# Fonction pour extraire le texte d'un fichier PDF avec PyMuPDF en français
-def extract_text_from_pdf_with_pymupdf(pdf_path):
-    try:
-        text = ""
-        with fitz.open(pdf_path) as doc:
-            for page_num in range(len(doc)):
-                text += doc.load_page(page_num).get_text() + "\n"
-        return text
-    except Exception as e:
-        st.error(f"Erreur lors de l'extraction du texte du PDF avec PyMuPDF : {e}")
-        return ""
-
-# Fonction pour extraire les informations clés de la description du projet
-def extract_key_information(project_description):
-    key_information = {}
-    sections = [
-        ("Nom du projet", r"(?i)nom du projet[:\s]*(.*?)(?=objectifs|compétences|détails|$)"),
-        ("Objectifs", r"(?i)objectifs[:\s]*(.*?)(?=compétences|détails|$)"),
-        ("Compétences requises", r"(?i)compétences requises[:\s]*(.*?)(?=détails|$)"),
-        ("Détails supplémentaires", r"(?i)détails supplémentaires[:\s]*(.*?)(?=$)")
-    ]
-
-    for section, pattern in sections:
-        match = re.search(pattern, project_description, re.DOTALL)
-        if match:
-            key_information[section] = match.group(1).strip()
-
-    return key_information
-
-# Fonction pour charger les données employés
-def load_data(filepath):
-    """
-    Charge les données depuis un fichier Excel, CSV ou TSV en fonction de son extension.
-    Nettoie les valeurs manquantes.
-    """
-    file_extension = os.path.splitext(filepath)[1].lower()
-
-    if file_extension == '.csv':
-        data = pd.read_csv(filepath)
-    elif file_extension == '.tsv':
-        data = pd.read_csv(filepath, sep='\t')
-    elif file_extension == '.xlsx' or file_extension == '.xls':
-        data = pd.read_excel(filepath)
-    else:
-        raise ValueError(f"Format de fichier non supporté: {file_extension}")
-
-    # Suppression des lignes avec des valeurs manquantes
-    data = data.dropna()
-    return data
+from dataset_loader import dataset_signature, load_dataset_dir
+from instrumentation import PROFILING_ENABLED, active_profiler, merge_stages, profiled_run
+from job_queue import FAILED, JobQueueFull, ParseJobQueue
+from keyword_index import EmployeeKeywordIndex
+from project_analysis import REQUIRED_SKILLS_SECTION, extract_key_information, score_employees
+from project_batch import match_projects
+from vector_index import load_or_build_vector_index
+
+# Répertoire de classeurs employés, mis en cache par signature (noms, tailles, dates de modification)
+@st.cache_resource(show_spinner=False, max_entries=4)
+def read_directory(signature, directory):
+    return load_dataset_dir(directory)
+
+# File des analyses de PDF de projets (pool de processus partagé par toutes les sessions)
+@st.cache_resource(show_spinner=False)
+def parse_queue():
+    return ParseJobQueue()
+
+# Suivi des analyses en cours : seule la barre de progression est rafraîchie,
+# toute la page est réexécutée quand toutes les analyses sont terminées
+@st.fragment(run_every=0.5)
+def job_progress(job_ids, label):
+    jobs = [parse_queue().status(job_id) for job_id in job_ids]
+    if all(job is None or job.done for job in jobs):
+        st.rerun()
+    progress = sum(1.0 if job is None or job.done else job.progress for job in jobs) / len(jobs)
+    running = [job.stage or job.status for job in jobs if job is not None and not job.done]
+    st.progress(progress, text=f"{label} : {running[0] if len(jobs) == 1 else f'{len(running)} en cours'}")
+
+# Fonction pour récupérer les résultats des analyses terminées (None tant qu'une analyse est en cours)
+def collect_jobs(jobs_by_name, label):
+    jobs = {name: parse_queue().status(job_id) for name, job_id in jobs_by_name.items()}
+    if any(job is not None and not job.done for job in jobs.values()):
+        job_progress(tuple(jobs_by_name.values()), label)
+        return None
+    results = {}
+    for name, job in jobs.items():
+        if job is None:
+            st.error(f"{name} : analyse expirée, veuillez relancer l'analyse.")
+        elif job.status == FAILED:
+            st.error(f"Erreur lors de l'extraction du texte du PDF {name} : {job.error}")
+        else:
+            merge_stages(parse_queue().take_stages(job.id))
+            results[name] = job.result
+    return results
 
 # Fonction pour recommander des employés basés sur les compétences requises
-def recommend_employees(data, required_keywords, top_n=5):
-    required_keywords = [word.strip().lower() for word in required_keywords.split()]
-    employee_scores = []
-
-    # Pondérations des différentes catégories
-    weights = {
-        'skills': 3,
-        'activities': 2,
-        'education': 1,
-        'training': 1
-    }
-
-    for index, row in data.iterrows():
-        employee = row['Nom']
-        employee_characteristics = {
-            'skills': str(row['Compétence']).lower(),
-            'activities': str(row['Activity']).lower(),
-            'education': str(row['Institution']).lower(),
-            'training': str(row['Diplôme']).lower()
-        }
-
-        # Calcul du score de correspondance avec des critères supplémentaires
-        score = 0
-        keyword_count = len(required_keywords)
-
-        # Comparaison des mots-clés requis avec les caractéristiques de l'employé
-        for keyword in required_keywords:
-            for category, characteristics in employee_characteristics.items():
-                if keyword in characteristics:
-                    # Augmenter le score selon la pondération de la catégorie
-                    score += weights[category]
-
-        # Ajuster le score pour la correspondance des technologies (technologies spécifiques ont plus de poids)
-        tech_keywords = ['python', 'java', 'c++', 'sql', 'machine learning', 'django']
-        tech_score = sum(weights['skills'] for tech in tech_keywords if tech in employee_characteristics['skills'])
-        score += tech_score
-
-        # Normaliser le score pour éviter des scores trop élevés ou négatifs
-        normalized_score = max(score / max(keyword_count, 1), 0)
-
-        employee_scores.append((employee, normalized_score, row))
-
-    # Trier les employés par score décroissant
-    employee_scores = sorted(employee_scores, key=lambda x: x[1], reverse=True)[:top_n]
+def recommend_employees(data, required_keywords, top_n=5, index=None, vector_index=None):
+    employee_scores = [
+        (employee, score, data.iloc[position])
+        for position, employee, score in score_employees(data, required_keywords, top_n, index, vector_index)
+    ]
 
     st.subheader("Employés recommandés pour travailler sur le projet basé sur les mots-clés extraits de la description :")
     for employee, score, details in employee_scores:
@@ -108,8 +62,24 @@ def recommend_employees(data, required_keywords, top_n=5):
 
     return employee_scores
 
-# Fonction principale pour orchestrer toutes les étapes
-def main():
+# Fonction pour construire (une seule fois par fichier) l'index des mots-clés des employés
+@st.cache_resource(show_spinner=False)
+def build_keyword_index(employee_df):
+    return EmployeeKeywordIndex(employee_df)
+
+# Fonction pour construire (ou recharger depuis le disque) l'index vectoriel TF-IDF + FAISS des employés
+@st.cache_resource(show_spinner="Construction de l'index vectoriel...")
+def build_vector_index(employee_df):
+    return load_or_build_vector_index(employee_df)
+
+# Fonction pour afficher dans la barre latérale le détail des étapes de l'exécution
+def show_profile(profiler):
+    st.sidebar.header("Profilage de l'exécution")
+    st.sidebar.write(f"Durée totale : {profiler.wall * 1000:.1f} ms")
+    st.sidebar.dataframe(profiler.to_frame(), hide_index=True)
+
+# Fonction pour orchestrer toutes les étapes
+def run_app():
     st.title("Analyse de Projet et de Ressources")
     st.write("Soumettez une description de projet (texte ou PDF via PyMuPDF) pour extraire les informations clés.")
 
@@ -118,39 +88,92 @@ def main():
         st.session_state.extracted_info = None
 
     # Choisir entre zone de texte ou fichier PDF
-    input_option = st.radio("Choisissez le mode de soumission de la description du projet :", ["Écrire la description", "Soumettre un fichier PDF"])
+    input_option = st.radio("Choisissez le mode de soumission de la description du projet :",
+                            ["Écrire la description", "Soumettre un fichier PDF", "Soumettre plusieurs projets (PDF)"])
 
     project_description = ""
+    uploaded_pdf = None
+    portfolio_pdfs = []
     if input_option == "Écrire la description":
         # Zone de texte pour la description du projet
         project_description = st.text_area("Description du Projet", placeholder="Entrez ici la description du projet...")
-    else:
+    elif input_option == "Soumettre un fichier PDF":
         # Téléchargement du fichier PDF
         uploaded_pdf = st.file_uploader("Téléchargez le fichier PDF contenant la description du projet", type=["pdf"])
-        if uploaded_pdf:
-            pdf_path = f"/tmp/{uploaded_pdf.name}"
-            with open(pdf_path, "wb") as f:
-                f.write(uploaded_pdf.getbuffer())
-            project_description = extract_text_from_pdf_with_pymupdf(pdf_path)
-
-    if st.button("Analyser la description du projet") and project_description.strip():
-        # Extraire les informations du projet
-        st.session_state.extracted_info = extract_key_information(project_description)
+    else:
+        # Téléchargement de plusieurs PDF (portefeuille de projets)
+        portfolio_pdfs = st.file_uploader("Téléchargez les fichiers PDF des projets", type=["pdf"], accept_multiple_files=True) or []
+
+    if st.button("Analyser la description du projet"):
+        try:
+            if portfolio_pdfs:
+                # Analyser en parallèle tous les projets (seules les compétences requises sont lues) ;
+                # un nouveau clic relance les analyses en échec
+                st.session_state.pending_jobs = ('portfolio', {
+                    pdf.name: parse_queue().submit("project", pdf.getvalue(), profile=active_profiler() is not None,
+                                                   force=True, sections=[REQUIRED_SKILLS_SECTION])
+                    for pdf in portfolio_pdfs
+                })
+            elif uploaded_pdf:
+                # Analyser le PDF page par page dans un processus d'analyse
+                st.session_state.pending_jobs = ('project', {
+                    uploaded_pdf.name: parse_queue().submit("project", uploaded_pdf.getvalue(), profile=active_profiler() is not None,
+                                                             force=True)
+                })
+            elif project_description.strip():
+                # Extraire les informations du projet
+                st.session_state.extracted_info = extract_key_information(project_description)
+                st.session_state.portfolio = None
+                st.session_state.pending_jobs = None
+        except JobQueueFull:
+            st.warning("Trop d'analyses en cours, veuillez réessayer dans un instant.")
+
+    # Analyses de PDF en cours : l'interface suit leur progression au lieu d'attendre
+    if st.session_state.get('pending_jobs'):
+        kind, jobs_by_name = st.session_state.pending_jobs
+        results = collect_jobs(jobs_by_name, "Analyse des projets" if kind == 'portfolio' else "Analyse du projet")
+        if results is None:
+            return
+        st.session_state.pending_jobs = None
+        if kind == 'portfolio':
+            st.session_state.portfolio = results or None
+            st.session_state.extracted_info = None
+        elif results:
+            st.session_state.extracted_info = next(iter(results.values()))
+            st.session_state.portfolio = None
+
+    portfolio = st.session_state.get('portfolio')
 
     # Si les informations du projet ont été extraites, continuer
-    if st.session_state.extracted_info:
+    if st.session_state.extracted_info or portfolio:
         # Afficher les informations clés extraites
-        st.subheader("Informations Clés Extraites du Projet")
-        for key, value in st.session_state.extracted_info.items():
-            st.write(f"**{key}**: {value}")
+        if portfolio:
+            st.subheader("Compétences Requises Extraites des Projets")
+            st.dataframe(pd.DataFrame(
+                [(name, info.get(REQUIRED_SKILLS_SECTION, "")) for name, info in portfolio.items()],
+                columns=["Projet", REQUIRED_SKILLS_SECTION]
+            ))
+        else:
+            st.subheader("Informations Clés Extraites du Projet")
+            for key, value in st.session_state.extracted_info.items():
+                st.write(f"**{key}**: {value}")
 
         # Étape suivante : Téléchargement du fichier des employés
         uploaded_file = st.file_uploader("Étape Suivante : Téléchargez le fichier des employés (format CSV ou Excel)", type=["csv", "xlsx"])
 
-        if uploaded_file:
+        data_directory = st.text_input("... ou chemin d'un répertoire de classeurs des employés (Person NNN.xlsx, ...)")
+
+        if uploaded_file or data_directory:
             # Charger les données des employés
             try:
-                if uploaded_file.name.endswith(".csv"):
+                if not uploaded_file:
+                    if not os.path.isdir(data_directory):
+                        st.error(f"Répertoire introuvable : {data_directory}")
+                        return
+                    employee_df, report = read_directory(dataset_signature(data_directory), data_directory)
+                    for name, missing in report.rejected:
+                        st.warning(f"{name} ignoré (colonnes manquantes : {', '.join(missing)})")
+                elif uploaded_file.name.endswith(".csv"):
                     employee_df = pd.read_csv(uploaded_file)
                 elif uploaded_file.name.endswith(".xlsx"):
                     employee_df = pd.read_excel(uploaded_file)
@@ -171,11 +194,31 @@ def main():
             # Sélection du nombre d'employés à recommander
             top_n = st.slider("Nombre d'employés à recommander", min_value=1, max_value=20, value=5)
 
+            # Mode de correspondance : mots-clés exacts ou similarité sémantique (TF-IDF + FAISS)
+            matching_mode = st.radio("Mode de correspondance :", ["Mots-clés", "Sémantique (TF-IDF + FAISS)"])
+            vector_index = build_vector_index(employee_df) if matching_mode != "Mots-clés" else None
+
             # Recommander des employés en fonction des mots-clés extraits
-            if 'extracted_info' in st.session_state and st.session_state.extracted_info:
-                recommend_employees(employee_df, st.session_state.extracted_info.get("Compétences requises", ""), top_n)
+            if portfolio:
+                matches = match_projects(portfolio, employee_df, top_n, index=build_keyword_index(employee_df),
+                                         vector_index=vector_index)
+                st.subheader("Employés recommandés par projet :")
+                st.dataframe(matches)
+                st.download_button("Télécharger le tableau (CSV)", matches.to_csv(index=False).encode("utf-8"),
+                                   file_name="affectations_projets.csv", mime="text/csv")
+            elif 'extracted_info' in st.session_state and st.session_state.extracted_info:
+                recommend_employees(employee_df, st.session_state.extracted_info.get("Compétences requises", ""), top_n,
+                                    index=build_keyword_index(employee_df), vector_index=vector_index)
             else:
                 st.error("Aucun mot-clé requis spécifié dans la description du projet.")
 
+# Fonction principale : exécution instrumentée si le profilage est activé (TPE_PROFILE ou barre latérale)
+def main():
+    profiling = st.sidebar.checkbox("Profilage des étapes (temps, mémoire)", value=PROFILING_ENABLED)
+    with profiled_run("project_analysis", profiling) as profiler:
+        run_app()
+    if profiler is not None:
+        show_profile(profiler)
+
 if __name__ == "__main__":
     main()
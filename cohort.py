@@ -0,0 +1,285 @@
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from scipy import sparse
+
+from instrumentation import stage
+from ratings import RatingsStore
+from recommendation_core import DEFAULT_WEIGHTS, read_employee_table
+from similarity import SimilarityEngine
+
+# Colonnes du tableau des recommandations de la cohorte (une ligne par employé similaire ou activité)
+COHORT_COLUMNS = ["Cible", "Type", "Rang", "Élément", "Score"]
+
+COHORT_SCHEMA = pa.schema([
+    pa.field("Cible", pa.string()), pa.field("Type", pa.string()), pa.field("Rang", pa.int64()),
+    pa.field("Élément", pa.string()), pa.field("Score", pa.float64())
+])
+
+# Valeurs de la colonne Type
+SIMILAR_EMPLOYEE = "employé"
+RECOMMENDED_ACTIVITY = "activité"
+
+# Nombre maximal de similarités (cibles × lignes) matérialisées à la fois par bloc de cibles
+_BLOCK_CELLS = 1 << 21
+
+# Modèle partagé avec les processus du pool (défini dans chaque processus par _init_worker)
+_model = None
+
+
+class _CohortModel:
+    """
+    État en lecture seule du calcul par lot : matrices de jetons du moteur de similarité,
+    lignes regroupées par employé et matrice creuse employé × activité des ratings normalisés.
+    """
+
+    def __init__(self, engine, ratings, weights):
+        self.weights = weights
+        self.size = len(engine)
+        self.matrices = engine.matrices
+        self.row_sizes = engine.row_sizes
+        self.education_codes = engine.education_codes
+
+        # Lignes regroupées par employé (ordre d'origine conservé dans chaque groupe)
+        self.codes, self.names = pd.factorize(engine.names, use_na_sentinel=False)
+        self.order = np.argsort(self.codes, kind='stable')
+        counts = np.bincount(self.codes, minlength=len(self.names))
+        self.starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+        self.ends = self.starts + counts
+        self.first_rows = self.order[self.starts]
+
+        # Ratings par employé, activités numérotées dans l'ordre de tri (celui de ratings_for)
+        person_ratings = [ratings.ratings_for(name) for name in self.names]
+        self.activities = sorted({activity for pairs in person_ratings for activity, _ in pairs})
+        activity_ids = {activity: i for i, activity in enumerate(self.activities)}
+        indptr = np.concatenate(([0], np.cumsum([len(pairs) for pairs in person_ratings])))
+        indices = np.fromiter((activity_ids[activity] for pairs in person_ratings for activity, _ in pairs),
+                              dtype=np.int64, count=indptr[-1])
+        values = np.fromiter((rating for pairs in person_ratings for _, rating in pairs),
+                             dtype=np.float64, count=indptr[-1])
+        # Les ratings nuls restent stockés : l'activité compte parmi les candidates, comme dans recommend_from_ratings
+        self.ratings = sparse.csr_matrix((values, indices, indptr), shape=(len(self.names), len(self.activities)))
+
+    # Indices de Jaccard d'une caractéristique entre les lignes cibles et toutes les lignes (cibles × lignes)
+    def _jaccard(self, feature, rows):
+        matrix = self.matrices[feature]
+        sizes = self.row_sizes[feature]
+        intersection = np.ascontiguousarray((matrix @ matrix[rows].T.toarray()).T)
+        union = sizes + sizes[rows][:, None] - intersection
+        return np.divide(intersection, union, out=np.zeros_like(intersection), where=union > 0)
+
+    # Scores pondérés des lignes cibles avec toutes les lignes (même ordre d'addition que weighted_scores)
+    def block_scores(self, rows):
+        weights = self.weights
+        score = self._jaccard('skills', rows) * weights['skills']
+        target_codes = self.education_codes[rows][:, None]
+        score += ((self.education_codes == target_codes) & (target_codes >= 0)) * weights['education']
+        score += self._jaccard('training', rows) * weights['training']
+        score += self._jaccard('activity', rows) * weights['activity']
+        return score
+
+    def top_similar(self, targets, top_n):
+        """
+        Top-N des employés similaires de chaque cible (codes d'employés) : liste de couples
+        (codes des voisins, similarités). Même règle que SimilarityEngine.rank : un employé garde
+        le score de sa dernière ligne positive, les égalités sont départagées par sa première ligne positive.
+        """
+        scores = self.block_scores(self.first_rows[targets])[:, self.order]
+        positive = scores > 0
+        for i, code in enumerate(targets):
+            positive[i, self.starts[code]:self.ends[code]] = False
+
+        # Dernière ligne positive (position triée) et première ligne positive (ligne d'origine) par employé
+        last = np.maximum.reduceat(np.where(positive, np.arange(self.size), -1), self.starts, axis=1)
+        first = np.minimum.reduceat(np.where(positive, self.order, self.size), self.starts, axis=1)
+        del positive
+
+        results = []
+        for i in range(len(targets)):
+            candidates = np.flatnonzero(last[i] >= 0)
+            similarities = scores[i, last[i, candidates]]
+            if len(candidates) > top_n:
+                threshold = -np.partition(-similarities, top_n - 1)[top_n - 1]
+                keep = similarities >= threshold
+                candidates, similarities = candidates[keep], similarities[keep]
+            order = np.lexsort((first[i, candidates], -similarities))[:top_n]
+            results.append((candidates[order], similarities[order]))
+        return results
+
+    def recommend_activities(self, neighbours, top_n):
+        """
+        Activités recommandées de chaque cible : produit de la matrice creuse cibles × voisins des
+        similarités par la matrice des ratings. Scores et ordre (égalités départagées par ordre
+        d'apparition) identiques à recommend_from_ratings.
+        """
+        indptr = np.concatenate(([0], np.cumsum([len(codes) for codes, _ in neighbours])))
+        indices = np.concatenate([codes for codes, _ in neighbours]) if len(neighbours) else np.empty(0, np.int64)
+        values = np.concatenate([similarities for _, similarities in neighbours]) if len(neighbours) else np.empty(0)
+        # Voisins stockés par rang : les scores sont accumulés dans le même ordre que voisin par voisin
+        weights = sparse.csr_matrix((values, indices, indptr), shape=(len(neighbours), len(self.names)))
+        product = weights @ self.ratings
+        product.sort_indices()
+
+        results = []
+        for i, (codes, _) in enumerate(neighbours):
+            if len(codes) == 0:
+                results.append((np.empty(0, np.int64), np.empty(0)))
+                continue
+            # Activités des voisins dans l'ordre d'apparition
+            sequence = np.concatenate([self.ratings.indices[self.ratings.indptr[c]:self.ratings.indptr[c + 1]]
+                                       for c in codes])
+            _, first = np.unique(sequence, return_index=True)
+            activities = sequence[np.sort(first)]
+
+            row_indices = product.indices[product.indptr[i]:product.indptr[i + 1]]
+            row_values = product.data[product.indptr[i]:product.indptr[i + 1]]
+            scores = np.zeros(len(activities))
+            positions = np.searchsorted(row_indices, activities)
+            found = positions < len(row_indices)
+            found[found] = row_indices[positions[found]] == activities[found]
+            scores[found] = row_values[positions[found]]
+
+            if len(scores) > top_n:
+                threshold = -np.partition(-scores, top_n - 1)[top_n - 1]
+                candidates = np.flatnonzero(scores >= threshold)
+            else:
+                candidates = np.arange(len(scores))
+            order = candidates[np.argsort(-scores[candidates], kind='stable')][:top_n]
+            results.append((activities[order], scores[order]))
+        return results
+
+
+# Initialisation d'un processus du pool
+def _init_worker(model):
+    global _model
+    _model = model
+
+
+# Recommandations d'un bloc de cibles (codes d'employés) : enregistrements du tableau de la cohorte
+def _recommend_block(targets, top_n, model=None):
+    model = model or _model
+    neighbours = model.top_similar(targets, top_n)
+    activities = model.recommend_activities(neighbours, top_n)
+
+    records = {column: [] for column in COHORT_COLUMNS}
+    for code, (employees, similarities), (activity_ids, scores) in zip(targets, neighbours, activities):
+        target = str(model.names[code])
+        items = [(SIMILAR_EMPLOYEE, str(model.names[e]), s) for e, s in zip(employees, similarities)]
+        items += [(RECOMMENDED_ACTIVITY, str(model.activities[a]), s) for a, s in zip(activity_ids, scores)]
+        ranks = list(range(1, len(employees) + 1)) + list(range(1, len(activity_ids) + 1))
+        for (kind, item, score), rank in zip(items, ranks):
+            records["Cible"].append(target)
+            records["Type"].append(kind)
+            records["Rang"].append(rank)
+            records["Élément"].append(item)
+            records["Score"].append(float(score))
+    return records
+
+
+def iter_cohort_recommendations(data, targets=None, weights=None, top_n=5, workers=None, engine=None,
+                                ratings=None, columns=None, block_size=None, progress=None):
+    """
+    Recommandations de toute une cohorte en un passage par blocs : pour chaque bloc de cibles, matrice
+    des similarités cibles × lignes, top-N des voisins par ligne, puis produit par la matrice des ratings.
+    targets : noms des personnes cibles (toutes les personnes de data par défaut).
+    Les blocs sont répartis sur un pool de processus ; la mémoire d'un bloc est bornée (block_size
+    cibles, par défaut selon la taille de data). Chaque cible obtient exactement le résultat de
+    top_similar puis recommend_activities sur data.
+    Produit un enregistrement (dictionnaire de colonnes COHORT_COLUMNS) par bloc.
+    """
+    weights = dict(DEFAULT_WEIGHTS, **(weights or {}))
+    if engine is None:
+        engine = SimilarityEngine(data, columns)
+    if ratings is None:
+        ratings = RatingsStore.from_frame(data, engine.columns['employee'], engine.columns['activity'])
+    model = _CohortModel(engine, ratings, weights)
+
+    if targets is None:
+        codes = np.arange(len(model.names))
+    else:
+        targets = pd.unique(pd.Series(list(targets), dtype=object).dropna())
+        codes = pd.Index(model.names).get_indexer(targets)
+        if (codes < 0).any():
+            raise KeyError(f"Employé introuvable : {targets[np.flatnonzero(codes < 0)[0]]}")
+    # Les cibles sans nom ne sont pas recommandées (comme dans l'application)
+    codes = codes[~pd.isna(model.names[codes])]
+
+    block_size = block_size or max(1, _BLOCK_CELLS // max(model.size, 1))
+    blocks = [codes[start:start + block_size] for start in range(0, len(codes), block_size)]
+    workers = min(workers or os.cpu_count() or 1, len(blocks)) or 1
+
+    done = 0
+    if workers == 1:
+        results = (_recommend_block(block, top_n, model) for block in blocks)
+        for block, records in zip(blocks, results):
+            done += len(block)
+            if progress is not None:
+                progress(done, len(codes))
+            yield records
+        return
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(model,)) as executor:
+        for block, records in zip(blocks, executor.map(_recommend_block, blocks, [top_n] * len(blocks))):
+            done += len(block)
+            if progress is not None:
+                progress(done, len(codes))
+            yield records
+
+
+# Fonction pour calculer les recommandations de la cohorte en un seul tableau
+def recommend_cohort(data, targets=None, weights=None, top_n=5, workers=None, **options):
+    with stage("cohort.recommend") as measure:
+        frames = [pd.DataFrame(records, columns=COHORT_COLUMNS)
+                  for records in iter_cohort_recommendations(data, targets, weights, top_n, workers, **options)]
+        frame = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=COHORT_COLUMNS)
+        measure.rows = len(data)
+    return frame
+
+
+# Fonction pour écrire en flux les recommandations de la cohorte dans un fichier Parquet (bloc par bloc)
+def write_cohort_recommendations(path, data, targets=None, weights=None, top_n=5, workers=None, **options):
+    written = 0
+    with stage("cohort.recommend") as measure, pq.ParquetWriter(path, COHORT_SCHEMA) as writer:
+        for records in iter_cohort_recommendations(data, targets, weights, top_n, workers, **options):
+            if records["Cible"]:
+                writer.write_table(pa.Table.from_pydict(records, schema=COHORT_SCHEMA))
+                written += len(records["Cible"])
+        measure.rows = len(data)
+    return written
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Recommandations d'activités par lot pour toute une cohorte.")
+    parser.add_argument("employees", help="Fichier (CSV, TSV, Excel, Parquet) ou répertoire de classeurs des employés")
+    parser.add_argument("--cohort", default=None,
+                        help="Fichier des personnes cibles, ajoutées aux employés (par défaut : toute la base)")
+    parser.add_argument("-n", "--top-n", type=int, default=5, help="Nombre d'employés similaires et d'activités par cible")
+    parser.add_argument("-w", "--workers", type=int, default=None, help="Nombre de processus (par défaut : nombre de cœurs)")
+    parser.add_argument("--block-size", type=int, default=None, help="Nombre de cibles par bloc (borne la mémoire)")
+    parser.add_argument("--weight-skills", type=float, default=DEFAULT_WEIGHTS['skills'], help="Poids des compétences")
+    parser.add_argument("--weight-education", type=float, default=DEFAULT_WEIGHTS['education'], help="Poids de l'éducation")
+    parser.add_argument("--weight-training", type=float, default=DEFAULT_WEIGHTS['training'], help="Poids des formations")
+    parser.add_argument("--weight-activity", type=float, default=DEFAULT_WEIGHTS['activity'], help="Poids des activités")
+    parser.add_argument("-o", "--output", default="cohort_recommendations.parquet", help="Fichier Parquet de sortie")
+    args = parser.parse_args()
+
+    data = read_employee_table(args.employees)
+    targets = None
+    if args.cohort:
+        cohort = read_employee_table(args.cohort)
+        data = pd.concat([data, cohort], ignore_index=True)
+        targets = cohort['Nom']
+    weights = {feature: getattr(args, f"weight_{feature}") for feature in DEFAULT_WEIGHTS}
+
+    written = write_cohort_recommendations(args.output, data, targets, weights, args.top_n, args.workers,
+                                           block_size=args.block_size)
+    print(f"{written} ligne(s) écrite(s) dans {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+import re
+from datetime import datetime
+
+from instrumentation import profiled
+
+# Liste des mots à exclure
+EXCLUDED_WORDS = [
+    "ID", "Nom", "Prénom", "Âge", "Sexe", "Nationalité", "Compétence", "Niveau de Maîtrise", "Diplôme",
+    "Institution", "Année de Obtention", "Titre du Poste", "Entreprise", "Durée", "Projets Clés", "Activity",
+    "Name", "Surname", "Age", "Gender", "Nationality", "Skills", "Mastery Level", "Degree", "Institution",
+    "Year of Graduation", "Job Title", "Company", "Duration", "Key Projects", "Activity", "Education"
+]
+
+# En-têtes de sections, par ordre de priorité (la première section trouvée dans la ligne l'emporte)
+SECTION_PATTERNS = [
+    (r"nom[s]?|name", "Nom"),
+    (r"prénom[s]?|surname|first name", "Prénom"),
+    (r"date de naissance|birth date|dob", "Date de Naissance"),
+    (r"expérience[s]? professionnelle[s]?|professional experience", "Expérience Professionnelle"),
+    (r"éducation|education|formation[s]?|training|école|université|institut|centre de formation", "Éducation"),
+    (r"compétence[s]?|skills", "Compétences"),
+    (r"langue[s]?|languages", "Langues"),
+    (r"projet[s]?|projects", "Projets"),
+    (r"certificat[s]?|certificates", "Certifications"),
+    (r"publication[s]?|publications?", "Publications"),
+    (r"référence[s]?|references", "Références"),
+    (r"objectifs|objectives", "Objectifs"),
+    (r"réalisations|achievements", "Réalisations"),
+    (r"licence|master|diplôme|bachelor|degree", "Diplôme")
+]
+
+# Motif unique : une alternative par section, chacune en anticipation ancrée en début de ligne,
+# si bien que l'alternative retenue est la première section (dans l'ordre) présente n'importe où dans la ligne
+_SECTION_REGEX = re.compile(
+    "^(?:" + "|".join(f"(?=.*?(?P<s{i}>{pattern}))" for i, (pattern, _) in enumerate(SECTION_PATTERNS)) + ")",
+    re.IGNORECASE
+)
+_SECTION_NAMES = {f"s{i}": section_name for i, (_, section_name) in enumerate(SECTION_PATTERNS)}
+
+# Mêmes en-têtes sous forme de sous-chaînes en minuscules (équivalentes aux motifs ci-dessus).
+# Pour une ligne Latin-1, lower() est une correspondance caractère à caractère identique à IGNORECASE,
+# donc le test d'inclusion donne exactement le même résultat que le motif, sans passer par le moteur d'expressions
+_SECTION_KEYWORDS = [
+    (("nom", "name"), "Nom"),
+    (("prénom", "surname", "first name"), "Prénom"),
+    (("date de naissance", "birth date", "dob"), "Date de Naissance"),
+    (("expérience professionnelle", "expériences professionnelle", "professional experience"), "Expérience Professionnelle"),
+    (("éducation", "education", "formation", "training", "école", "université", "institut"), "Éducation"),
+    (("compétence", "skills"), "Compétences"),
+    (("langue", "languages"), "Langues"),
+    (("projet", "projects"), "Projets"),
+    (("certificat", "certificates"), "Certifications"),
+    (("publication",), "Publications"),
+    (("référence", "references"), "Références"),
+    (("objectifs", "objectives"), "Objectifs"),
+    (("réalisations", "achievements"), "Réalisations"),
+    (("licence", "master", "diplôme", "bachelor", "degree"), "Diplôme")
+]
+
+# Section d'une ligne non vide (None si aucun en-tête n'y figure)
+def match_section(line):
+    if max(line) > '\xff':
+        match = _SECTION_REGEX.match(line)
+        return _SECTION_NAMES[match.lastgroup] if match else None
+    lowered = line.lower()
+    for keywords, section_name in _SECTION_KEYWORDS:
+        for keyword in keywords:
+            if keyword in lowered:
+                return section_name
+    return None
+
+# Fonctions pour extraire et nettoyer le texte du CV
+@profiled("cv.segmentation", rows=lambda text, *args, **kwargs: text.count('\n') + 1)
+def segment_text_into_sections(text):
+    sections_buffers = {section_name: [] for _, section_name in SECTION_PATTERNS}
+    unclassified_buffer = []
+
+    for line in text.split('\n'):
+        line = line.strip()
+        if line:
+            section_name = match_section(line)
+            if section_name:
+                sections_buffers[section_name].append(line)
+            else:
+                unclassified_buffer.append(line)
+
+    sections_content = {
+        section_name: " ".join(lines) + " " if lines else "" for section_name, lines in sections_buffers.items()
+    }
+    unclassified_content = " ".join(unclassified_buffer) + " " if unclassified_buffer else ""
+    return sections_content, unclassified_content
+
+# Mots exclus, en minuscules, calculés une seule fois
+EXCLUDED_WORDS_LOWER = frozenset(word.lower() for word in EXCLUDED_WORDS)
+
+# Caractères supprimés : tout sauf lettres/chiffres, espaces et virgules (puces comprises)
+_NON_WORD_REGEX = re.compile(r'[^\w\s,]')
+
+# Nettoyage du texte extrait (une seule passe de suppression, puis découpage et filtrage des mots exclus)
+def clean_text(text):
+    words = _NON_WORD_REGEX.sub('', text).split()
+    return " ".join(word for word in words if word.lower() not in EXCLUDED_WORDS_LOWER)
+
+# Nettoyage des sections
+@profiled("cv.cleaning", rows=len)
+def clean_sections(sections):
+    cleaned_sections = {}
+    for section, content in sections.items():
+        if content:
+            lines = content.split(". ")
+            keywords = [clean_text(line) for line in lines if line.strip()]
+            cleaned_sections[section] = keywords
+    return cleaned_sections
+
+# Calcul de l'âge
+def calculate_age(birth_date_str):
+    try:
+        birth_date = datetime.strptime(birth_date_str, "%d/%m/%Y")
+        today = datetime.today()
+        age = today.year - birth_date.year - ((today.month, today.day) < (birth_date.month, birth_date.day))
+        return age
+    except ValueError:
+        return ""
+
+# Extraction des détails de l'expérience
+def extract_experience_details(experience_data):
+    postes = re.findall(r"([\w\s]+)(?=\s\d{2}/\d{2}/\d{4}\s*-\s*\d{2}/\d{2}/\d{4})", experience_data)
+    entreprises = re.findall(r"Entreprise\s*:\s*(\w+)", experience_data, re.IGNORECASE)
+    dates = re.findall(r"(\d{2}/\d{2}/\d{4}\s*-\s*\d{2}/\d{2}/\d{4})", experience_data)
+    return postes, entreprises, dates
+
+# Colonnes d'une ligne employé construite à partir d'un CV
+EMPLOYEE_COLUMNS = [
+    "ID", "Nom", "Prénom", "Âge", "Sexe", "Nationalité", "Compétence", "Niveau de Maîtrise", "Diplôme",
+    "Institution", "Année de Obtention", "Titre du Poste", "Entreprise", "Durée", "Projets Clés", "Activity"
+]
+
+# Construction de la ligne employé à partir des sections nettoyées du CV
+@profiled("cv.build_row")
+def build_employee_row(cleaned_sections):
+    # Calculer l'âge
+    birth_date_str = " ".join(cleaned_sections.get("Date de Naissance", []))
+    age = calculate_age(birth_date_str) if birth_date_str else ""
+
+    # Extraire les détails d'expérience
+    experience_data = " ".join(cleaned_sections.get("Expérience Professionnelle", []))
+    postes, entreprises, dates = extract_experience_details(experience_data)
+
+    # L'identifiant est attribué à la fusion avec la table des employés (identity.IdentityIndex : stable, sans collision)
+    return {
+        "ID": None,
+        "Nom": " ".join(cleaned_sections.get("Nom", [])),
+        "Prénom": " ".join(cleaned_sections.get("Prénom", [])),
+        "Âge": age,
+        "Sexe": "",
+        "Nationalité": "",
+        "Compétence": ", ".join(cleaned_sections.get("Compétences", [])),
+        "Niveau de Maîtrise": "",
+        "Diplôme": ", ".join(cleaned_sections.get("Diplôme", [])),
+        "Institution": ", ".join([inst for inst in cleaned_sections.get("Éducation", []) if
+                                  re.search(r'(\u00e9cole|université|institut|centre de formation)', inst,
+                                            re.IGNORECASE)]),
+        "Année de Obtention": "",
+        "Titre du Poste": ", ".join(postes),
+        "Entreprise": ", ".join(entreprises),
+        "Durée": ", ".join(dates),
+        "Projets Clés": ", ".join(cleaned_sections.get("Projets", [])),
+        "Activity": ""
+    }
+
+# Pipeline complet texte du CV -> ligne employé
+def parse_cv_text(cv_text):
+    cv_sections, unclassified_content = segment_text_into_sections(cv_text)
+    cleaned_sections = clean_sections(cv_sections)
+    return build_employee_row(cleaned_sections)
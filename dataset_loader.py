@@ -0,0 +1,251 @@
+import argparse
+import fnmatch
+import hashlib
+import json
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from instrumentation import stage
+
+# Colonnes requises par les deux applications (recommandation d'activités et analyse de projet)
+REQUIRED_COLUMNS = ["Nom", "Compétence", "Activity", "Institution", "Diplôme"]
+
+# Fichiers de données reconnus dans un répertoire
+DATA_FILE_PATTERNS = ("*.xlsx", "*.xls", "*.csv")
+
+MANIFEST_NAME = "manifest.json"
+CONSOLIDATED_NAME = "consolidated.parquet"
+
+
+# Répertoire de cache par défaut d'un répertoire de données
+def default_cache_dir(directory):
+    key = hashlib.sha256(os.path.abspath(directory).encode("utf-8")).hexdigest()[:16]
+    return os.path.join(".cache", "datasets", key)
+
+
+# Fichiers de données du répertoire, triés par nom
+def list_data_files(directory, patterns=DATA_FILE_PATTERNS):
+    return sorted(
+        name for name in os.listdir(directory)
+        if not name.startswith("~$") and any(fnmatch.fnmatch(name.lower(), pattern) for pattern in patterns)
+    )
+
+
+# Signature rapide (nom, taille, date de modification) du contenu d'un répertoire
+def dataset_signature(directory, patterns=DATA_FILE_PATTERNS):
+    digest = hashlib.sha256()
+    for name in list_data_files(directory, patterns):
+        stat = os.stat(os.path.join(directory, name))
+        digest.update(f"{name}\x1f{stat.st_size}\x1f{stat.st_mtime_ns}\n".encode("utf-8"))
+    return digest.hexdigest()
+
+
+def _file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+# Écriture atomique : fichier temporaire unique dans le même répertoire, puis remplacement du fichier final
+# (un arrêt brutal ou une session concurrente ne laisse jamais un fichier tronqué relu plus tard)
+def _write_atomically(path, write):
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or ".", prefix=f"{os.path.basename(path)}.", suffix=".tmp")
+    os.close(fd)
+    try:
+        write(tmp_path)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+# Normalisation des colonnes objet pour l'écriture Parquet (valeurs mixtes converties en texte)
+def _normalize_for_parquet(data):
+    data = data.copy()
+    for column in data.columns:
+        if data[column].dtype == object:
+            values = data[column]
+            data[column] = values.where(values.isna(), values.astype(str))
+    data.columns = [str(column) for column in data.columns]
+    return data
+
+
+# Lecture d'un classeur dans un processus du pool et écriture de son fragment Parquet
+def _read_to_shard(task):
+    path, shard_path = task
+    try:
+        if path.lower().endswith(".csv"):
+            data = pd.read_csv(path)
+        else:
+            data = pd.read_excel(path)
+        data = _normalize_for_parquet(data)
+        _write_atomically(shard_path, lambda tmp_path: data.to_parquet(tmp_path, index=False))
+        return path, list(data.columns), None
+    except Exception as e:
+        return path, None, f"{type(e).__name__}: {e}"
+
+
+class DatasetLoadReport:
+    """Bilan d'un chargement : fichiers réutilisés depuis le cache, relus, rejetés ou en échec."""
+
+    def __init__(self):
+        self.cached = []
+        self.read = []
+        self.rejected = []  # (fichier, colonnes manquantes)
+        self.failed = []    # (fichier, erreur)
+
+    def __repr__(self):
+        return (f"DatasetLoadReport(cached={len(self.cached)}, read={len(self.read)}, "
+                f"rejected={len(self.rejected)}, failed={len(self.failed)})")
+
+
+def load_dataset_dir(directory, cache_dir=None, workers=None, required_columns=REQUIRED_COLUMNS,
+                     patterns=DATA_FILE_PATTERNS):
+    """
+    Charge tous les classeurs d'un répertoire (Person NNN.xlsx, ...) en un seul DataFrame.
+    Chaque fichier est lu en parallèle et mis en cache en Parquet ; un chargement ultérieur ne
+    relit que les fichiers dont la date de modification a changé et dont l'empreinte diffère.
+    Les fichiers sans les colonnes requises sont écartés et signalés dans le bilan.
+    Retourne (données, bilan).
+    """
+    with stage("dataset.load_dir") as measure:
+        data, report = _load_dataset_dir(directory, cache_dir, workers, required_columns, patterns)
+        measure.rows = len(data)
+    return data, report
+
+
+def _load_dataset_dir(directory, cache_dir, workers, required_columns, patterns):
+    cache_dir = cache_dir or default_cache_dir(directory)
+    shards_dir = os.path.join(cache_dir, "shards")
+    os.makedirs(shards_dir, exist_ok=True)
+
+    manifest_path = os.path.join(cache_dir, MANIFEST_NAME)
+    consolidated_path = os.path.join(cache_dir, CONSOLIDATED_NAME)
+    try:
+        with open(manifest_path, encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        manifest = {}
+
+    report = DatasetLoadReport()
+    names = list_data_files(directory, patterns)
+    new_manifest = {}
+    to_read = []
+    for name in names:
+        path = os.path.join(directory, name)
+        stat = os.stat(path)
+        entry = manifest.get(name)
+        shard_exists = entry is not None and os.path.exists(os.path.join(shards_dir, entry["shard"]))
+        if shard_exists and entry["size"] == stat.st_size and entry["mtime_ns"] == stat.st_mtime_ns:
+            new_manifest[name] = entry
+            report.cached.append(name)
+            continue
+
+        # Date modifiée : on ne relit le fichier que si son contenu a réellement changé
+        sha256 = _file_hash(path)
+        if shard_exists and entry["sha256"] == sha256:
+            new_manifest[name] = dict(entry, size=stat.st_size, mtime_ns=stat.st_mtime_ns)
+            report.cached.append(name)
+            continue
+        new_manifest[name] = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "sha256": sha256,
+                              "shard": f"{sha256}.parquet", "columns": None}
+        to_read.append(name)
+
+    if to_read:
+        # Un seul fragment par contenu : des classeurs identiques ne sont lus (et écrits) qu'une fois
+        by_shard = {}
+        for name in to_read:
+            by_shard.setdefault(new_manifest[name]["shard"], []).append(name)
+        tasks = [(os.path.join(directory, same[0]), os.path.join(shards_dir, shard)) for shard, same in by_shard.items()]
+        with ProcessPoolExecutor(max_workers=min(workers or os.cpu_count() or 1, len(tasks))) as executor:
+            for same, (path, columns, error) in zip(by_shard.values(), executor.map(_read_to_shard, tasks)):
+                for name in same:
+                    if error is not None:
+                        report.failed.append((name, error))
+                        del new_manifest[name]
+                    else:
+                        new_manifest[name]["columns"] = columns
+                        report.read.append(name)
+        report.failed.sort()
+        report.read.sort()
+
+    # Vérification du schéma de chaque fichier retenu
+    selected = []
+    for name in names:
+        entry = new_manifest.get(name)
+        if entry is None:
+            continue
+        missing = [column for column in required_columns if column not in entry["columns"]]
+        if missing:
+            report.rejected.append((name, missing))
+        else:
+            selected.append(name)
+
+    unchanged = not to_read and set(manifest) == set(new_manifest) and os.path.exists(consolidated_path)
+    if unchanged:
+        data = pd.read_parquet(consolidated_path)
+    else:
+        frames = [pd.read_parquet(os.path.join(shards_dir, new_manifest[name]["shard"])) for name in selected]
+        data = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=required_columns)
+        _write_atomically(consolidated_path, lambda tmp_path: data.to_parquet(tmp_path, index=False))
+        _remove_stale_shards(shards_dir, new_manifest)
+
+    def write_manifest(tmp_path):
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(new_manifest, f, ensure_ascii=False, indent=1)
+    _write_atomically(manifest_path, write_manifest)
+    return _restore_missing(data), report
+
+
+# Les valeurs manquantes relues depuis Parquet redeviennent NaN (comme avec pd.read_excel)
+def _restore_missing(data):
+    for column in data.columns:
+        if data[column].dtype == object:
+            values = data[column]
+            data[column] = values.where(values.notna(), np.nan)
+    return data
+
+
+def _remove_stale_shards(shards_dir, manifest):
+    used = {entry["shard"] for entry in manifest.values()}
+    for entry in os.scandir(shards_dir):
+        # Les fichiers temporaires appartiennent à une écriture en cours (autre session)
+        if entry.name not in used and not entry.name.endswith(".tmp"):
+            try:
+                os.remove(entry.path)
+            except OSError:
+                pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Chargement consolidé d'un répertoire de classeurs employés.")
+    parser.add_argument("directory", help="Répertoire contenant les classeurs (Person NNN.xlsx, ...)")
+    parser.add_argument("--cache-dir", default=None, help="Répertoire du cache Parquet")
+    parser.add_argument("-w", "--workers", type=int, default=None, help="Nombre de processus de lecture")
+    parser.add_argument("-o", "--output", default=None, help="Fichier Parquet/CSV de sortie (facultatif)")
+    args = parser.parse_args()
+
+    data, report = load_dataset_dir(args.directory, cache_dir=args.cache_dir, workers=args.workers)
+    print(f"{len(data)} ligne(s) chargée(s) : {len(report.cached)} fichier(s) depuis le cache, {len(report.read)} relu(s)")
+    for name, missing in report.rejected:
+        print(f"Rejeté : {name} (colonnes manquantes : {', '.join(missing)})")
+    for name, error in report.failed:
+        print(f"Échec : {name} : {error}")
+    if args.output:
+        if args.output.lower().endswith(".csv"):
+            data.to_csv(args.output, index=False)
+        else:
+            data.to_parquet(args.output, index=False)
+
+
+if __name__ == "__main__":
+    main()
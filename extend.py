@@ -1,112 +1,106 @@
 import streamlit as st
 import pandas as pd
-import fitz  # PyMuPDF pour l'extraction de texte à partir de PDF
+import io
 import os
-import random
-import uuid
-import re
-from datetime import datetime
-from collections import defaultdict
+from cohort import recommend_cohort
+from dataset_loader import dataset_signature, load_dataset_dir
+from identity import IdentityIndex
+from instrumentation import PROFILING_ENABLED, active_profiler, merge_stages, profiled_run
+from job_queue import FAILED, JobQueueFull, ParseJobQueue
+from minhash_lsh import DEFAULT_BANDS, approximate_top_similar_with, load_or_build_index, recall_at_n
+from pdf_cache import content_hash
+from ratings import RatingsStore
+from similarity import SimilarityEngine
 
 # Variable globale pour stocker les données de rating
 rating_data = pd.DataFrame()
 
-# Liste des mots à exclure
-EXCLUDED_WORDS = [
-    "ID", "Nom", "Prénom", "Âge", "Sexe", "Nationalité", "Compétence", "Niveau de Maîtrise", "Diplôme",
-    "Institution", "Année de Obtention", "Titre du Poste", "Entreprise", "Durée", "Projets Clés", "Activity",
-    "Name", "Surname", "Age", "Gender", "Nationality", "Skills", "Mastery Level", "Degree", "Institution",
-    "Year of Graduation", "Job Title", "Company", "Duration", "Key Projects", "Activity", "Education"
-]
-
-# Fonctions pour extraire le texte du CV avec PyMuPDF
-def extract_text_from_pdf(pdf_path):
-    try:
-        doc = fitz.open(pdf_path)
-        text = ""
-        for page in doc:
-            text += page.get_text()
-        return text
-    except Exception as e:
-        st.error(f"Erreur lors de l'extraction du texte du PDF : {e}")
-        return None
-
-# Fonctions pour extraire et nettoyer le texte du CV
-def segment_text_into_sections(text):
-    sections_regex = {
-        re.compile(r"(nom[s]?|name)", re.IGNORECASE): "Nom",
-        re.compile(r"(prénom[s]?|surname|first name)", re.IGNORECASE): "Prénom",
-        re.compile(r"(date de naissance|birth date|dob)", re.IGNORECASE): "Date de Naissance",
-        re.compile(r"(expérience[s]? professionnelle[s]?|professional experience)", re.IGNORECASE): "Expérience Professionnelle",
-        re.compile(r"(éducation|education|formation[s]?|training|école|université|institut|centre de formation)", re.IGNORECASE): "Éducation",
-        re.compile(r"(compétence[s]?|skills)", re.IGNORECASE): "Compétences",
-        re.compile(r"(langue[s]?|languages)", re.IGNORECASE): "Langues",
-        re.compile(r"(projet[s]?|projects)", re.IGNORECASE): "Projets",
-        re.compile(r"(certificat[s]?|certificates)", re.IGNORECASE): "Certifications",
-        re.compile(r"(publication[s]?|publications?)", re.IGNORECASE): "Publications",
-        re.compile(r"(référence[s]?|references)", re.IGNORECASE): "Références",
-        re.compile(r"(objectifs|objectives)", re.IGNORECASE): "Objectifs",
-        re.compile(r"(réalisations|achievements)", re.IGNORECASE): "Réalisations",
-        re.compile(r"(licence|master|diplôme|bachelor|degree)", re.IGNORECASE): "Diplôme"
-    }
-    sections_content = {value: "" for value in sections_regex.values()}
-    unclassified_content = ""
-    current_section = None
-
-    for line in text.split('\n'):
-        line = line.strip()
-        if line:
-            matched = False
-            for regex, section_name in sections_regex.items():
-                if regex.search(line):
-                    current_section = section_name
-                    matched = True
-                    break
-            if current_section and matched:
-                sections_content[current_section] += line + " "
-            elif not matched:
-                unclassified_content += line + " "
-    return sections_content, unclassified_content
-
-# Nettoyage du texte extrait
-def clean_text(text):
-    text = re.sub(r'\s+', ' ', text)
-    text = re.sub(r'[\u2022\u00b7\u25cf]', '', text)
-    text = re.sub(r'[^\w\s,]', '', text)
-    words = text.split()
-    text = " ".join(word for word in words if word.lower() not in [w.lower() for w in EXCLUDED_WORDS])
-    text = text.strip()
-    return text
-
-# Nettoyage des sections
-def clean_sections(sections):
-    cleaned_sections = {}
-    for section, content in sections.items():
-        if content:
-            lines = content.split(". ")
-            keywords = [clean_text(line) for line in lines if line.strip()]
-            cleaned_sections[section] = keywords
-    return cleaned_sections
-
-# Calcul de l'âge
-def calculate_age(birth_date_str):
-    try:
-        birth_date = datetime.strptime(birth_date_str, "%d/%m/%Y")
-        today = datetime.today()
-        age = today.year - birth_date.year - ((today.month, today.day) < (birth_date.month, birth_date.day))
-        return age
-    except ValueError:
-        return ""
-
-# Extraction des détails de l'expérience
-def extract_experience_details(experience_data):
-    postes = re.findall(r"([\w\s]+)(?=\s\d{2}/\d{2}/\d{4}\s*-\s*\d{2}/\d{2}/\d{4})", experience_data)
-    entreprises = re.findall(r"Entreprise\s*:\s*(\w+)", experience_data, re.IGNORECASE)
-    dates = re.findall(r"(\d{2}/\d{2}/\d{4}\s*-\s*\d{2}/\d{2}/\d{4})", experience_data)
-    return postes, entreprises, dates
-
-# Fonction principale
-def main():
+# Lecture d'un fichier tabulaire téléversé, mise en cache par empreinte du contenu
+@st.cache_resource(show_spinner=False, max_entries=8)
+def read_table(content_key, file_extension, _file_bytes):
+    if file_extension == 'csv':
+        return pd.read_csv(io.BytesIO(_file_bytes))
+    return pd.read_excel(io.BytesIO(_file_bytes))
+
+# Répertoire de classeurs employés (lecture parallèle, cache Parquet), mis en cache par signature du répertoire
+@st.cache_resource(show_spinner=False, max_entries=4)
+def read_directory(signature, directory):
+    return load_dataset_dir(directory)
+
+# Ligne de la nouvelle personne construite à partir de l'analyse d'un CV, mise en cache par empreinte du PDF
+@st.cache_resource(show_spinner=False, max_entries=32)
+def cv_person_data(content_key, _row):
+    return pd.DataFrame([_row])
+
+# File des analyses de CV (pool de processus partagé par toutes les sessions)
+@st.cache_resource(show_spinner=False)
+def parse_queue():
+    return ParseJobQueue()
+
+# Suivi d'une analyse en cours : seule la barre de progression est rafraîchie,
+# toute la page est réexécutée quand l'analyse est terminée
+@st.fragment(run_every=0.5)
+def job_progress(job_id, label):
+    job = parse_queue().status(job_id)
+    if job is None or job.done:
+        st.rerun()
+    st.progress(job.progress, text=f"{label} : {job.stage or job.status}")
+
+# Index des identités de la base (nom normalisé, âge, correspondance approchée par blocs), construit une fois par fichier
+@st.cache_resource(show_spinner=False, max_entries=4)
+def identity_index(base_key, _base_data):
+    return IdentityIndex.from_frame(_base_data)
+
+# Données des employés complétées par la nouvelle personne, identifiée dans la base (identifiant stable,
+# nom de référence) et sans ses lignes déjà présentes ; mises en cache par couple d'empreintes.
+# Retourne (données, lignes de la nouvelle personne, bilan de la fusion)
+@st.cache_resource(show_spinner=False, max_entries=4)
+def combined_dataset(data_key, _base_data, _new_person_data, _identities):
+    rows, report = _identities.overlay().merge_rows(_new_person_data)
+    return pd.concat([_base_data, rows[~report.duplicated]], ignore_index=True), rows, report
+
+# Moteur de similarité (matrices de jetons et similarités par caractéristique) mis en cache par jeu de données
+@st.cache_resource(show_spinner=False, max_entries=4)
+def similarity_engine(data_key, columns, _data):
+    return SimilarityEngine(_data, dict(columns))
+
+# Index MinHash-LSH de la base (persisté sur disque, gardé en mémoire entre les exécutions)
+@st.cache_resource(show_spinner=False, max_entries=4)
+def lsh_index(base_key, bands, _engine):
+    return load_or_build_index(base_key, _engine, bands=bands)
+
+# Recommandations de toute la cohorte (calcul par blocs sur plusieurs processus), mises en cache par jeu de données et paramètres
+@st.cache_resource(show_spinner=False, max_entries=2)
+def cohort_recommendations(data_key, whole_dataset, weights, top_n, _data, _targets, _engine, _ratings_store):
+    return recommend_cohort(_data, None if whole_dataset else _targets, dict(weights), top_n,
+                            engine=_engine, ratings=_ratings_store)
+
+# Mise à jour incrémentale des ratings de la session : la base n'est agrégée qu'une fois par fichier,
+# la nouvelle personne est appliquée comme un delta (l'ancienne est retirée si elle a changé)
+def update_ratings_store(base_key, base_data, new_person_data):
+    state = st.session_state
+    if state.get('ratings_base_key') != base_key or 'ratings_store' not in state:
+        state.ratings_store = RatingsStore.from_frame(base_data) if base_data is not None else RatingsStore()
+        state.ratings_base_key = base_key
+        state.ratings_delta = None
+
+    previous_delta = state.ratings_delta
+    if previous_delta is None or not previous_delta.equals(new_person_data):
+        if previous_delta is not None:
+            state.ratings_store.remove_rows(previous_delta)
+            state.ratings_delta = None
+        state.ratings_store.add_rows(new_person_data)
+        state.ratings_delta = new_person_data
+    return state.ratings_store
+
+# Fonction pour afficher dans la barre latérale le détail des étapes de l'exécution
+def show_profile(profiler):
+    st.sidebar.header("Profilage de l'exécution")
+    st.sidebar.write(f"Durée totale : {profiler.wall * 1000:.1f} ms")
+    st.sidebar.dataframe(profiler.to_frame(), hide_index=True)
+
+# Pages de l'application
+def run_app():
     st.title("Système de Recommandation d'Activités pour Employés")
 
     st.sidebar.header("Configuration des Poids")
@@ -126,60 +120,46 @@ def main():
         }
     }
 
+    # Recherche approximative des voisins (MinHash-LSH) pour les grands historiques
+    st.sidebar.header("Recherche des Employés Similaires")
+    approximate = st.sidebar.checkbox("Recherche approximative (MinHash-LSH)", value=False)
+    lsh_bands = st.sidebar.select_slider("Nombre de bandes LSH (plus = meilleur rappel)", options=[8, 16, 32, 64],
+                                         value=DEFAULT_BANDS, disabled=not approximate,
+                                         help="Avec moins de 64 bandes, le rappel des voisins baisse nettement "
+                                              "(environ 50 % avec 32 bandes sur un grand historique)")
+    measure_recall = st.sidebar.checkbox("Mesurer le rappel@N par rapport au mode exact", value=False, disabled=not approximate)
+
     # Section pour choisir le type de fichier à uploader
     st.header("Ajouter une nouvelle personne")
     file_type = st.radio("Sélectionnez le type de fichier à télécharger:", ("CV en PDF", "Fichier de données (CSV/Excel)"))
 
     new_person_data = None
+    new_person_key = None
     if file_type == "CV en PDF":
         new_person_file = st.file_uploader("Téléchargez un CV en format PDF", type=["pdf"], key='new_person_pdf')
         if new_person_file:
-            # Sauvegarder le fichier CV temporairement
-            session_id = str(uuid.uuid4())  # Utiliser un UUID pour éviter les conflits
-            session_folder = os.path.join("data", session_id)
-            os.makedirs(session_folder, exist_ok=True)
-            pdf_path = os.path.join(session_folder, f"{new_person_file.name}")
-            with open(pdf_path, "wb") as f:
-                f.write(new_person_file.getbuffer())
-
-            # Extraire et nettoyer le texte du CV en utilisant PyMuPDF
-            cv_text = extract_text_from_pdf(pdf_path)
-            if cv_text:
-                cv_sections, unclassified_content = segment_text_into_sections(cv_text)
-                cleaned_sections = clean_sections(cv_sections)
-
-                # Calculer l'âge
-                birth_date_str = " ".join(cleaned_sections.get("Date de Naissance", []))
-                age = calculate_age(birth_date_str) if birth_date_str else ""
-
-                # Extraire les détails d'expérience
-                experience_data = " ".join(cleaned_sections.get("Expérience Professionnelle", []))
-                postes, entreprises, dates = extract_experience_details(experience_data)
-
-                # Créer un DataFrame à partir des informations extraites
-                unique_id = random.randint(700, 900)
-                row_data = {
-                    "ID": unique_id,
-                    "Nom": " ".join(cleaned_sections.get("Nom", [])),
-                    "Prénom": " ".join(cleaned_sections.get("Prénom", [])),
-                    "Âge": age,
-                    "Sexe": "",
-                    "Nationalité": "",
-                    "Compétence": ", ".join(cleaned_sections.get("Compétences", [])),
-                    "Niveau de Maîtrise": "",
-                    "Diplôme": ", ".join(cleaned_sections.get("Diplôme", [])),
-                    "Institution": ", ".join([inst for inst in cleaned_sections.get("Éducation", []) if
-                                                      re.search(r'(\u00e9cole|université|institut|centre de formation)', inst,
-                                                                re.IGNORECASE)]),
-                    "Année de Obtention": "",
-                    "Titre du Poste": ", ".join(postes),
-                    "Entreprise": ", ".join(entreprises),
-                    "Durée": ", ".join(dates),
-                    "Projets Clés": ", ".join(cleaned_sections.get("Projets", [])),
-                    "Activity": ""
-                }
-
-                new_person_data = pd.DataFrame([row_data])
+            # Extraction, segmentation et nettoyage du CV dans un processus d'analyse (une fois par CV) :
+            # l'interface n'attend pas, elle suit la progression de la tâche
+            pdf_bytes = new_person_file.getvalue()
+            new_person_key = content_hash(pdf_bytes)
+            try:
+                job = parse_queue().status(parse_queue().submit("cv", pdf_bytes, key=new_person_key,
+                                                                profile=active_profiler() is not None))
+            except JobQueueFull:
+                st.warning("Trop d'analyses en cours, veuillez réessayer dans un instant.")
+                return
+            if job.status == FAILED:
+                st.error(f"Erreur lors de l'extraction du texte du PDF : {job.error}")
+                # Un CV en échec n'est pas réanalysé à chaque exécution, seulement sur demande
+                if st.button("Réessayer l'analyse du CV"):
+                    parse_queue().submit("cv", pdf_bytes, key=new_person_key, profile=active_profiler() is not None,
+                                         force=True)
+                    st.rerun()
+            elif not job.done:
+                job_progress(job.id, "Analyse du CV")
+            else:
+                merge_stages(parse_queue().take_stages(job.id))
+                new_person_data = cv_person_data(new_person_key, job.result)
                 st.success("Nouvelle personne ajoutée aux données via CV!")
                 st.dataframe(new_person_data)
 
@@ -189,10 +169,10 @@ def main():
             # Charger le fichier de données directement
             file_extension = new_person_file.name.split('.')[-1].lower()
             try:
-                if file_extension == 'csv':
-                    new_person_data = pd.read_csv(new_person_file)
-                elif file_extension in ['xlsx', 'xls']:
-                    new_person_data = pd.read_excel(new_person_file)
+                if file_extension in ['csv', 'xlsx', 'xls']:
+                    file_bytes = new_person_file.getvalue()
+                    new_person_key = content_hash(file_bytes)
+                    new_person_data = read_table(new_person_key, file_extension, file_bytes)
                 else:
                     st.error(f"Format de fichier non supporté: .{file_extension}")
                     return
@@ -210,22 +190,45 @@ def main():
     if new_person_data is not None:
         st.header("Ajouter les données des employés")
         uploaded_file = st.file_uploader("Téléchargez le fichier de données des employés", type=["csv", "xlsx", "xls"], key='employee_data')
+        data_directory = st.text_input("... ou chemin d'un répertoire de classeurs des employés (Person NNN.xlsx, ...)", key='employee_data_dir')
         data = None
-        if uploaded_file:
-            file_extension = uploaded_file.name.split('.')[-1].lower()
+        base_data, base_key = None, None
+        new_person_rows = new_person_data
+        if uploaded_file or data_directory:
             try:
-                if file_extension == 'csv':
-                    data = pd.read_csv(uploaded_file)
-                elif file_extension in ['xlsx', 'xls']:
-                    data = pd.read_excel(uploaded_file)
+                if uploaded_file:
+                    file_extension = uploaded_file.name.split('.')[-1].lower()
+                    if file_extension in ['csv', 'xlsx', 'xls']:
+                        file_bytes = uploaded_file.getvalue()
+                        base_key = content_hash(file_bytes)
+                        data = read_table(base_key, file_extension, file_bytes)
+                    else:
+                        st.error(f"Format de fichier non supporté: .{file_extension}")
+                        return
                 else:
-                    st.error(f"Format de fichier non supporté: .{file_extension}")
-                    return
+                    if not os.path.isdir(data_directory):
+                        st.error(f"Répertoire introuvable : {data_directory}")
+                        return
+                    base_key = dataset_signature(data_directory)
+                    data, report = read_directory(base_key, data_directory)
+                    for name, missing in report.rejected:
+                        st.warning(f"{name} ignoré (colonnes manquantes : {', '.join(missing)})")
+                    for name, error in report.failed:
+                        st.warning(f"{name} illisible : {error}")
 
                 if data.empty:
                     st.error("Le fichier téléchargé est vide. Veuillez fournir un fichier valide.")
                     return
-                data = pd.concat([data, new_person_data], ignore_index=True)
+                base_data = data
+                data, new_person_data, identity_report = combined_dataset(
+                    f"{base_key}:{new_person_key}", base_data, new_person_data, identity_index(base_key, base_data))
+                new_person_rows = new_person_data[~identity_report.duplicated]
+                for name, identity in identity_report.exact:
+                    st.info(f"{name} est déjà présent(e) dans les données (ID {identity.id})")
+                for name, identity, score in identity_report.fuzzy:
+                    st.info(f"{name} reconnu(e) comme {identity.name} (ID {identity.id}, correspondance {score} %)")
+                if identity_report.duplicates:
+                    st.info(f"{identity_report.duplicates} ligne(s) déjà présente(s) ignorée(s)")
             except Exception as e:
                 st.error(f"Erreur lors du chargement des données: {e}")
                 return
@@ -238,15 +241,8 @@ def main():
 
             # Calcul des occurrences et normalisation des activités
             try:
-                total_occurrences = data.groupby('Activity').size().rename('Total_Occurrences')
-                person_activity_counts = data.groupby(['Nom', 'Activity']).size().rename('Person_Activity_Counts').reset_index()
-                merged_data = person_activity_counts.merge(total_occurrences, left_on='Activity', right_index=True, how='left')
-                merged_data['Activity_Ratio'] = merged_data['Person_Activity_Counts'] / merged_data['Total_Occurrences']
-                max_ratios = merged_data.groupby('Activity')['Activity_Ratio'].transform('max')
-                merged_data['Normalized_Rating'] = 0
-                merged_data.loc[max_ratios > 0, 'Normalized_Rating'] = (
-                    (merged_data['Activity_Ratio'] / max_ratios) * 5
-                ).round().astype(int)
+                ratings_store = update_ratings_store(base_key, base_data, new_person_rows)
+                merged_data = ratings_store.to_frame()
 
                 # Stockage global pour les recommandations
                 global rating_data
@@ -261,55 +257,69 @@ def main():
                         target_employee = new_person_data['Nom'].iloc[0]
                         top_n = st.slider("Nombre de recommandations", min_value=1, max_value=20, value=5)
 
+                        # Le calcul reste affiché après le clic : un changement de poids ne refait qu'une somme pondérée
                         if st.button("Calculer les recommandations"):
-                            similarities = defaultdict(float)
-                            target_data = data[data['Nom'] == target_employee].iloc[0]
-                            for _, row in data.iterrows():
-                                if row['Nom'] == target_employee:
-                                    continue
-                                score = 0.0
-                                target_skills = set(str(target_data[config['columns']['skills']]).split(',')) if not pd.isna(target_data[config['columns']['skills']]) else set()
-                                row_skills = set(str(row[config['columns']['skills']]).split(',')) if not pd.isna(row[config['columns']['skills']]) else set()
-                                skill_similarity = len(target_skills & row_skills) / len(target_skills | row_skills) if (target_skills | row_skills) else 0
-                                score += skill_similarity * config['weights']['skills']
-
-                                education_similarity = 1 if target_data[config['columns']['education']] == row[config['columns']['education']] else 0
-                                score += education_similarity * config['weights']['education']
-
-                                target_training = set(str(target_data[config['columns']['training']]).split(',')) if not pd.isna(target_data[config['columns']['training']]) else set()
-                                row_training = set(str(row[config['columns']['training']]).split(',')) if not pd.isna(row[config['columns']['training']]) else set()
-                                training_similarity = len(target_training & row_training) / len(target_training | row_training) if (target_training | row_training) else 0
-                                score += training_similarity * config['weights']['training']
-
-                                target_activities = set(str(target_data[config['columns']['activity']]).split(',')) if not pd.isna(target_data[config['columns']['activity']]) else set()
-                                row_activities = set(str(row[config['columns']['activity']]).split(',')) if not pd.isna(row[config['columns']['activity']]) else set()
-                                activity_similarity = len(target_activities & row_activities) / len(target_activities | row_activities) if (target_activities | row_activities) else 0
-                                score += activity_similarity * config['weights']['activity']
-
-                                if score > 0:
-                                    similarities[row['Nom']] = score
-
-                            if not similarities:
+                            st.session_state.recommendation_target = (new_person_key, target_employee)
+
+                        if st.session_state.get('recommendation_target') == (new_person_key, target_employee):
+                            if base_data is not None:
+                                # Moteur et index construits une fois par base : la nouvelle personne est
+                                # comparée comme lignes supplémentaires, sans reconstruire le moteur
+                                engine = similarity_engine(base_key, tuple(config['columns'].items()), base_data)
+                                if approximate:
+                                    index = lsh_index(base_key, lsh_bands, engine)
+                                    sorted_similarities = approximate_top_similar_with(
+                                        engine, index, new_person_rows, target_employee, config['weights'], top_n)
+                                    if measure_recall:
+                                        exact_similarities = engine.top_similar_with(new_person_rows, target_employee,
+                                                                                     config['weights'], top_n)
+                                        st.info(f"Rappel@{top_n} du mode approximatif : "
+                                                f"{recall_at_n(exact_similarities, sorted_similarities):.2%}")
+                                else:
+                                    sorted_similarities = engine.top_similar_with(new_person_rows, target_employee,
+                                                                                  config['weights'], top_n)
+                            else:
+                                engine = similarity_engine(new_person_key, tuple(config['columns'].items()), data)
+                                sorted_similarities = engine.top_similar(target_employee, config['weights'], top_n)
+
+                            if not sorted_similarities:
                                 st.warning("Aucun employé similaire trouvé. Veuillez vérifier les données disponibles.")
                             else:
-                                sorted_similarities = sorted(similarities.items(), key=lambda x: x[1], reverse=True)[:top_n]
                                 st.write(f"Employés similaires à '{target_employee}' :")
                                 for employee, similarity in sorted_similarities:
                                     st.write(f"{employee}, Similarité : {similarity:.4f}")
 
-                                recommended_activities = defaultdict(float)
-                                for employee, similarity in sorted_similarities:
-                                    employee_data = rating_data[rating_data['Nom'] == employee]
-                                    for _, row in employee_data.iterrows():
-                                        activity = row['Activity']
-                                        rating = row['Normalized_Rating']
-                                        recommended_activities[activity] += rating * similarity
-
-                                recommended_activities = sorted(recommended_activities.items(), key=lambda x: x[1], reverse=True)[:top_n]
+                                recommended_activities = ratings_store.recommend_activities(sorted_similarities, top_n)
                                 st.write("Activités recommandées :")
                                 st.write(pd.DataFrame(recommended_activities, columns=['Activité', 'Score']))
+
+                        # Recommandations pour toutes les personnes du fichier ajouté (ou toute la base) en un passage
+                        st.header("Recommandations pour toute la cohorte")
+                        whole_dataset = st.checkbox("Toute la base (sinon : les personnes du fichier ajouté)", value=False)
+                        cohort_key = (f"{base_key}:{new_person_key}", whole_dataset)
+                        if st.button("Calculer les recommandations de la cohorte"):
+                            st.session_state.cohort_target = cohort_key
+
+                        if st.session_state.get('cohort_target') == cohort_key:
+                            engine = similarity_engine(f"{base_key}:{new_person_key}", tuple(config['columns'].items()), data)
+                            with st.spinner("Calcul des recommandations de la cohorte..."):
+                                cohort = cohort_recommendations(cohort_key[0], whole_dataset, tuple(config['weights'].items()),
+                                                                top_n, data, new_person_data['Nom'], engine, ratings_store)
+                            st.write(f"{cohort['Cible'].nunique()} personne(s), {len(cohort)} recommandation(s) :")
+                            st.dataframe(cohort, hide_index=True)
+                            st.download_button("Télécharger (Parquet)", cohort.to_parquet(index=False),
+                                               file_name="cohort_recommendations.parquet",
+                                               mime="application/octet-stream")
             except Exception as e:
                 st.error(f"Erreur lors du calcul des recommandations : {e}")
 
+# Fonction principale : exécution instrumentée si le profilage est activé (TPE_PROFILE ou barre latérale)
+def main():
+    profiling = st.sidebar.checkbox("Profilage des étapes (temps, mémoire)", value=PROFILING_ENABLED)
+    with profiled_run("extend", profiling) as profiler:
+        run_app()
+    if profiler is not None:
+        show_profile(profiler)
+
 if __name__ == "__main__":
     main()
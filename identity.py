@@ -0,0 +1,390 @@
+import argparse
+import os
+import re
+import unicodedata
+import warnings
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+with warnings.catch_warnings():
+    # Sans python-Levenshtein, fuzzywuzzy prévient qu'il utilise SequenceMatcher (suffisant ici : peu de candidats par bloc)
+    warnings.simplefilter("ignore")
+    from fuzzywuzzy import fuzz
+
+from instrumentation import profiled
+
+# Score minimal (0 à 100, fuzz.token_sort_ratio) pour reconnaître une personne sous un nom approché
+MATCH_THRESHOLD = 90
+
+# Écart d'âge toléré entre deux fiches de la même personne (anniversaire passé entre les deux)
+AGE_TOLERANCE = 1
+
+# Colonnes qui confirment un nom approché quand l'âge manque d'un côté (fiches issues d'un CV)
+CORROBORATING_COLUMNS = ("Diplôme", "Institution")
+
+# Statuts d'une résolution d'identité
+NEW = "nouveau"
+EXACT = "exact"
+FUZZY = "approché"
+
+_NON_ALNUM = re.compile(r"[^0-9a-z]+")
+
+
+# Fonction pour normaliser un nom : minuscules, sans accents ni ponctuation, mots triés
+def normalize_name(*parts):
+    text = " ".join(str(part) for part in parts if part is not None and not pd.isna(part))
+    text = unicodedata.normalize("NFKD", text.lower()).encode("ascii", "ignore").decode("ascii")
+    return " ".join(sorted(_NON_ALNUM.sub(" ", text).split()))
+
+
+# Âge entier (None s'il est absent ou illisible)
+def _age(value):
+    try:
+        return int(float(value))
+    except (TypeError, ValueError):
+        return None
+
+
+# Identifiant d'une ligne : entier pour un nombre entier (ou une chaîne de chiffres), chaîne telle quelle
+# pour un identifiant texte (E1), None s'il est absent
+def _employee_id(value):
+    value = _normalize_value(value)
+    if isinstance(value, str):
+        value = value.strip()
+        return int(value) if value.isdigit() else value or None
+    if isinstance(value, (int, np.integer)) and not isinstance(value, bool):
+        return int(value)
+    return None
+
+
+# Ordre des identifiants (entiers puis chaînes) pour départager deux fiches de même score
+def _id_order(employee_id):
+    return (isinstance(employee_id, str), employee_id)
+
+
+# Valeur comparable d'une cellule : None pour les valeurs manquantes, entier pour un flottant entier
+def _normalize_value(value):
+    if value is None or (not isinstance(value, str) and pd.isna(value)):
+        return None
+    if isinstance(value, (float, np.floating)) and float(value).is_integer():
+        return int(value)
+    return value
+
+
+# Valeurs comparables d'une colonne (même normalisation que _normalize_value, vectorisée)
+def _column_values(column):
+    values = column.to_numpy(dtype=object, copy=True)
+    missing = pd.isna(column).to_numpy()
+    values[missing] = None
+    if column.dtype.kind == 'f':
+        numbers = column.to_numpy()
+        integral = ~missing & (numbers == np.floor(numbers))
+        values[integral] = numbers[integral].astype(np.int64)
+    return values
+
+
+# Clés de blocs d'un nom normalisé : deux premières et deux dernières lettres de chaque mot, nombres entiers
+# (une faute de frappe au milieu ou à une extrémité d'un mot laisse la fiche dans au moins un bloc)
+def _block_keys(key):
+    words = key.split()
+    return ("p:" + " ".join(word if word.isdigit() else word[:2] for word in words),
+            "s:" + " ".join(word if word.isdigit() else word[-2:] for word in words))
+
+
+# Âges compatibles : l'un des deux absent ou écart d'au plus AGE_TOLERANCE
+def _ages_compatible(age, other):
+    return age is None or other is None or abs(age - other) <= AGE_TOLERANCE
+
+
+# Valeur de confirmation normalisée (diplômes et institutions se répètent d'une personne à l'autre)
+@lru_cache(maxsize=65536)
+def _detail_value(value):
+    return normalize_name(value)
+
+
+# Détails de confirmation normalisés : {(colonne, valeur normalisée)} sans valeurs vides
+def _details(details):
+    normalized = ((column, _detail_value(value)) for column, value in details)
+    return frozenset((column, value) for column, value in normalized if value)
+
+
+class Identity:
+    """Personne connue de l'index : identifiant, nom de référence, nom normalisé et âge."""
+
+    __slots__ = ("id", "name", "key", "age", "numbers")
+
+    def __init__(self, employee_id, name, key, age):
+        self.id = employee_id
+        self.name = name
+        self.key = key
+        self.age = age
+        # Les nombres d'un nom (Person 323) doivent être identiques : 323 et 324 sont deux personnes
+        self.numbers = tuple(word for word in key.split() if word.isdigit())
+
+    def __repr__(self):
+        return f"Identity({self.id!r}, {self.name!r}, age={self.age!r})"
+
+
+class IdentityMergeReport:
+    """Bilan d'une fusion : personnes nouvelles, reconnues exactement ou par nom approché, lignes en double."""
+
+    def __init__(self, rows):
+        self.new = []       # identités créées
+        self.exact = []     # (nom reçu, identité)
+        self.fuzzy = []     # (nom reçu, identité, score)
+        self.duplicated = np.zeros(rows, dtype=bool)
+
+    @property
+    def duplicates(self):
+        return int(self.duplicated.sum())
+
+    def __repr__(self):
+        return (f"IdentityMergeReport(new={len(self.new)}, exact={len(self.exact)}, fuzzy={len(self.fuzzy)}, "
+                f"duplicates={self.duplicates})")
+
+
+class IdentityIndex:
+    """
+    Index des personnes d'une table d'employés. Une personne est reconnue par son nom normalisé
+    (nom et prénom, sans accents, mots triés) et son âge : d'abord par clé exacte (dictionnaire),
+    puis par correspondance approchée (fuzzywuzzy) limitée aux fiches de ses blocs, ce qui garde
+    un coût quasi constant par insertion. Des identifiants différents désignent des personnes
+    différentes, et un nom approché doit être confirmé par l'identifiant, le diplôme ou l'institution.
+    Chaque personne garde son identifiant (entier ou texte) ; seules les lignes sans identifiant, ou
+    dont l'identifiant est pris par une autre personne, reçoivent le plus grand identifiant entier + 1.
+    Les lignes déjà présentes (mêmes valeurs, même personne) sont signalées comme doublons.
+    Un index dérivé (overlay) résout des lignes sans modifier l'index partagé.
+    """
+
+    def __init__(self, threshold=MATCH_THRESHOLD, parent=None):
+        self.parent = parent
+        self.threshold = parent.threshold if parent is not None else threshold
+        self.columns = parent.columns if parent is not None else None
+        self.next_id = parent.next_id if parent is not None else 1
+        self._identities = []
+        self._exact = {}    # (nom normalisé, âge) -> identité
+        self._blocks = {}   # clé de bloc -> [identités]
+        self._by_id = {}    # identifiant -> identité
+        self._rows = set()  # valeurs des lignes connues (identifiant de référence compris)
+        self._details = {}  # identifiant -> {(colonne, valeur normalisée)} des colonnes de confirmation
+
+    @classmethod
+    @profiled("identity.build", rows=lambda cls, data, *args, **kwargs: len(data))
+    def from_frame(cls, data, threshold=MATCH_THRESHOLD):
+        index = cls(threshold)
+        index.merge_rows(data)
+        return index
+
+    def __len__(self):
+        return len(self._identities) + (len(self.parent) if self.parent is not None else 0)
+
+    # Vue dérivée : les résolutions et lignes ajoutées ne modifient pas cet index
+    def overlay(self):
+        return IdentityIndex(parent=self)
+
+    def _exact_match(self, exact_key):
+        identity = self._exact.get(exact_key)
+        if identity is None and self.parent is not None:
+            return self.parent._exact_match(exact_key)
+        return identity
+
+    def _candidates(self, block_key):
+        candidates = self._blocks.get(block_key, [])
+        if self.parent is not None:
+            return self.parent._candidates(block_key) + candidates
+        return candidates
+
+    def _identity(self, employee_id):
+        identity = self._by_id.get(employee_id)
+        if identity is None and self.parent is not None:
+            return self.parent._identity(employee_id)
+        return identity
+
+    def _row_known(self, row):
+        return row in self._rows or (self.parent is not None and self.parent._row_known(row))
+
+    def _corroborated(self, employee_id, details):
+        if not self._details.get(employee_id, set()).isdisjoint(details):
+            return True
+        return self.parent is not None and self.parent._corroborated(employee_id, details)
+
+    def match(self, name, first_name=None, age=None, employee_id=None, details=()):
+        """
+        Personne connue correspondant au nom, au prénom et à l'âge : (identité, statut, score),
+        ou (None, NEW, 0) si aucune fiche ne correspond. Une ligne avec identifiant ne correspond
+        qu'à la fiche de cet identifiant (des identifiants différents sont des personnes différentes) ;
+        sans identifiant, un nom approché n'est retenu que confirmé par une valeur commune des
+        détails ((colonne, valeur) des colonnes CORROBORATING_COLUMNS).
+        """
+        return self._match(normalize_name(name, first_name), _age(age), _employee_id(employee_id),
+                           _details(details))
+
+    def _match(self, key, age, employee_id=None, details=frozenset()):
+        numbers = tuple(word for word in key.split() if word.isdigit())
+        if employee_id is not None:
+            # Même identifiant : même personne si le nom correspond (l'identifiant confirme un nom approché)
+            candidate = self._identity(employee_id)
+            if candidate is None:
+                return None, NEW, 0
+            if candidate.key == key:
+                return candidate, EXACT, 100
+            if candidate.numbers == numbers and _ages_compatible(age, candidate.age):
+                score = fuzz.token_sort_ratio(key, candidate.key)
+                if score >= self.threshold:
+                    return candidate, FUZZY, score
+            return None, NEW, 0
+
+        if not key:
+            return None, NEW, 0
+        identity = self._exact_match((key, age))
+        if identity is not None:
+            return identity, EXACT, 100
+
+        best, best_score = None, 0
+        seen = set()
+        for block_key in _block_keys(key):
+            for candidate in self._candidates(block_key):
+                if candidate.id in seen or candidate.numbers != numbers:
+                    continue
+                seen.add(candidate.id)
+                if not _ages_compatible(age, candidate.age):
+                    continue
+                # Un nom différent (Martin / Martine) doit être confirmé par une autre colonne
+                if candidate.key != key and not self._corroborated(candidate.id, details):
+                    continue
+                score = fuzz.token_sort_ratio(key, candidate.key)
+                if score >= self.threshold and (score > best_score or (
+                        score == best_score and _id_order(candidate.id) < _id_order(best.id))):
+                    best, best_score = candidate, score
+        if best is None:
+            return None, NEW, 0
+        return best, FUZZY, best_score
+
+    def resolve(self, name, first_name=None, age=None, employee_id=None, details=()):
+        """
+        Identité d'une personne : la fiche connue qui lui correspond (voir match), sinon une
+        nouvelle fiche : son identifiant s'il est libre, sinon (ligne sans identifiant ou identifiant
+        déjà pris par une autre personne) le plus grand identifiant entier + 1.
+        Les détails sont retenus pour confirmer les fiches suivantes. Retourne (identité, statut, score).
+        """
+        key, age, details = normalize_name(name, first_name), _age(age), _details(details)
+        employee_id = _employee_id(employee_id)
+        identity, status, score = self._match(key, age, employee_id, details)
+        if identity is None:
+            if employee_id is None or self._identity(employee_id) is not None:
+                employee_id = self.next_id
+            identity = Identity(employee_id, name, key, age)
+            self._register(identity)
+        if details:
+            self._details.setdefault(identity.id, set()).update(details)
+        return identity, status, score
+
+    def _register(self, identity):
+        self._identities.append(identity)
+        self._by_id[identity.id] = identity
+        if isinstance(identity.id, int):
+            self.next_id = max(self.next_id, identity.id + 1)
+        if identity.key:
+            self._exact.setdefault((identity.key, identity.age), identity)
+            for block_key in _block_keys(identity.key):
+                self._blocks.setdefault(block_key, []).append(identity)
+
+    @profiled("identity.merge", rows=lambda self, data, *args, **kwargs: len(data))
+    def merge_rows(self, data):
+        """
+        Identifie les personnes des lignes reçues et retourne (lignes, bilan) : les lignes avec
+        l'identifiant et le nom de référence de chaque personne, et le bilan de la fusion dont
+        bilan.duplicated marque les lignes déjà présentes (dans l'index ou plus haut dans data).
+        Les lignes non dupliquées sont ajoutées à l'index.
+        """
+        rows = data.copy()
+        report = IdentityMergeReport(len(rows))
+        if self.columns is None:
+            self.columns = list(rows.columns)
+        if rows.empty:
+            return rows, report
+
+        # Une personne reçue par combinaison distincte (identifiant, nom, prénom, âge)
+        def column(name):
+            return _column_values(rows[name]) if name in rows.columns else np.full(len(rows), None, dtype=object)
+
+        people = {}
+        person_rows = np.empty(len(rows), dtype=np.int64)
+        for i, person in enumerate(zip(column('ID'), column('Nom'), column('Prénom'), column('Âge'))):
+            person_rows[i] = people.setdefault(person, len(people))
+
+        # Valeurs de confirmation (diplômes, institutions) de toutes les lignes de chaque personne
+        person_details = [set() for _ in people]
+        for name in CORROBORATING_COLUMNS:
+            if name in rows.columns:
+                for i, value in zip(person_rows, column(name)):
+                    if value is not None:
+                        person_details[i].add((name, value))
+
+        identities = []
+        for (employee_id, name, first_name, age), details in zip(people, person_details):
+            identity, status, score = self.resolve(name, first_name, age, employee_id, details)
+            identities.append(identity)
+            if status == NEW:
+                report.new.append(identity)
+            elif status == EXACT:
+                report.exact.append((name, identity))
+            else:
+                report.fuzzy.append((name, identity, score))
+
+        # Identifiants entiers (colonne entière) ou texte conservés tels quels (colonne objet)
+        ids = [identity.id for identity in identities]
+        ids = np.array(ids, dtype=np.int64 if all(isinstance(i, int) for i in ids) else object)[person_rows]
+        if 'ID' in rows.columns:
+            rows['ID'] = ids
+        else:
+            rows.insert(0, 'ID', ids)
+        # Nom de référence pour les personnes reconnues sous un autre nom (casse, accents, faute de frappe)
+        renamed = np.array([identity.name != person[1] for identity, person in zip(identities, people)])[person_rows]
+        if renamed.any():
+            names = np.empty(len(identities), dtype=object)
+            names[:] = [identity.name for identity in identities]
+            rows.loc[renamed, 'Nom'] = names[person_rows[renamed]]
+
+        # Lignes comparées sur les colonnes de la première table indexée
+        values = [column(name) for name in self.columns]
+        for i, row in enumerate(zip(*values)):
+            if self._row_known(row):
+                report.duplicated[i] = True
+            else:
+                self._rows.add(row)
+        return rows, report
+
+
+# Fonction pour dédoublonner une table d'employés (identifiants et noms de référence, lignes en double retirées)
+def deduplicate_employees(data, threshold=MATCH_THRESHOLD):
+    rows, report = IdentityIndex(threshold).merge_rows(data)
+    return rows[~report.duplicated].reset_index(drop=True), report
+
+
+def main():
+    from recommendation_core import read_employee_table
+
+    parser = argparse.ArgumentParser(description="Dédoublonnage des employés d'une table (identifiants stables).")
+    parser.add_argument("employees", help="Fichier (CSV, TSV, Excel, Parquet) ou répertoire de classeurs des employés")
+    parser.add_argument("-o", "--output", default=None, help="Fichier CSV ou Parquet de sortie")
+    parser.add_argument("--threshold", type=int, default=MATCH_THRESHOLD,
+                        help="Score minimal (0 à 100) de correspondance approchée des noms")
+    args = parser.parse_args()
+
+    data, report = deduplicate_employees(read_employee_table(args.employees), args.threshold)
+    print(f"{len(report.new)} personne(s), {report.duplicates} ligne(s) en double retirée(s)")
+    for name, identity, score in report.fuzzy:
+        print(f"{name} -> {identity.name} (ID {identity.id}, score {score})")
+    if args.output:
+        if os.path.splitext(args.output)[1].lower() == ".parquet":
+            data.to_parquet(args.output, index=False)
+        else:
+            data.to_csv(args.output, index=False)
+        print(f"{len(data)} ligne(s) écrite(s) dans {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,198 @@
+import functools
+import json
+import os
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone
+
+import pandas as pd
+
+# Activation par variable d'environnement : TPE_PROFILE=1 (temps et mémoire) ou TPE_PROFILE=time (temps seul)
+PROFILE_MODE = os.environ.get("TPE_PROFILE", "").strip().lower()
+PROFILING_ENABLED = PROFILE_MODE not in ("", "0", "false", "no")
+TRACK_MEMORY = PROFILE_MODE != "time"
+
+# Fichier JSON-lines des mesures (une ligne par exécution instrumentée)
+DEFAULT_PROFILE_LOG = os.environ.get("TPE_PROFILE_LOG", os.path.join(".cache", "profile.jsonl"))
+
+# Profileur de l'exécution en cours (propre à chaque thread : une session Streamlit, une requête)
+_active_profiler = ContextVar("active_profiler", default=None)
+_log_lock = threading.Lock()
+
+
+class StageMeasure:
+    """Mesure d'un appel d'étape en cours : le nombre de lignes peut être renseigné pendant l'étape."""
+
+    __slots__ = ("rows",)
+
+    def __init__(self, rows=None):
+        self.rows = rows
+
+
+class _StageStats:
+    def __init__(self):
+        self.calls = 0
+        self.wall = 0.0
+        self.rows = 0
+        self.peak_memory = 0
+
+
+class Profiler:
+    """
+    Mesures par étape d'une exécution d'un pipeline : temps écoulé, nombre d'appels, lignes traitées
+    et pic de mémoire Python (tracemalloc) au-dessus du niveau d'entrée de l'étape.
+    Le temps d'une étape inclut celui de ses sous-étapes. tracemalloc étant global au processus,
+    les pics de deux exécutions simultanées se confondent.
+    """
+
+    def __init__(self, pipeline, memory=TRACK_MEMORY):
+        self.pipeline = pipeline
+        self.memory = memory
+        self.stages = {}
+        self.wall = 0.0
+        self._open = []  # [mémoire à l'entrée, pic observé] des étapes ouvertes
+
+    @contextmanager
+    def activate(self):
+        token = _active_profiler.set(self)
+        started_tracing = self.memory and not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start()
+        start = time.perf_counter()
+        try:
+            yield self
+        finally:
+            self.wall += time.perf_counter() - start
+            _active_profiler.reset(token)
+            if started_tracing:
+                tracemalloc.stop()
+
+    # Mémoire courante ; le pic depuis la dernière observation est reporté sur les étapes ouvertes
+    def _observe_memory(self):
+        if not (self.memory and tracemalloc.is_tracing()):
+            return 0
+        current, peak = tracemalloc.get_traced_memory()
+        for frame in self._open:
+            frame[1] = max(frame[1], peak)
+        tracemalloc.reset_peak()
+        return current
+
+    @contextmanager
+    def stage(self, name, rows=None):
+        measure = StageMeasure(rows)
+        current = self._observe_memory()
+        frame = [current, current]
+        self._open.append(frame)
+        start = time.perf_counter()
+        try:
+            yield measure
+        finally:
+            wall = time.perf_counter() - start
+            self._observe_memory()
+            self._open.remove(frame)
+            stats = self.stages.setdefault(name, _StageStats())
+            stats.calls += 1
+            stats.wall += wall
+            stats.rows += measure.rows or 0
+            stats.peak_memory = max(stats.peak_memory, frame[1] - frame[0])
+
+    # Ajout de mesures faites ailleurs (dans un processus d'analyse, par exemple)
+    def merge(self, records, prefix=""):
+        for record in records or []:
+            stats = self.stages.setdefault(prefix + record["stage"], _StageStats())
+            stats.calls += record["calls"]
+            stats.wall += record["wall_ms"] / 1000
+            stats.rows += record["rows"]
+            stats.peak_memory = max(stats.peak_memory, record["peak_memory_kb"] * 1024)
+
+    def records(self):
+        return [
+            {"stage": name, "calls": stats.calls, "wall_ms": round(stats.wall * 1000, 3), "rows": stats.rows,
+             "peak_memory_kb": round(stats.peak_memory / 1024, 1)}
+            for name, stats in self.stages.items()
+        ]
+
+    def to_frame(self):
+        return pd.DataFrame(self.records(), columns=["stage", "calls", "wall_ms", "rows", "peak_memory_kb"])
+
+    # Ajout d'une ligne JSON décrivant l'exécution au fichier des mesures
+    def write(self, path=DEFAULT_PROFILE_LOG, **context):
+        record = {
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="milliseconds"),
+            "pipeline": self.pipeline,
+            "pid": os.getpid(),
+            "wall_ms": round(self.wall * 1000, 3),
+            "memory": self.memory,
+            **context,
+            "stages": self.records()
+        }
+        try:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with _log_lock, open(path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        except OSError:
+            # Le journal des mesures est facultatif : une erreur d'écriture ne doit pas bloquer le pipeline
+            pass
+        return record
+
+
+# Profileur actif dans le contexte courant (None si l'instrumentation est désactivée)
+def active_profiler():
+    return _active_profiler.get()
+
+
+# Mesure d'une étape par le profileur actif (sans effet s'il n'y en a pas)
+@contextmanager
+def stage(name, rows=None):
+    profiler = _active_profiler.get()
+    if profiler is None:
+        yield StageMeasure(rows)
+        return
+    with profiler.stage(name, rows) as measure:
+        yield measure
+
+
+def profiled(name, rows=None):
+    """
+    Décorateur : chaque appel de la fonction est une étape du profileur actif.
+    rows : fonction des arguments de l'appel donnant le nombre de lignes traitées.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            profiler = _active_profiler.get()
+            if profiler is None:
+                return func(*args, **kwargs)
+            with profiler.stage(name, rows(*args, **kwargs) if rows else None):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+# Ajout au profileur actif de mesures faites ailleurs
+def merge_stages(records, prefix=""):
+    profiler = _active_profiler.get()
+    if profiler is not None and records:
+        profiler.merge(records, prefix)
+
+
+@contextmanager
+def profiled_run(pipeline, enabled=PROFILING_ENABLED, log_path=DEFAULT_PROFILE_LOG, memory=TRACK_MEMORY, **context):
+    """
+    Exécution instrumentée d'un pipeline : fournit le profileur (None si désactivé) et ajoute
+    la ligne de mesures au fichier JSON-lines à la fin, même si l'exécution est interrompue.
+    """
+    if not enabled:
+        yield None
+        return
+    profiler = Profiler(pipeline, memory)
+    try:
+        with profiler.activate():
+            yield profiler
+    finally:
+        profiler.write(log_path, **context)
@@ -0,0 +1,243 @@
+import multiprocessing
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from cv_pipeline import build_employee_row, clean_sections, segment_text_into_sections
+from instrumentation import Profiler
+from pdf_cache import content_hash, extract_pdf_text
+from project_analysis import extract_pdf_key_information
+
+# Nombre de processus d'analyse par défaut (variable d'environnement, sinon nombre de CPU)
+DEFAULT_WORKERS = int(os.environ.get("PARSE_WORKERS", "0")) or None
+
+# États d'une tâche
+PENDING = "en attente"
+RUNNING = "en cours"
+DONE = "terminée"
+FAILED = "échec"
+
+# Part de la progression d'un CV consacrée à l'extraction du texte (le reste : segmentation, nettoyage)
+_EXTRACTION_SHARE = 0.8
+
+# File de progression partagée avec le processus principal (définie dans chaque processus du pool)
+_progress_queue = None
+
+
+class JobQueueFull(Exception):
+    """Trop de tâches en attente ou en cours : la soumission est refusée."""
+
+
+# Initialisation d'un processus du pool
+def _init_worker(progress_queue):
+    global _progress_queue
+    _progress_queue = progress_queue
+
+
+# Envoi de l'étape et de la progression (0 à 1) d'une tâche au processus principal
+def _report(job_id, stage, fraction):
+    if _progress_queue is not None:
+        _progress_queue.put((job_id, stage, fraction))
+
+
+# Analyse d'un CV PDF : extraction du texte, segmentation et nettoyage -> ligne employé
+def _parse_cv(job_id, data):
+    text = extract_pdf_text(data, progress=lambda page, pages: _report(
+        job_id, "extraction", _EXTRACTION_SHARE * page / pages))
+    if not text.strip():
+        raise ValueError("aucun texte extrait du PDF")
+    _report(job_id, "segmentation", 0.85)
+    sections, _ = segment_text_into_sections(text)
+    _report(job_id, "nettoyage", 0.95)
+    return build_employee_row(clean_sections(sections))
+
+
+# Analyse d'un PDF de projet : informations clés lues page par page
+def _parse_project(job_id, data, sections=None):
+    return extract_pdf_key_information(data, sections, progress=lambda page, pages: _report(
+        job_id, "extraction", page / pages))
+
+
+# Types de tâches acceptés
+PARSERS = {
+    "cv": _parse_cv,
+    "project": _parse_project
+}
+
+
+# Exécution d'une tâche dans un processus du pool : (résultat, mesures des étapes si profile)
+def _run_job(job_id, kind, data, options, profile=False):
+    _report(job_id, "démarrage", 0.0)
+    if not profile:
+        return PARSERS[kind](job_id, data, **options), None
+    profiler = Profiler(f"job.{kind}")
+    with profiler.activate():
+        result = PARSERS[kind](job_id, data, **options)
+    return result, profiler.records()
+
+
+class ParseJob:
+    """État d'une tâche d'analyse : étape, progression (0 à 1), puis résultat ou erreur."""
+
+    def __init__(self, job_id, kind):
+        self.id = job_id
+        self.kind = kind
+        self.status = PENDING
+        self.stage = ""
+        self.progress = 0.0
+        self.result = None
+        self.error = None
+        self.stages = None
+        self.submitted = time.time()
+        self.finished = None
+
+    @property
+    def done(self):
+        return self.status in (DONE, FAILED)
+
+    def __repr__(self):
+        return f"ParseJob({self.id!r}, {self.status!r}, progress={self.progress:.0%})"
+
+
+class ParseJobQueue:
+    """
+    File locale de tâches d'analyse (CV, PDF de projets) servie par un pool de processus.
+    L'appelant soumet le contenu d'un fichier et interroge l'état de la tâche par son identifiant
+    au lieu d'attendre. Une même soumission (même type, même contenu, mêmes options) renvoie la
+    tâche existante. La mémoire est bornée : au plus max_pending tâches en attente ou en cours
+    (leurs contenus), et au plus max_finished résultats conservés (les plus anciens sont oubliés).
+    """
+
+    def __init__(self, workers=DEFAULT_WORKERS, max_pending=64, max_finished=256):
+        self.workers = workers or os.cpu_count() or 1
+        self.max_pending = max_pending
+        self.max_finished = max_finished
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+        self._progress = multiprocessing.get_context().Queue()
+        self._executor = self._new_executor()
+        self._listener = threading.Thread(target=self._listen, daemon=True)
+        self._listener.start()
+
+    def _new_executor(self):
+        return ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker, initargs=(self._progress,))
+
+    # Réception des progressions envoyées par les processus du pool
+    def _listen(self):
+        while True:
+            try:
+                message = self._progress.get()
+            except (EOFError, OSError):
+                # File fermée à l'arrêt de l'interpréteur
+                return
+            if message is None:
+                return
+            job_id, stage, fraction = message
+            with self._lock:
+                job = self._jobs.get(job_id)
+                if job is not None and not job.done:
+                    job.status = RUNNING
+                    job.stage = stage
+                    job.progress = max(job.progress, fraction)
+
+    def _finish(self, job, future):
+        with self._lock:
+            try:
+                job.result, job.stages = future.result()
+                job.status = DONE
+                job.progress = 1.0
+            except Exception as e:
+                job.error = f"{type(e).__name__}: {e}"
+                job.status = FAILED
+            job.stage = job.status
+            job.finished = time.time()
+            self._evict_finished()
+
+    def _evict_finished(self):
+        finished = [job_id for job_id, job in self._jobs.items() if job.done]
+        for job_id in finished[:max(len(finished) - self.max_finished, 0)]:
+            del self._jobs[job_id]
+
+    def pending(self):
+        with self._lock:
+            return sum(not job.done for job in self._jobs.values())
+
+    def submit(self, kind, data, key=None, profile=False, force=False, **options):
+        """
+        Soumet l'analyse d'un fichier (contenu en octets) et retourne l'identifiant de la tâche.
+        key : empreinte du contenu si déjà calculée ; profile : mesurer les étapes de l'analyse.
+        Une tâche en échec n'est relancée qu'avec force=True (nouvel essai demandé par l'utilisateur).
+        Lève JobQueueFull si la file est pleine.
+        """
+        if kind not in PARSERS:
+            raise ValueError(f"Type de tâche inconnu : {kind}")
+        job_id = f"{kind}-{key or content_hash(data)}"
+        if options:
+            job_id = f"{job_id}-{content_hash(repr(sorted(options.items())).encode('utf-8'))[:8]}"
+
+        with self._lock:
+            previous = self._jobs.get(job_id)
+            if previous is not None and (previous.status != FAILED or not force):
+                return job_id
+            if sum(not job.done for job in self._jobs.values()) >= self.max_pending:
+                raise JobQueueFull(f"{self.max_pending} analyses déjà en attente ou en cours")
+            job = ParseJob(job_id, kind)
+            self._jobs[job_id] = job
+            self._jobs.move_to_end(job_id)
+
+        try:
+            try:
+                future = self._executor.submit(_run_job, job_id, kind, data, options, profile)
+            except BrokenProcessPool:
+                # Un processus du pool s'est arrêté brutalement : nouveau pool pour les tâches suivantes
+                self._executor = self._new_executor()
+                future = self._executor.submit(_run_job, job_id, kind, data, options, profile)
+        except Exception:
+            # Tâche jamais lancée : elle ne reste pas en attente (ni comptée dans max_pending)
+            with self._lock:
+                if self._jobs.get(job_id) is job:
+                    if previous is not None:
+                        self._jobs[job_id] = previous
+                    else:
+                        del self._jobs[job_id]
+            raise
+        future.add_done_callback(lambda done: self._finish(job, done))
+        return job_id
+
+    # État d'une tâche (None si elle est inconnue ou déjà oubliée)
+    def status(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    # Mesures des étapes d'une tâche terminée, remises une seule fois (au premier demandeur)
+    def take_stages(self, job_id):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or not job.done:
+                return None
+            stages, job.stages = job.stages, None
+            return stages
+
+    def wait(self, job_ids, timeout=None, interval=0.05):
+        """Attend la fin des tâches (ou l'expiration du délai) et retourne leurs états."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            jobs = [self.status(job_id) for job_id in job_ids]
+            if all(job is None or job.done for job in jobs):
+                return jobs
+            if deadline is not None and time.monotonic() >= deadline:
+                return jobs
+            time.sleep(interval)
+
+    def shutdown(self, wait=True):
+        self._executor.shutdown(wait=wait, cancel_futures=not wait)
+        self._progress.put(None)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.shutdown()
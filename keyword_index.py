@@ -0,0 +1,191 @@
+from bisect import bisect_right
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from instrumentation import profiled
+from token_vocabulary import encode_columns
+
+# Colonnes indexées par catégorie et pondérations associées
+CATEGORY_COLUMNS = {
+    'skills': 'Compétence',
+    'activities': 'Activity',
+    'education': 'Institution',
+    'training': 'Diplôme'
+}
+
+CATEGORY_WEIGHTS = {
+    'skills': 3,
+    'activities': 2,
+    'education': 1,
+    'training': 1
+}
+
+# Technologies qui donnent un bonus lorsqu'elles apparaissent dans les compétences
+TECH_KEYWORDS = ['python', 'java', 'c++', 'sql', 'machine learning', 'django']
+
+# Séparateur entre les valeurs distinctes du texte concaténé (ne peut pas apparaître dans un mot-clé)
+_SEPARATOR = '\x00'
+
+# Nombre maximal de scores (projets × employés) matérialisés à la fois lors d'un calcul par lot
+_BATCH_BLOCK_CELLS = 1 << 23
+
+# Nombre maximal de termes mémorisés par catégorie (borne la mémoire d'un index servi longtemps)
+_MATCH_CACHE_SIZE = 4096
+
+
+# Top-N des lignes à score positif (score décroissant, à égalité par ordre d'origine),
+# complété par les premières lignes à score nul
+def _top_rows(normalized, positive, top_n):
+    if len(positive) > top_n:
+        threshold = -np.partition(-normalized[positive], top_n - 1)[top_n - 1]
+        positive = positive[normalized[positive] >= threshold]
+    order = positive[np.lexsort((positive, -normalized[positive]))][:top_n]
+    if len(order) < top_n:
+        zero_rows = np.setdiff1d(np.arange(min(len(normalized), top_n + len(positive))), positive, assume_unique=True)
+        order = np.concatenate((order, zero_rows[:top_n - len(order)]))
+    return order.astype(np.int64)
+
+
+class _CategoryPostings:
+    """
+    Listes de postings d'une catégorie : chaque valeur distincte (en minuscules) pointe vers
+    les lignes qui la contiennent. La recherche de sous-chaînes ne parcourt que le vocabulaire
+    distinct, concaténé en un seul texte, puis se résout en lignes via les postings.
+    Construites à partir de la colonne encodée par dictionnaire (mise en minuscules une fois par
+    valeur distincte).
+    """
+
+    def __init__(self, encoded):
+        codes, self.values = encoded.lowered_codes()
+        self.text = _SEPARATOR.join(self.values)
+        self.offsets = np.cumsum([0] + [len(v) + 1 for v in self.values[:-1]]).tolist() if self.values else []
+
+        # Postings au format CSR : lignes triées par valeur distincte
+        self.rows = np.argsort(codes, kind='stable')
+        self.indptr = np.concatenate(([0], np.cumsum(np.bincount(codes, minlength=len(self.values)))))
+        self._cache = {}
+
+    # Identifiants des valeurs distinctes contenant le terme (recherche en C via str.find)
+    def matching_values(self, term):
+        # Une seule lecture du cache : un autre fil peut le vider entre un test et une lecture
+        cached = self._cache.get(term)
+        if cached is not None:
+            return cached
+        matches = []
+        if _SEPARATOR not in term:
+            start = self.text.find(term)
+            while start != -1:
+                value_id = bisect_right(self.offsets, start) - 1
+                matches.append(value_id)
+                # On passe directement à la valeur suivante
+                next_value = self.offsets[value_id + 1] if value_id + 1 < len(self.offsets) else len(self.text)
+                start = self.text.find(term, next_value)
+        if len(self._cache) >= _MATCH_CACHE_SIZE:
+            self._cache.clear()
+        self._cache[term] = matches
+        return matches
+
+    # Lignes contenant le terme
+    def matching_rows(self, term):
+        value_ids = self.matching_values(term)
+        if not value_ids:
+            return np.empty(0, dtype=np.int64)
+        return np.concatenate([self.rows[self.indptr[v]:self.indptr[v + 1]] for v in value_ids])
+
+
+class EmployeeKeywordIndex:
+    """
+    Index inversé des employés par catégorie (compétences, activités, éducation, formations).
+    Une requête ne touche que les postings des valeurs contenant les mots-clés et renvoie les
+    mêmes scores pondérés que le parcours complet (3/2/1/1 plus le bonus technologies).
+    """
+
+    @profiled("keyword_index.build", rows=lambda self, data, *args, **kwargs: len(data))
+    def __init__(self, data, columns=None):
+        self.columns = dict(CATEGORY_COLUMNS, **(columns or {}))
+        self.size = len(data)
+        encoded = encode_columns(data, self.columns.values())
+        self.postings = {
+            category: _CategoryPostings(encoded[column]) for category, column in self.columns.items()
+        }
+
+        # Bonus technologies précalculé par valeur distincte de compétences, puis par ligne
+        skills = self.postings['skills']
+        self.tech_bonus = np.zeros(self.size, dtype=np.int64)
+        for tech in TECH_KEYWORDS:
+            self.tech_bonus[skills.matching_rows(tech)] += CATEGORY_WEIGHTS['skills']
+        self.tech_rows = np.flatnonzero(self.tech_bonus)
+
+    # Scores normalisés de toutes les lignes et lignes ayant un score non nul
+    def scores(self, required_keywords):
+        keywords = [word.strip().lower() for word in required_keywords.split()]
+        counts = pd.Series(keywords, dtype=object).value_counts(sort=False) if keywords else {}
+
+        score = self.tech_bonus.copy()
+        touched = [self.tech_rows]
+        for keyword, count in counts.items():
+            for category, postings in self.postings.items():
+                rows = postings.matching_rows(keyword)
+                if len(rows):
+                    score[rows] += CATEGORY_WEIGHTS[category] * count
+                    touched.append(rows)
+
+        normalized = score / max(len(keywords), 1)
+        return np.maximum(normalized, 0), np.unique(np.concatenate(touched))
+
+    # Matrice creuse mots-clés × employés des poids de correspondance (3/2/1/1 par catégorie)
+    def keyword_matrix(self, keywords):
+        rows, columns, weights = [], [], []
+        for keyword_id, keyword in enumerate(keywords):
+            for category, postings in self.postings.items():
+                matched = postings.matching_rows(keyword)
+                if len(matched):
+                    rows.append(np.full(len(matched), keyword_id, dtype=np.int64))
+                    columns.append(matched)
+                    weights.append(np.full(len(matched), CATEGORY_WEIGHTS[category], dtype=np.float64))
+        if not rows:
+            return sparse.csr_matrix((len(keywords), self.size), dtype=np.float64)
+        return sparse.csr_matrix(
+            (np.concatenate(weights), (np.concatenate(rows), np.concatenate(columns))),
+            shape=(len(keywords), self.size)
+        )
+
+    @profiled("keyword_index.top_n_many", rows=lambda self, required_keywords_list, *args, **kwargs: len(required_keywords_list))
+    def top_n_many(self, required_keywords_list, top_n=5):
+        """
+        Top-N de plusieurs requêtes en un seul passage : produit creux requêtes × mots-clés par
+        mots-clés × employés, plus le bonus technologies. Chaque requête obtient exactement le
+        résultat de top_n. Retourne une liste de couples (indices positionnels, scores).
+        """
+        queries = [[word.strip().lower() for word in keywords.split()] for keywords in required_keywords_list]
+        keyword_ids = {}
+        query_rows, query_columns = [], []
+        for query_id, keywords in enumerate(queries):
+            for keyword in keywords:
+                query_rows.append(query_id)
+                query_columns.append(keyword_ids.setdefault(keyword, len(keyword_ids)))
+        counts = sparse.csr_matrix(
+            (np.ones(len(query_rows), dtype=np.float64), (query_rows, query_columns)),
+            shape=(len(queries), len(keyword_ids))
+        )
+        product = counts @ self.keyword_matrix(list(keyword_ids))
+        lengths = np.array([max(len(keywords), 1) for keywords in queries], dtype=np.float64)
+
+        results = []
+        block = max(1, _BATCH_BLOCK_CELLS // max(self.size, 1))
+        for start in range(0, len(queries), block):
+            scores = product[start:start + block].toarray() + self.tech_bonus
+            normalized = np.maximum(scores / lengths[start:start + block, None], 0)
+            for row in normalized:
+                order = _top_rows(row, np.flatnonzero(row > 0), top_n)
+                results.append((order, row[order]))
+        return results
+
+    # Top-N des lignes (indices positionnels, scores) triées par score décroissant, à égalité par ordre d'origine
+    @profiled("keyword_index.top_n", rows=lambda self, *args, **kwargs: self.size)
+    def top_n(self, required_keywords, top_n=5):
+        normalized, touched = self.scores(required_keywords)
+        order = _top_rows(normalized, touched[normalized[touched] > 0], top_n)
+        return order, normalized[order]
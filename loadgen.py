@@ -0,0 +1,80 @@
+import argparse
+import json
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+# Requêtes par défaut de chaque point d'accès du service
+DEFAULT_PAYLOADS = {
+    "recommend-employees": {"required_skills": "Python SQL Django machine learning", "top_n": 5},
+    "recommend-activities": {
+        "person": {"Nom": "Nouvelle personne", "Compétence": "Python, SQL", "Diplôme": "Master",
+                   "Institution": "", "Activity": ""},
+        "top_n": 5
+    }
+}
+
+
+# Envoi d'une requête JSON ; retourne (latence en secondes, succès)
+def _send(url, body):
+    req = urllib.request.Request(url, data=body, headers={"Content-Type": "application/json"})
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(req) as response:
+            response.read()
+            ok = response.status == 200
+    except (urllib.error.URLError, OSError):
+        ok = False
+    return time.perf_counter() - start, ok
+
+
+def run_load(url, payload, requests=200, concurrency=8, warmup=5):
+    """
+    Envoie `requests` requêtes avec `concurrency` clients simultanés et retourne le débit,
+    les latences (p50 / p90 / p99 / max, en millisecondes) et le nombre d'erreurs.
+    """
+    body = json.dumps(payload).encode("utf-8")
+    for _ in range(warmup):
+        _send(url, body)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(lambda _: _send(url, body), range(requests)))
+    elapsed = time.perf_counter() - start
+
+    latencies = np.array([latency for latency, _ in results]) * 1000
+    return {
+        "requests": requests,
+        "concurrency": concurrency,
+        "errors": sum(not ok for _, ok in results),
+        "throughput": requests / elapsed,
+        "p50_ms": float(np.percentile(latencies, 50)),
+        "p90_ms": float(np.percentile(latencies, 90)),
+        "p99_ms": float(np.percentile(latencies, 99)),
+        "max_ms": float(latencies.max())
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Générateur de charge pour le service de recommandation.")
+    parser.add_argument("--url", default="http://127.0.0.1:8000", help="Adresse du service")
+    parser.add_argument("--endpoint", choices=sorted(DEFAULT_PAYLOADS), default="recommend-employees")
+    parser.add_argument("--payload", default=None, help="Fichier JSON de la requête (sinon requête par défaut)")
+    parser.add_argument("-n", "--requests", type=int, default=200, help="Nombre de requêtes")
+    parser.add_argument("-c", "--concurrency", type=int, default=8, help="Nombre de clients simultanés")
+    args = parser.parse_args()
+
+    if args.payload:
+        with open(args.payload, encoding="utf-8") as f:
+            payload = json.load(f)
+    else:
+        payload = DEFAULT_PAYLOADS[args.endpoint]
+    report = run_load(f"{args.url.rstrip('/')}/{args.endpoint}", payload, args.requests, args.concurrency)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,200 @@
+import hashlib
+import os
+
+import numpy as np
+from scipy import sparse
+
+from similarity import JACCARD_FEATURES
+
+# Répertoire par défaut des index LSH persistés
+DEFAULT_INDEX_DIR = os.environ.get("LSH_INDEX_DIR", os.path.join(".cache", "lsh"))
+
+# Nombre de bandes par défaut : avec 128 permutations, 64 bandes de 2 lignes gardent un rappel@5
+# d'environ 94 % sur 50 000 lignes synthétiques (environ 50 % avec 32 bandes de 4 lignes)
+DEFAULT_BANDS = 64
+
+# Nombre premier de Mersenne utilisé pour les permutations universelles
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64(0xFFFFFFFF)
+
+# Nombre de lignes traitées par bloc lors du calcul des signatures (borne la mémoire)
+_SIGNATURE_CHUNK_ROWS = 20000
+
+
+# Empreinte 32 bits stable d'un jeton (préfixé par sa caractéristique)
+def token_hash(feature, token):
+    digest = hashlib.blake2b(f"{feature}\x1f{token}".encode("utf-8", "surrogatepass"), digest_size=4).digest()
+    return int.from_bytes(digest, "little")
+
+
+class MinHashLSHIndex:
+    """
+    Index LSH par bandes de signatures MinHash des ensembles compétences / formations / activités.
+    Une requête ne parcourt que les seaux de la signature cible (coût sous-linéaire en nombre
+    d'employés) ; les candidats sont ensuite re-classés avec la formule exacte.
+    Le rappel se règle par le nombre de bandes : plus de bandes (donc moins de lignes par bande)
+    donne plus de candidats et un meilleur rappel.
+    """
+
+    def __init__(self, num_perm=128, bands=DEFAULT_BANDS, seed=1):
+        if num_perm % bands:
+            raise ValueError("num_perm doit être un multiple du nombre de bandes")
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows_per_band = num_perm // bands
+        self.seed = seed
+
+        generator = np.random.default_rng(seed)
+        self._a = generator.integers(1, 1 << 31, size=num_perm, dtype=np.uint64)
+        self._b = generator.integers(0, 1 << 32, size=num_perm, dtype=np.uint64)
+        self._band_mix = generator.integers(1, 1 << 63, size=self.rows_per_band, dtype=np.uint64) | np.uint64(1)
+
+        self.size = 0
+        self._band_keys = []    # par bande : clés de seaux triées
+        self._band_indptr = []  # par bande : bornes des seaux dans _band_rows
+        self._band_rows = []    # par bande : lignes regroupées par seau
+
+    # Valeurs de hachage permutées (jetons × permutations)
+    def _permuted(self, hashes):
+        hashes = np.asarray(hashes, dtype=np.uint64)
+        return ((hashes[:, None] * self._a[None, :] + self._b[None, :]) % _MERSENNE_PRIME) & _MAX_HASH
+
+    # Signature MinHash d'un ensemble de jetons par caractéristique
+    def signature(self, token_sets):
+        hashes = [token_hash(feature, token) for feature in JACCARD_FEATURES for token in token_sets.get(feature, ())]
+        if not hashes:
+            return np.full(self.num_perm, _MAX_HASH, dtype=np.uint64)
+        return self._permuted(hashes).min(axis=0)
+
+    # Signatures de toutes les lignes d'un moteur de similarité (par blocs de lignes)
+    def _engine_signatures(self, engine, rows):
+        blocks = []
+        for feature in JACCARD_FEATURES:
+            hashes = np.fromiter((token_hash(feature, token) for token in engine.vocabulary.tokens),
+                                 dtype=np.uint64, count=len(engine.vocabulary))
+            blocks.append((engine.matrices[feature][:rows], self._permuted(hashes)))
+
+        matrix = sparse.hstack([block for block, _ in blocks], format="csr")
+        permuted = np.vstack([values for _, values in blocks])
+        signatures = np.full((rows, self.num_perm), _MAX_HASH, dtype=np.uint64)
+        for start in range(0, rows, _SIGNATURE_CHUNK_ROWS):
+            chunk = matrix[start:start + _SIGNATURE_CHUNK_ROWS]
+            lengths = np.diff(chunk.indptr)
+            non_empty = np.flatnonzero(lengths)
+            if len(non_empty) == 0:
+                continue
+            values = permuted[chunk.indices]
+            signatures[start + non_empty] = np.minimum.reduceat(values, chunk.indptr[non_empty], axis=0)
+        return signatures
+
+    # Clés de seaux (64 bits) de chaque bande
+    def _band_hashes(self, signatures):
+        signatures = np.atleast_2d(signatures)
+        keys = np.empty((signatures.shape[0], self.bands), dtype=np.uint64)
+        for band in range(self.bands):
+            block = signatures[:, band * self.rows_per_band:(band + 1) * self.rows_per_band]
+            keys[:, band] = (block * self._band_mix[None, :]).sum(axis=1, dtype=np.uint64)
+        return keys
+
+    # Construction de l'index sur les premières lignes d'un moteur de similarité
+    def build(self, engine, rows=None):
+        rows = len(engine) if rows is None else rows
+        keys = self._band_hashes(self._engine_signatures(engine, rows))
+        self.size = rows
+        self._band_keys, self._band_indptr, self._band_rows = [], [], []
+        for band in range(self.bands):
+            order = np.argsort(keys[:, band], kind="stable")
+            unique_keys, starts = np.unique(keys[order, band], return_index=True)
+            self._band_keys.append(unique_keys)
+            self._band_indptr.append(np.append(starts, rows).astype(np.int64))
+            self._band_rows.append(order.astype(np.int64))
+        return self
+
+    # Lignes candidates partageant au moins un seau avec les ensembles de jetons cibles
+    def query(self, token_sets):
+        keys = self._band_hashes(self.signature(token_sets))[0]
+        candidates = []
+        for band in range(self.bands):
+            band_keys = self._band_keys[band]
+            position = np.searchsorted(band_keys, keys[band])
+            if position < len(band_keys) and band_keys[position] == keys[band]:
+                indptr = self._band_indptr[band]
+                candidates.append(self._band_rows[band][indptr[position]:indptr[position + 1]])
+        if not candidates:
+            return np.empty(0, dtype=np.int64)
+        return np.unique(np.concatenate(candidates))
+
+    # Candidats pour la première ligne de l'employé cible d'un moteur de similarité
+    def query_engine_row(self, engine, target_idx):
+        return self.query(engine.row_tokens(target_idx))
+
+    def save(self, path):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        arrays = {"params": np.array([self.num_perm, self.bands, self.seed, self.size], dtype=np.int64)}
+        for band in range(self.bands):
+            arrays[f"keys_{band}"] = self._band_keys[band]
+            arrays[f"indptr_{band}"] = self._band_indptr[band]
+            arrays[f"rows_{band}"] = self._band_rows[band]
+        tmp_path = f"{path}.{os.getpid()}.tmp.npz"
+        np.savez(tmp_path, **arrays)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as arrays:
+            num_perm, bands, seed, size = (int(value) for value in arrays["params"])
+            index = cls(num_perm=num_perm, bands=bands, seed=seed)
+            index.size = size
+            index._band_keys = [arrays[f"keys_{band}"] for band in range(bands)]
+            index._band_indptr = [arrays[f"indptr_{band}"] for band in range(bands)]
+            index._band_rows = [arrays[f"rows_{band}"] for band in range(bands)]
+        return index
+
+
+# Chargement de l'index persisté pour un jeu de données, ou construction et sauvegarde
+def load_or_build_index(dataset_key, engine, rows=None, num_perm=128, bands=DEFAULT_BANDS, directory=DEFAULT_INDEX_DIR):
+    path = os.path.join(directory, f"{dataset_key}-{num_perm}-{bands}.npz")
+    if os.path.exists(path):
+        try:
+            return MinHashLSHIndex.load(path)
+        except (OSError, KeyError, ValueError):
+            pass
+    index = MinHashLSHIndex(num_perm=num_perm, bands=bands).build(engine, rows)
+    try:
+        index.save(path)
+    except OSError:
+        pass
+    return index
+
+
+# Top-N approximatif : candidats LSH (plus les lignes hors index) re-classés avec la formule exacte
+def approximate_top_similar(engine, index, target_employee, weights, top_n):
+    target_idx = engine.target_index(target_employee)
+    candidates = index.query_engine_row(engine, target_idx)
+    extra_rows = np.arange(index.size, len(engine), dtype=np.int64)
+    rows = np.union1d(candidates, extra_rows)
+    return engine.top_similar(target_employee, weights, top_n, rows=rows)
+
+
+# Top-N approximatif avec des lignes supplémentaires (nouvelle personne) hors du moteur : candidats LSH de
+# la cible dans la base, puis re-classement exact de ces candidats et des lignes supplémentaires
+def approximate_top_similar_with(engine, index, extra_data, target_employee, weights, top_n):
+    try:
+        token_sets = engine.row_tokens(engine.target_index(target_employee))
+    except KeyError:
+        extra_matches = np.flatnonzero(extra_data[engine.columns['employee']].to_numpy() == target_employee)
+        if len(extra_matches) == 0:
+            raise
+        token_sets = engine.extra_row_tokens(extra_data.iloc[extra_matches[:1]])[0]
+    candidates = index.query(token_sets)
+    extra_rows = np.arange(index.size, len(engine), dtype=np.int64)
+    rows = np.union1d(candidates, extra_rows)
+    return engine.top_similar_with(extra_data, target_employee, weights, top_n, rows=rows)
+
+
+# Rappel@N du mode approximatif par rapport au mode exact
+def recall_at_n(exact, approximate):
+    if not exact:
+        return 1.0
+    approximate_names = {employee for employee, _ in approximate}
+    return sum(1 for employee, _ in exact if employee in approximate_names) / len(exact)
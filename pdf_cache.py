@@ -0,0 +1,179 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+
+import fitz  # PyMuPDF
+
+from instrumentation import stage
+
+# Répertoire par défaut du cache disque des textes extraits
+DEFAULT_CACHE_DIR = os.environ.get("PDF_TEXT_CACHE_DIR", os.path.join(".cache", "pdf_text"))
+
+
+# Taille des blocs lus pour calculer l'empreinte d'un fichier sur disque
+_HASH_CHUNK_SIZE = 1 << 20
+
+
+# Fonction pour calculer l'empreinte du contenu d'un fichier
+def content_hash(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+# Empreinte d'un fichier sur disque lue par blocs (même valeur que content_hash de son contenu,
+# sans charger le fichier en mémoire)
+def file_hash(path, chunk_size=_HASH_CHUNK_SIZE):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class PdfTextCache:
+    """
+    Cache LRU borné des textes extraits des PDF, indexé par empreinte du contenu.
+    Un niveau en mémoire (OrderedDict) devant un niveau sur disque (un fichier texte par entrée,
+    l'horodatage de modification servant d'ordre d'éviction).
+    """
+
+    def __init__(self, directory=DEFAULT_CACHE_DIR, max_memory_entries=64, max_disk_entries=512):
+        self.directory = directory
+        self.max_memory_entries = max_memory_entries
+        self.max_disk_entries = max_disk_entries
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.txt")
+
+    def get(self, key):
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                return self._memory[key]
+
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8", errors="surrogatepass", newline="") as f:
+                text = f.read()
+            os.utime(path)
+        except OSError:
+            return None
+        self._remember(key, text)
+        return text
+
+    def put(self, key, text):
+        self._remember(key, text)
+        if self.max_disk_entries <= 0:
+            return
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            tmp_path = f"{self._path(key)}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8", errors="surrogatepass", newline="") as f:
+                f.write(text)
+            os.replace(tmp_path, self._path(key))
+            self._evict_disk()
+        except OSError:
+            # Le cache disque est facultatif : une erreur d'écriture ne doit pas bloquer l'extraction
+            pass
+
+    def _remember(self, key, text):
+        with self._lock:
+            self._memory[key] = text
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_memory_entries:
+                self._memory.popitem(last=False)
+
+    def _evict_disk(self):
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(".txt"):
+                entries.append((entry.stat().st_mtime, entry.path))
+        if len(entries) <= self.max_disk_entries:
+            return
+        entries.sort()
+        for _, path in entries[:len(entries) - self.max_disk_entries]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+        if os.path.isdir(self.directory):
+            for entry in os.scandir(self.directory):
+                if entry.name.endswith(".txt"):
+                    os.remove(entry.path)
+
+
+# Cache partagé par les deux applications
+default_cache = PdfTextCache()
+
+
+# Fonction pour lire le contenu d'une source PDF (chemin, octets ou fichier téléversé)
+def read_pdf_bytes(source):
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return bytes(source)
+    if hasattr(source, "getvalue"):
+        return source.getvalue()
+    with open(source, "rb") as f:
+        return f.read()
+
+
+# Fonction pour extraire le texte d'un PDF directement depuis la mémoire, sans cache
+def extract_pdf_text_uncached(data, page_separator="", progress=None):
+    with stage("pdf.extraction") as measure:
+        if progress is not None:
+            pages = list(iter_pdf_pages(data, page_separator, progress))
+            measure.rows = len(pages)
+            return "".join(pages)
+        with fitz.open(stream=data, filetype="pdf") as doc:
+            measure.rows = doc.page_count
+            return "".join(page.get_text() + page_separator for page in doc)
+
+
+# Générateur des textes de pages d'un PDF : une page à la fois, le document est fermé dès que
+# le consommateur s'arrête (un chemin est ouvert sans charger tout le fichier en mémoire).
+# progress(page, pages) est appelé après chaque page lue
+def iter_pdf_pages(source, page_separator="", progress=None):
+    if isinstance(source, (bytes, bytearray, memoryview)) or hasattr(source, "getvalue"):
+        doc = fitz.open(stream=read_pdf_bytes(source), filetype="pdf")
+    else:
+        doc = fitz.open(source)
+    with doc:
+        for number, page in enumerate(doc, start=1):
+            text = page.get_text() + page_separator
+            if progress is not None:
+                progress(number, doc.page_count)
+            yield text
+
+
+# Clé de cache du texte d'un PDF pour un séparateur de pages donné
+def _text_key(data, page_separator, key=None):
+    key = key or content_hash(data)
+    if page_separator:
+        key = f"{key}-{content_hash(page_separator.encode('utf-8'))[:8]}"
+    return key
+
+
+# Texte complet déjà en cache pour cette source, ou None (un chemin est haché par blocs, sans être chargé)
+def cached_pdf_text(source, page_separator="", cache=None):
+    cache = default_cache if cache is None else cache
+    if isinstance(source, (bytes, bytearray, memoryview)) or hasattr(source, "getvalue"):
+        return cache.get(_text_key(read_pdf_bytes(source), page_separator))
+    return cache.get(_text_key(None, page_separator, key=file_hash(source)))
+
+
+# Fonction pour extraire le texte d'un PDF avec cache par empreinte du contenu
+def extract_pdf_text(source, page_separator="", cache=None, progress=None):
+    cache = default_cache if cache is None else cache
+    data = read_pdf_bytes(source)
+    key = _text_key(data, page_separator)
+
+    text = cache.get(key)
+    if text is None:
+        text = extract_pdf_text_uncached(data, page_separator, progress)
+        cache.put(key, text)
+    return text
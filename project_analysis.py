@@ -0,0 +1,193 @@
+import os
+import re
+
+import pandas as pd
+
+from dataset_loader import load_dataset_dir
+from instrumentation import profiled
+from keyword_index import EmployeeKeywordIndex
+from pdf_cache import cached_pdf_text, iter_pdf_pages
+
+# Section de la description d'un projet contenant les mots-clés recherchés
+REQUIRED_SKILLS_SECTION = "Compétences requises"
+
+
+# Sections de la description d'un projet : titre et mots qui terminent la section
+# (la dernière section court jusqu'à la fin du texte)
+PROJECT_SECTIONS = [
+    ("Nom du projet", "nom du projet", ["objectifs", "compétences", "détails"]),
+    ("Objectifs", "objectifs", ["compétences", "détails"]),
+    ("Compétences requises", "compétences requises", ["détails"]),
+    ("Détails supplémentaires", "détails supplémentaires", [])
+]
+
+
+# Fonction pour extraire les informations clés de la description du projet
+def extract_key_information(project_description):
+    key_information = {}
+    sections = [
+        (section, rf"(?i){start}[:\s]*(.*?)(?={'|'.join(terminators + ['$'])})")
+        for section, start, terminators in PROJECT_SECTIONS
+    ]
+
+    for section, pattern in sections:
+        match = re.search(pattern, project_description, re.DOTALL)
+        if match:
+            key_information[section] = match.group(1).strip()
+
+    return key_information
+
+
+_SEPARATOR_REGEX = re.compile(r"[:\s]*")
+
+
+class _SectionScanner:
+    """
+    Recherche incrémentale d'une section dans un texte reçu par morceaux, avec le même résultat
+    que l'expression régulière de extract_key_information sur le texte complet.
+    Seuls quelques caractères (la longueur du plus long mot recherché) sont gardés entre deux
+    morceaux : un mot coupé à la frontière est retrouvé au morceau suivant.
+    """
+
+    def __init__(self, start, terminators):
+        self.start_regex = re.compile(re.escape(start), re.IGNORECASE)
+        self.start_length = len(start)
+        self.terminator_regex = re.compile("|".join(terminators), re.IGNORECASE) if terminators else None
+        self.terminator_length = max((len(t) for t in terminators), default=0)
+        self.state = "start"
+        self.pending = ""
+        self.parts = []
+
+    @property
+    def done(self):
+        return self.state == "done"
+
+    def feed(self, chunk, eof=False):
+        text = self.pending + chunk
+        self.pending = ""
+        while True:
+            if self.state == "start":
+                match = self.start_regex.search(text)
+                if match is None:
+                    if not eof:
+                        self.pending = text[max(len(text) - self.start_length + 1, 0):]
+                    return
+                text = text[match.end():]
+                self.state = "separator"
+
+            elif self.state == "separator":
+                end = _SEPARATOR_REGEX.match(text).end()
+                if end == len(text) and not eof:
+                    return
+                text = text[end:]
+                self.state = "body"
+
+            elif self.state == "body":
+                match = self.terminator_regex.search(text) if self.terminator_regex else None
+                if match is not None and (eof or match.start() <= len(text) - self.terminator_length):
+                    self.parts.append(text[:match.start()])
+                    self.state = "done"
+                elif eof:
+                    self.parts.append(text)
+                    self.state = "done"
+                else:
+                    # Aucun terminateur ne peut commencer avant cette position
+                    safe = max(len(text) - self.terminator_length + 1, 0) if self.terminator_regex else len(text)
+                    self.parts.append(text[:safe])
+                    self.pending = text[safe:]
+                return
+
+            else:
+                return
+
+    def result(self):
+        return "".join(self.parts).strip() if self.done else None
+
+
+def scan_key_information(chunks, sections=None):
+    """
+    Informations clés d'un texte reçu par morceaux (pages d'un PDF, par exemple).
+    sections : titres des sections recherchées (toutes par défaut). La lecture s'arrête dès que
+    toutes les sections demandées sont fermées ; "Détails supplémentaires" court jusqu'à la fin.
+    Résultat identique à extract_key_information("".join(chunks)) restreint à ces sections.
+    """
+    wanted = set(sections) if sections is not None else None
+    scanners = {
+        section: _SectionScanner(start, terminators)
+        for section, start, terminators in PROJECT_SECTIONS
+        if wanted is None or section in wanted
+    }
+    for chunk in chunks:
+        for scanner in scanners.values():
+            if not scanner.done:
+                scanner.feed(chunk)
+        if all(scanner.done for scanner in scanners.values()):
+            break
+    else:
+        for scanner in scanners.values():
+            if not scanner.done:
+                scanner.feed("", eof=True)
+
+    key_information = {}
+    for section, scanner in scanners.items():
+        content = scanner.result()
+        if content is not None:
+            key_information[section] = content
+    return key_information
+
+
+# Fonction pour extraire les informations clés d'un PDF page par page (texte en cache réutilisé s'il existe)
+@profiled("pdf.key_information")
+def extract_pdf_key_information(pdf_source, sections=None, page_separator="\n", progress=None):
+    text = cached_pdf_text(pdf_source, page_separator)
+    chunks = [text] if text is not None else iter_pdf_pages(pdf_source, page_separator, progress)
+    try:
+        return scan_key_information(chunks, sections)
+    finally:
+        if hasattr(chunks, "close"):
+            chunks.close()
+
+
+# Fonction pour charger les données employés
+def load_data(filepath):
+    """
+    Charge les données depuis un fichier Excel, CSV ou TSV en fonction de son extension,
+    ou depuis un répertoire de classeurs (lecture parallèle avec cache Parquet).
+    Nettoie les valeurs manquantes.
+    """
+    file_extension = os.path.splitext(filepath)[1].lower()
+
+    if os.path.isdir(filepath):
+        data, _ = load_dataset_dir(filepath)
+    elif file_extension == '.csv':
+        data = pd.read_csv(filepath)
+    elif file_extension == '.tsv':
+        data = pd.read_csv(filepath, sep='\t')
+    elif file_extension == '.xlsx' or file_extension == '.xls':
+        data = pd.read_excel(filepath)
+    else:
+        raise ValueError(f"Format de fichier non supporté: {file_extension}")
+
+    # Suppression des lignes avec des valeurs manquantes
+    data = data.dropna()
+    return data
+
+
+# Fonction pour classer les employés selon les compétences requises (sans affichage)
+@profiled("recommend_employees", rows=lambda data, *args, **kwargs: len(data))
+def score_employees(data, required_keywords, top_n=5, index=None, vector_index=None):
+    """
+    Top-N des lignes d'employés pour un texte de compétences requises : index inversé des
+    mots-clés par défaut, ou recherche sémantique avec vector_index.
+    Retourne une liste de triplets (position de la ligne, nom, score).
+    """
+    if vector_index is not None:
+        # Correspondance sémantique : k plus proches voisins dans l'index vectoriel
+        rows, scores = vector_index.search(required_keywords, top_n)
+    else:
+        # Index inversé des mots-clés (construit à la volée s'il n'est pas fourni)
+        if index is None:
+            index = EmployeeKeywordIndex(data)
+        rows, scores = index.top_n(required_keywords, top_n)
+    names = data['Nom'].to_numpy()
+    return [(int(position), names[position], score) for position, score in zip(rows, scores)]
@@ -0,0 +1,118 @@
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from instrumentation import profiled
+from keyword_index import EmployeeKeywordIndex
+from project_analysis import REQUIRED_SKILLS_SECTION, extract_pdf_key_information, load_data, scan_key_information
+
+# Colonnes du tableau des correspondances par projet
+MATCH_COLUMNS = ["Projet", "Rang", "Nom", "Score", "Ligne"]
+
+
+# Extraction des informations clés d'un projet (texte ou PDF : chemin ou contenu en mémoire)
+def _extract_project(task):
+    name, source, sections = task
+    if isinstance(source, bytes) or str(source).lower().endswith(".pdf"):
+        # Lecture page par page, arrêtée dès que les sections demandées sont fermées
+        return name, extract_pdf_key_information(source, sections)
+    if os.path.isfile(source):
+        with open(source, encoding="utf-8") as f:
+            source = f.read()
+    return name, scan_key_information([source], sections)
+
+
+def extract_projects(sources, workers=None, sections=None):
+    """
+    Extrait en parallèle les informations clés de plusieurs projets.
+    sources : dictionnaire nom -> chemin d'un PDF ou d'un fichier texte, contenu PDF (bytes) ou texte.
+    sections : sections à extraire (toutes par défaut) ; avec les seules compétences requises,
+    la lecture d'un PDF s'arrête à la fin de cette section.
+    Retourne un dictionnaire nom -> informations clés, dans l'ordre des sources.
+    """
+    tasks = [(name, source, sections) for name, source in sources.items()]
+    if len(tasks) <= 1 or workers == 1:
+        return dict(_extract_project(task) for task in tasks)
+    with ProcessPoolExecutor(max_workers=min(workers or os.cpu_count() or 1, len(tasks))) as executor:
+        return dict(executor.map(_extract_project, tasks))
+
+
+@profiled("match_projects", rows=lambda projects, *args, **kwargs: len(projects))
+def match_projects(projects, data, top_n=5, index=None, vector_index=None):
+    """
+    Top-N des employés de chaque projet, calculé en un seul produit creux pour tout le portefeuille.
+    projects : dictionnaire nom -> informations clés (ou directement la chaîne des compétences requises).
+    Les scores et l'ordre sont ceux de recommend_employees pour chaque projet pris séparément.
+    Avec vector_index, la correspondance est sémantique (une seule recherche FAISS pour tous les projets).
+    """
+    if index is None and vector_index is None:
+        index = EmployeeKeywordIndex(data)
+
+    names = list(projects)
+    required = [
+        value if isinstance(value, str) else value.get(REQUIRED_SKILLS_SECTION, "")
+        for value in projects.values()
+    ]
+    employees = data['Nom'].to_numpy()
+    rows = []
+    if vector_index is not None:
+        results = vector_index.search_many(required, top_n)
+    else:
+        results = index.top_n_many(required, top_n)
+    for project, (positions, scores) in zip(names, results):
+        for rank, (position, score) in enumerate(zip(positions, scores), start=1):
+            rows.append((project, rank, employees[position], score, int(position)))
+    return pd.DataFrame(rows, columns=MATCH_COLUMNS)
+
+
+# Noms des projets : chemins relatifs au répertoire commun des fichiers (le nom du fichier s'ils sont
+# tous dans le même répertoire), pour que deux fichiers de même nom ne s'écrasent pas
+def project_names(paths):
+    if not paths:
+        return {}
+    root = os.path.commonpath([os.path.dirname(os.path.abspath(path)) for path in paths])
+    names = {}
+    for path in paths:
+        name = os.path.relpath(os.path.abspath(path), root)
+        if name in names:
+            raise ValueError(f"Projet donné plusieurs fois : {path}")
+        names[name] = path
+    return names
+
+
+# Fonction pour exporter le tableau des correspondances en CSV ou en Parquet
+def export_matches(matches, path):
+    if path.lower().endswith(".parquet"):
+        matches.astype({"Nom": str}).to_parquet(path, index=False)
+    else:
+        matches.to_csv(path, index=False)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Affectation par lot des employés à un portefeuille de projets.")
+    parser.add_argument("employees", help="Fichier (CSV, TSV, Excel) ou répertoire de classeurs des employés")
+    parser.add_argument("projects", nargs="+", help="Descriptions des projets (PDF ou texte)")
+    parser.add_argument("-n", "--top-n", type=int, default=5, help="Nombre d'employés recommandés par projet")
+    parser.add_argument("-w", "--workers", type=int, default=None, help="Nombre de processus d'extraction")
+    parser.add_argument("-o", "--output", default=None, help="Fichier CSV ou Parquet de sortie")
+    args = parser.parse_args()
+
+    try:
+        sources = project_names(args.projects)
+    except ValueError as e:
+        parser.error(str(e))
+
+    data = load_data(args.employees)
+    projects = extract_projects(sources, workers=args.workers, sections=[REQUIRED_SKILLS_SECTION])
+    matches = match_projects(projects, data, args.top_n)
+    if args.output:
+        export_matches(matches, args.output)
+        print(f"{len(matches)} ligne(s) écrite(s) dans {args.output}")
+    else:
+        print(matches.to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
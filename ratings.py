@@ -0,0 +1,235 @@
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+
+from instrumentation import profiled
+
+# Taille maximale d'un delta compté directement plutôt que par groupby
+SMALL_DELTA_ROWS = 256
+
+# Colonnes de la table des ratings (mêmes noms que le calcul groupby d'origine)
+RATING_COLUMNS = ['Nom', 'Activity', 'Person_Activity_Counts', 'Total_Occurrences', 'Activity_Ratio', 'Normalized_Rating']
+
+
+# Calcul du rating normalisé (0 à 5) d'une personne pour une activité
+def normalized_rating(count, total, max_count):
+    max_ratio = max_count / total
+    if max_ratio <= 0:
+        return 0
+    return int(round((count / total) / max_ratio * 5))
+
+
+def recommend_from_ratings(ratings_for, similar_employees, top_n):
+    """
+    Score des activités des voisins : produit du vecteur creux des similarités par la matrice
+    des ratings, restreint aux lignes des voisins (le coût dépend du nombre de voisins, pas de
+    la taille de la table). Les scores et l'ordre (égalités départagées par ordre d'apparition)
+    sont ceux de l'accumulation voisin par voisin.
+    """
+    activity_ids = {}
+    indices = []
+    weights = []
+    for employee, similarity in similar_employees:
+        for activity, rating in ratings_for(employee):
+            indices.append(activity_ids.setdefault(activity, len(activity_ids)))
+            weights.append(rating * similarity)
+    if not activity_ids:
+        return []
+
+    scores = np.bincount(np.asarray(indices, dtype=np.int64), weights=np.asarray(weights, dtype=np.float64),
+                         minlength=len(activity_ids))
+    activities = list(activity_ids)
+
+    # Sélection partielle du top-k : seules les activités au moins égales au k-ième score sont triées
+    if len(scores) > top_n:
+        threshold = -np.partition(-scores, top_n - 1)[top_n - 1]
+        candidates = np.flatnonzero(scores >= threshold)
+    else:
+        candidates = np.arange(len(scores))
+    order = candidates[np.argsort(-scores[candidates], kind='stable')][:top_n]
+    return [(activities[i], scores[i]) for i in order]
+
+
+class RatingsStore:
+    """
+    Matrice creuse Nom × Activité des occurrences, maintenue de façon incrémentale.
+    Chaque colonne d'activité garde ses comptes par personne, son total d'occurrences et son
+    compte maximal ; un ajout (ou retrait) de lignes ne met à jour que les colonnes touchées,
+    et les ratings normalisés de ces colonnes sont recalculés à la demande, entrée par entrée.
+    """
+
+    def __init__(self, employee_column='Nom', activity_column='Activity'):
+        self.employee_column = employee_column
+        self.activity_column = activity_column
+        self._counts = {}       # activité -> {nom: nombre d'occurrences}
+        self._totals = {}       # activité -> nombre total d'occurrences (toutes lignes)
+        self._max_counts = {}   # activité -> plus grand nombre d'occurrences d'une personne
+        self._ratings = {}      # activité -> {nom: rating normalisé}, invalidé à chaque mise à jour
+        self._activities = {}   # nom -> ensemble des activités de la personne
+        self._frame = None      # table complète, invalidée à chaque mise à jour
+
+    @classmethod
+    def from_frame(cls, data, employee_column='Nom', activity_column='Activity'):
+        store = cls(employee_column, activity_column)
+        store.add_rows(data)
+        return store
+
+    def __len__(self):
+        return sum(len(column) for column in self._counts.values())
+
+    # Comptes d'un delta de lignes : occurrences par activité et par couple (nom, activité)
+    def _delta_counts(self, data):
+        if len(data) <= SMALL_DELTA_ROWS:
+            return self._count_small(data)
+        totals = data.groupby(self.activity_column).size()
+        pair_counts = data.groupby([self.employee_column, self.activity_column]).size()
+        return totals, pair_counts
+
+    # Application d'un delta de lignes (sign=1 pour un ajout, -1 pour un retrait)
+    @profiled("ratings.delta", rows=lambda self, data, *args, **kwargs: 0 if data is None else len(data))
+    def apply_delta(self, data, sign=1):
+        if data is None or data.empty:
+            return set()
+        totals, pair_counts = self._delta_counts(data)
+
+        touched = set()
+        raised_max = {}
+        for activity, count in totals.items():
+            total = self._totals.get(activity, 0) + sign * int(count)
+            if total > 0:
+                self._totals[activity] = total
+            else:
+                self._totals.pop(activity, None)
+            touched.add(activity)
+
+        for (employee, activity), count in pair_counts.items():
+            column = self._counts.setdefault(activity, {})
+            new_count = column.get(employee, 0) + sign * int(count)
+            if new_count > 0:
+                column[employee] = new_count
+                raised_max[activity] = max(raised_max.get(activity, 0), new_count)
+                self._activities.setdefault(employee, set()).add(activity)
+            else:
+                column.pop(employee, None)
+                activities = self._activities.get(employee)
+                if activities is not None:
+                    activities.discard(activity)
+                    if not activities:
+                        del self._activities[employee]
+            touched.add(activity)
+
+        for activity in touched:
+            column = self._counts.get(activity)
+            if not column:
+                self._counts.pop(activity, None)
+                self._max_counts.pop(activity, None)
+            elif sign > 0:
+                self._max_counts[activity] = max(self._max_counts.get(activity, 0), raised_max.get(activity, 0))
+            else:
+                self._max_counts[activity] = max(column.values())
+            self._ratings.pop(activity, None)
+        self._frame = None
+        return touched
+
+    # Comptage direct d'un petit delta (évite le coût fixe des groupby ; les valeurs manquantes sont ignorées)
+    def _count_small(self, data):
+        totals = Counter()
+        pair_counts = Counter()
+        for employee, activity in zip(data[self.employee_column], data[self.activity_column]):
+            if pd.isna(activity):
+                continue
+            totals[activity] += 1
+            if not pd.isna(employee):
+                pair_counts[(employee, activity)] += 1
+        return totals, pair_counts
+
+    def add_rows(self, data):
+        return self.apply_delta(data, sign=1)
+
+    def remove_rows(self, data):
+        return self.apply_delta(data, sign=-1)
+
+    # Rating normalisé d'une personne pour une activité (mis en cache jusqu'à la prochaine mise à jour de la colonne)
+    def rating(self, activity, employee):
+        ratings = self._ratings.setdefault(activity, {})
+        value = ratings.get(employee)
+        if value is None:
+            value = normalized_rating(self._counts[activity][employee], self._totals[activity], self._max_counts[activity])
+            ratings[employee] = value
+        return value
+
+    # Activités d'une personne avec leur rating, triées par activité (même ordre que le groupby)
+    def ratings_for(self, employee):
+        activities = self._activities.get(employee)
+        if not activities:
+            return []
+        return [(activity, self.rating(activity, employee)) for activity in sorted(activities)]
+
+    @profiled("ratings.recommend", rows=lambda self, similar_employees, *args, **kwargs: len(similar_employees))
+    def recommend_activities(self, similar_employees, top_n):
+        return recommend_from_ratings(self.ratings_for, similar_employees, top_n)
+
+    # Vue en lecture seule de la table augmentée de lignes supplémentaires (la table n'est pas modifiée)
+    def overlay(self, data):
+        return RatingsOverlay(self, data)
+
+    # Table complète, identique au calcul groupby/merge/transform('max') d'origine
+    @profiled("ratings.table", rows=len)
+    def to_frame(self):
+        if self._frame is not None:
+            return self._frame
+        rows = []
+        for activity, column in self._counts.items():
+            total = self._totals[activity]
+            for employee, count in column.items():
+                rows.append((employee, activity, count, total, count / total, self.rating(activity, employee)))
+        frame = pd.DataFrame(rows, columns=[self.employee_column, self.activity_column] + RATING_COLUMNS[2:])
+        frame = frame.astype({
+            'Person_Activity_Counts': 'int64', 'Total_Occurrences': 'int64',
+            'Activity_Ratio': 'float64', 'Normalized_Rating': 'int64'
+        })
+        self._frame = frame.sort_values([self.employee_column, self.activity_column], kind='mergesort', ignore_index=True)
+        return self._frame
+
+
+class RatingsOverlay:
+    """
+    Ratings d'une table augmentée de quelques lignes (une nouvelle personne), calculés sans
+    modifier la table partagée : seules les activités touchées par ces lignes sont recalculées.
+    Utilisable par plusieurs requêtes concurrentes sur la même table.
+    """
+
+    def __init__(self, store, data):
+        self.store = store
+        self._counts = {}
+        self._totals = {}
+        self._max_counts = {}
+        self._activities = {}
+        if data is None or data.empty:
+            return
+        totals, pair_counts = store._delta_counts(data)
+        for activity, count in totals.items():
+            self._totals[activity] = store._totals.get(activity, 0) + int(count)
+        for (employee, activity), count in pair_counts.items():
+            base_count = store._counts.get(activity, {}).get(employee, 0)
+            new_count = base_count + int(count)
+            self._counts.setdefault(activity, {})[employee] = new_count
+            self._activities.setdefault(employee, set()).add(activity)
+            self._max_counts[activity] = max(self._max_counts.get(activity, store._max_counts.get(activity, 0)), new_count)
+
+    def rating(self, activity, employee):
+        if activity not in self._totals:
+            return self.store.rating(activity, employee)
+        count = self._counts.get(activity, {}).get(employee)
+        if count is None:
+            count = self.store._counts[activity][employee]
+        return normalized_rating(count, self._totals[activity], self._max_counts.get(activity, self.store._max_counts.get(activity, 0)))
+
+    def ratings_for(self, employee):
+        activities = self.store._activities.get(employee, set()) | self._activities.get(employee, set())
+        return [(activity, self.rating(activity, employee)) for activity in sorted(activities)]
+
+    @profiled("ratings.recommend", rows=lambda self, similar_employees, *args, **kwargs: len(similar_employees))
+    def recommend_activities(self, similar_employees, top_n):
+        return recommend_from_ratings(self.ratings_for, similar_employees, top_n)
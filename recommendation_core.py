@@ -0,0 +1,99 @@
+import os
+
+import pandas as pd
+
+from cv_pipeline import parse_cv_text
+from dataset_loader import load_dataset_dir
+from identity import IdentityIndex
+from keyword_index import EmployeeKeywordIndex
+from project_analysis import REQUIRED_SKILLS_SECTION, extract_key_information, score_employees
+from project_batch import match_projects
+from ratings import RatingsStore
+from similarity import DEFAULT_COLUMNS, SimilarityEngine
+from vector_index import load_or_build_vector_index
+
+# Poids par défaut des caractéristiques de similarité (valeurs initiales des curseurs de l'application)
+DEFAULT_WEIGHTS = {'skills': 1.0, 'education': 1.0, 'training': 1.0, 'activity': 1.0}
+
+
+# Fonction pour lire la table des employés (fichier CSV/TSV/Excel/Parquet ou répertoire de classeurs), sans nettoyage
+def read_employee_table(path):
+    if os.path.isdir(path):
+        data, _ = load_dataset_dir(path)
+        return data
+    file_extension = os.path.splitext(path)[1].lower()
+    if file_extension == '.csv':
+        return pd.read_csv(path)
+    if file_extension == '.tsv':
+        return pd.read_csv(path, sep='\t')
+    if file_extension in ('.xlsx', '.xls'):
+        return pd.read_excel(path)
+    if file_extension == '.parquet':
+        return pd.read_parquet(path)
+    raise ValueError(f"Format de fichier non supporté: {file_extension}")
+
+
+# Fonction pour construire la ligne d'une nouvelle personne à partir du texte de son CV
+def person_from_cv(cv_text):
+    return pd.DataFrame([parse_cv_text(cv_text)])
+
+
+class ActivityRecommender:
+    """
+    Recommandation d'activités pour une nouvelle personne, sans Streamlit.
+    Le moteur de similarité, la table des ratings et l'index des identités de la base sont
+    construits une fois ; chaque requête identifie la nouvelle personne dans la base puis ajoute
+    virtuellement ses lignes non dupliquées (sans modifier l'état partagé), avec les mêmes
+    résultats que l'application sur la concaténation des données.
+    """
+
+    def __init__(self, base_data, columns=None):
+        self.columns = dict(DEFAULT_COLUMNS, **(columns or {}))
+        self.base_data = base_data
+        self.engine = SimilarityEngine(base_data, self.columns)
+        self.ratings = RatingsStore.from_frame(base_data, self.columns['employee'], self.columns['activity'])
+        self.identities = IdentityIndex.from_frame(base_data)
+
+    def recommend(self, new_person_data, weights=None, top_n=5):
+        """
+        Employés similaires à la nouvelle personne (première ligne) et activités recommandées.
+        Retourne (nom cible, [(employé, similarité)], [(activité, score)]).
+        """
+        weights = dict(DEFAULT_WEIGHTS, **(weights or {}))
+        # Personne déjà connue : nom de référence, et seules ses lignes nouvelles sont ajoutées
+        new_person_data, report = self.identities.overlay().merge_rows(new_person_data)
+        target_employee = new_person_data[self.columns['employee']].iloc[0]
+        new_rows = new_person_data[~report.duplicated]
+        similar = self.engine.top_similar_with(new_rows, target_employee, weights, top_n)
+        activities = self.ratings.overlay(new_rows).recommend_activities(similar, top_n)
+        return target_employee, similar, activities
+
+
+class EmployeeMatcher:
+    """
+    Recommandation d'employés pour des projets, sans Streamlit : index des mots-clés construit
+    une fois, index vectoriel (TF-IDF + FAISS) facultatif pour la correspondance sémantique.
+    """
+
+    def __init__(self, data, semantic=False):
+        self.data = data
+        self.index = EmployeeKeywordIndex(data)
+        self.vector_index = load_or_build_vector_index(data) if semantic else None
+
+    def _vector_index(self, semantic):
+        if not semantic:
+            return None
+        if self.vector_index is None:
+            raise ValueError("Index vectoriel non construit (service démarré sans le mode sémantique)")
+        return self.vector_index
+
+    # Compétences requises extraites d'une description de projet
+    @staticmethod
+    def required_skills(project_description):
+        return extract_key_information(project_description).get(REQUIRED_SKILLS_SECTION, "")
+
+    def recommend(self, required_keywords, top_n=5, semantic=False):
+        return score_employees(self.data, required_keywords, top_n, self.index, self._vector_index(semantic))
+
+    def recommend_many(self, projects, top_n=5, semantic=False):
+        return match_projects(projects, self.data, top_n, self.index, self._vector_index(semantic))
@@ -0,0 +1,157 @@
+import argparse
+import glob
+import json
+import os
+import re
+import sys
+import time
+
+from cv_pipeline import EXCLUDED_WORDS, clean_sections, segment_text_into_sections
+from pdf_cache import extract_pdf_text_uncached
+
+# Fichier du corpus de régression (entrées et sorties attendues de l'implémentation d'origine)
+CORPUS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "regression_corpus.json")
+
+
+# Implémentation d'origine de la segmentation, conservée comme référence
+def legacy_segment_text_into_sections(text):
+    sections_regex = {
+        re.compile(r"(nom[s]?|name)", re.IGNORECASE): "Nom",
+        re.compile(r"(prénom[s]?|surname|first name)", re.IGNORECASE): "Prénom",
+        re.compile(r"(date de naissance|birth date|dob)", re.IGNORECASE): "Date de Naissance",
+        re.compile(r"(expérience[s]? professionnelle[s]?|professional experience)", re.IGNORECASE): "Expérience Professionnelle",
+        re.compile(r"(éducation|education|formation[s]?|training|école|université|institut|centre de formation)", re.IGNORECASE): "Éducation",
+        re.compile(r"(compétence[s]?|skills)", re.IGNORECASE): "Compétences",
+        re.compile(r"(langue[s]?|languages)", re.IGNORECASE): "Langues",
+        re.compile(r"(projet[s]?|projects)", re.IGNORECASE): "Projets",
+        re.compile(r"(certificat[s]?|certificates)", re.IGNORECASE): "Certifications",
+        re.compile(r"(publication[s]?|publications?)", re.IGNORECASE): "Publications",
+        re.compile(r"(référence[s]?|references)", re.IGNORECASE): "Références",
+        re.compile(r"(objectifs|objectives)", re.IGNORECASE): "Objectifs",
+        re.compile(r"(réalisations|achievements)", re.IGNORECASE): "Réalisations",
+        re.compile(r"(licence|master|diplôme|bachelor|degree)", re.IGNORECASE): "Diplôme"
+    }
+    sections_content = {value: "" for value in sections_regex.values()}
+    unclassified_content = ""
+    current_section = None
+
+    for line in text.split('\n'):
+        line = line.strip()
+        if line:
+            matched = False
+            for regex, section_name in sections_regex.items():
+                if regex.search(line):
+                    current_section = section_name
+                    matched = True
+                    break
+            if current_section and matched:
+                sections_content[current_section] += line + " "
+            elif not matched:
+                unclassified_content += line + " "
+    return sections_content, unclassified_content
+
+
+# Implémentation d'origine du nettoyage, conservée comme référence
+def legacy_clean_text(text):
+    text = re.sub(r'\s+', ' ', text)
+    text = re.sub(r'[•·●]', '', text)
+    text = re.sub(r'[^\w\s,]', '', text)
+    words = text.split()
+    text = " ".join(word for word in words if word.lower() not in [w.lower() for w in EXCLUDED_WORDS])
+    text = text.strip()
+    return text
+
+
+def legacy_clean_sections(sections):
+    cleaned_sections = {}
+    for section, content in sections.items():
+        if content:
+            lines = content.split(". ")
+            keywords = [legacy_clean_text(line) for line in lines if line.strip()]
+            cleaned_sections[section] = keywords
+    return cleaned_sections
+
+
+# Variantes d'un texte pour couvrir la casse, les puces, les espaces et les titres de sections
+def _variants(text):
+    yield text
+    yield text.upper()
+    yield text.replace("\n", "\n• ").replace(". ", " · . ")
+    yield "\n".join(f"  {line}\t" for line in text.split("\n"))
+    yield ("Nom : Dupont\nPrénom : Marie\nDate de naissance : 12/03/1991\n"
+           "Expérience professionnelle\nIngénieure 01/01/2015 - 01/01/2020 Entreprise : Acme\n"
+           "Compétences : Python, SQL, Skills\nÉducation : Université Paris-Sud. Master Informatique\n"
+           "Langues : Français, Anglais\n") + text
+
+
+# Fonction pour construire le corpus à partir des PDF d'exemple du dépôt
+def build_corpus(pattern="project_*.pdf"):
+    base = os.path.dirname(os.path.abspath(__file__))
+    corpus = []
+    for path in sorted(glob.glob(os.path.join(base, pattern))):
+        with open(path, "rb") as f:
+            text = extract_pdf_text_uncached(f.read())
+        for variant, sample in enumerate(_variants(text)):
+            sections, unclassified = legacy_segment_text_into_sections(sample)
+            corpus.append({
+                "source": f"{os.path.basename(path)}#{variant}",
+                "text": sample,
+                "sections_content": sections,
+                "unclassified_content": unclassified,
+                "clean_sections": legacy_clean_sections(sections)
+            })
+    return corpus
+
+
+# Fonction pour vérifier l'équivalence de l'implémentation courante sur le corpus
+def check_corpus(corpus):
+    failures = []
+    for entry in corpus:
+        sections, unclassified = segment_text_into_sections(entry["text"])
+        if sections != entry["sections_content"]:
+            failures.append((entry["source"], "sections_content"))
+        if unclassified != entry["unclassified_content"]:
+            failures.append((entry["source"], "unclassified_content"))
+        if clean_sections(sections) != entry["clean_sections"]:
+            failures.append((entry["source"], "clean_sections"))
+    return failures
+
+
+# Fonction pour mesurer le temps de segmentation + nettoyage sur tout le corpus
+def time_pipeline(corpus, segment, clean, repeat=20):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for entry in corpus:
+            sections, _ = segment(entry["text"])
+            clean(sections)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Corpus de régression de la segmentation et du nettoyage des CV.")
+    parser.add_argument("command", choices=["build", "check"], help="build : régénérer le corpus ; check : vérifier et mesurer")
+    parser.add_argument("--repeat", type=int, default=20, help="Nombre de répétitions pour la mesure du temps")
+    args = parser.parse_args()
+
+    if args.command == "build":
+        corpus = build_corpus()
+        with open(CORPUS_PATH, "w", encoding="utf-8") as f:
+            json.dump(corpus, f, ensure_ascii=False, indent=1)
+        print(f"{len(corpus)} entrée(s) écrite(s) dans {CORPUS_PATH}")
+        return
+
+    with open(CORPUS_PATH, encoding="utf-8") as f:
+        corpus = json.load(f)
+    failures = check_corpus(corpus)
+    for source, field in failures:
+        print(f"Différence : {source} ({field})")
+
+    legacy = time_pipeline(corpus, legacy_segment_text_into_sections, legacy_clean_sections, args.repeat)
+    current = time_pipeline(corpus, segment_text_into_sections, clean_sections, args.repeat)
+    print(f"{len(corpus)} entrée(s), {len(failures)} différence(s)")
+    print(f"Référence : {legacy:.4f} s, actuel : {current:.4f} s, accélération : x{legacy / current:.2f}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+import argparse
+
+import numpy as np
+import pandas as pd
+from flask import Flask, jsonify, request
+
+from project_analysis import REQUIRED_SKILLS_SECTION
+from recommendation_core import DEFAULT_WEIGHTS, ActivityRecommender, EmployeeMatcher, person_from_cv, read_employee_table
+
+# Nombre maximal de résultats demandés par requête (top_n)
+MAX_TOP_N = 100
+
+
+# Conversion d'une valeur numpy / pandas en valeur JSON (NaN devient null)
+def _json_value(value):
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and np.isnan(value):
+        return None
+    return value
+
+
+# Corps JSON d'une requête (objet attendu ; corps absent ou illisible : objet vide)
+def _payload():
+    payload = request.get_json(silent=True)
+    if payload is None:
+        return {}
+    if not isinstance(payload, dict):
+        raise ValueError("Le corps de la requête doit être un objet JSON")
+    return payload
+
+
+# Nombre de résultats demandés : entier de 1 à MAX_TOP_N
+def _top_n(payload):
+    top_n = payload.get("top_n", 5)
+    if isinstance(top_n, bool) or not isinstance(top_n, int) or not 1 <= top_n <= MAX_TOP_N:
+        raise ValueError(f"'top_n' doit être un entier de 1 à {MAX_TOP_N}")
+    return top_n
+
+
+# Pondérations des critères de similarité : objet {critère: nombre} (critères de DEFAULT_WEIGHTS)
+def _weights(payload):
+    weights = payload.get("weights")
+    if weights is None:
+        return None
+    if not isinstance(weights, dict):
+        raise ValueError("'weights' doit être un objet {critère: nombre}")
+    for name, value in weights.items():
+        if name not in DEFAULT_WEIGHTS:
+            raise ValueError(f"Critère de pondération inconnu : {name!r} (attendus : {', '.join(DEFAULT_WEIGHTS)})")
+        if isinstance(value, bool) or not isinstance(value, (int, float)) or not np.isfinite(value):
+            raise ValueError(f"La pondération {name!r} doit être un nombre")
+    return weights
+
+
+# Champ texte d'une requête (chaîne attendue)
+def _text(payload, name):
+    value = payload[name]
+    if not isinstance(value, str):
+        raise ValueError(f"'{name}' doit être une chaîne")
+    return value
+
+
+# Projets d'une requête : {nom: texte} ({nom: description} avec descriptions, {nom: {section: texte}} sinon possible)
+def _projects(payload, descriptions):
+    projects = payload["projects"]
+    if not isinstance(projects, dict):
+        raise ValueError("'projects' doit être un objet {nom du projet: texte}")
+    for name, value in projects.items():
+        if isinstance(value, str):
+            continue
+        if descriptions or not isinstance(value, dict) or not isinstance(value.get(REQUIRED_SKILLS_SECTION, ""), str):
+            raise ValueError(f"Le projet {name!r} doit être une chaîne"
+                             + ("" if descriptions else f" ou un objet {{'{REQUIRED_SKILLS_SECTION}': texte}}"))
+    return projects
+
+
+# Lignes de la nouvelle personne d'une requête : texte de CV, une ligne ou plusieurs lignes
+def _person_from_payload(payload):
+    if "cv_text" in payload:
+        return person_from_cv(_text(payload, "cv_text"))
+    if "person" in payload:
+        if not isinstance(payload["person"], dict):
+            raise ValueError("'person' doit être un objet {colonne: valeur}")
+        return pd.DataFrame([payload["person"]])
+    if "persons" in payload:
+        if not isinstance(payload["persons"], list) or not all(isinstance(row, dict) for row in payload["persons"]):
+            raise ValueError("'persons' doit être une liste d'objets {colonne: valeur}")
+        return pd.DataFrame(payload["persons"])
+    raise ValueError("La requête doit contenir 'cv_text', 'person' ou 'persons'")
+
+
+def create_app(employees_path=None, data=None, semantic=False):
+    """
+    Service HTTP JSON de recommandation. Les données des employés et les index (similarité,
+    ratings, mots-clés, vecteurs si semantic) sont chargés une fois au démarrage ; les requêtes
+    concurrentes sont servies depuis la mémoire sans modifier cet état partagé.
+    """
+    app = Flask(__name__)
+    data = read_employee_table(employees_path) if data is None else data
+    recommender = ActivityRecommender(data)
+    matcher = EmployeeMatcher(data, semantic=semantic)
+
+    @app.errorhandler(ValueError)
+    def bad_request(error):
+        return jsonify(error=str(error)), 400
+
+    @app.get("/health")
+    def health():
+        return jsonify(status="ok", employees=len(data), semantic=matcher.vector_index is not None)
+
+    @app.post("/recommend-activities")
+    def recommend_activities():
+        payload = _payload()
+        person = _person_from_payload(payload)
+        if person.empty or "Nom" not in person.columns or not person["Nom"].iloc[0]:
+            raise ValueError("La nouvelle personne doit avoir un 'Nom'")
+        missing = [column for column in recommender.columns.values() if column not in person.columns]
+        if missing:
+            raise ValueError(f"Colonnes manquantes pour la nouvelle personne : {', '.join(missing)}")
+        target, similar, activities = recommender.recommend(
+            person, _weights(payload), _top_n(payload)
+        )
+        return jsonify(
+            target=_json_value(target),
+            similar_employees=[{"Nom": _json_value(name), "similarity": float(score)} for name, score in similar],
+            activities=[{"Activity": _json_value(activity), "score": float(score)} for activity, score in activities]
+        )
+
+    @app.post("/recommend-employees")
+    def recommend_employees():
+        payload = _payload()
+        top_n = _top_n(payload)
+        semantic = payload.get("mode") == "semantic"
+
+        if "projects" in payload:
+            descriptions = bool(payload.get("descriptions"))
+            projects = {
+                name: matcher.required_skills(text) if descriptions else text
+                for name, text in _projects(payload, descriptions).items()
+            }
+            matches = matcher.recommend_many(projects, top_n, semantic)
+            return jsonify(matches=[
+                {column: _json_value(value) for column, value in row.items()}
+                for row in matches.to_dict(orient="records")
+            ])
+
+        if "required_skills" in payload:
+            required = _text(payload, "required_skills")
+        elif "project_description" in payload:
+            required = matcher.required_skills(_text(payload, "project_description"))
+        else:
+            raise ValueError("La requête doit contenir 'required_skills', 'project_description' ou 'projects'")
+        return jsonify(
+            required_skills=required,
+            employees=[
+                {"position": position, "Nom": _json_value(name), "score": float(score)}
+                for position, name, score in matcher.recommend(required, top_n, semantic)
+            ]
+        )
+
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Service HTTP local de recommandation (activités et employés).")
+    parser.add_argument("employees", help="Fichier (CSV, TSV, Excel) ou répertoire de classeurs des employés")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--semantic", action="store_true", help="Construire aussi l'index vectoriel (TF-IDF + FAISS)")
+    args = parser.parse_args()
+
+    app = create_app(args.employees, semantic=args.semantic)
+    app.run(host=args.host, port=args.port, threaded=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,239 @@
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from instrumentation import profiled
+from token_vocabulary import EncodedColumn, TokenVocabulary, tokenize_value
+
+# Colonnes utilisées par défaut pour la similarité entre employés
+DEFAULT_COLUMNS = {
+    'employee': 'Nom',
+    'skills': 'Compétence',
+    'education': 'Institution',
+    'training': 'Diplôme',
+    'activity': 'Activity'
+}
+
+# Nombre d'employés cibles dont les similarités par caractéristique restent en cache
+FEATURE_CACHE_SIZE = 16
+
+# Caractéristiques comparées par indice de Jaccard (l'éducation est comparée par égalité)
+JACCARD_FEATURES = ('skills', 'training', 'activity')
+
+
+class SimilarityEngine:
+    """
+    Moteur de similarité vectorisé entre employés.
+    Les colonnes compétences / diplômes / activités sont encodées une seule fois par dictionnaire
+    (vocabulaire de jetons partagé, un code entier par ligne) puis converties en matrices creuses
+    binaires ; les indices de Jaccard de toutes les lignes sont ensuite calculés en une seule
+    opération (intersection par produit creux, union par sommes de lignes).
+    """
+
+    @profiled("similarity.build", rows=lambda self, data, *args, **kwargs: len(data))
+    def __init__(self, data, columns=None):
+        self.columns = dict(DEFAULT_COLUMNS, **(columns or {}))
+        self.names = data[self.columns['employee']].to_numpy()
+        # Première ligne de chaque employé (recherche de la cible sans parcourir toutes les lignes)
+        self._first_rows = pd.Series(np.arange(len(self.names)), index=self.names).groupby(
+            level=0, sort=False).first().to_dict()
+
+        self.vocabulary = TokenVocabulary()
+        self.encoded = {
+            feature: EncodedColumn(data[self.columns[feature]], self.vocabulary) for feature in JACCARD_FEATURES
+        }
+        self.matrices = {}
+        self.row_sizes = {}
+        for feature in JACCARD_FEATURES:
+            matrix = self.encoded[feature].token_matrix()
+            # Toutes les matrices partagent la largeur du vocabulaire commun
+            matrix.resize((matrix.shape[0], len(self.vocabulary)))
+            self.matrices[feature] = matrix
+            self.row_sizes[feature] = np.diff(matrix.indptr).astype(np.float64)
+
+        # Codes entiers de l'institution : -1 pour NaN (NaN != NaN), None reste égal à None
+        education = data[self.columns['education']]
+        codes, uniques = pd.factorize(education)
+        none_mask = np.fromiter((value is None for value in education), dtype=bool, count=len(education))
+        codes[none_mask] = len(uniques)
+        self.education_codes = codes.astype(np.int32)
+        self._education_values = pd.Index(uniques, dtype=object)
+
+        # Similarités par caractéristique déjà calculées, par employé cible (LRU borné)
+        self._feature_cache = OrderedDict()
+        self._feature_cache_lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.names)
+
+    # Jetons d'une ligne par caractéristique (lus dans l'encodage, sans retraiter le texte)
+    def row_tokens(self, row):
+        return {feature: self.encoded[feature].row_tokens(row) for feature in JACCARD_FEATURES}
+
+    # Jetons des lignes supplémentaires (hors moteur) par caractéristique
+    def extra_row_tokens(self, extra_data):
+        return [
+            {feature: tokenize_value(value) for feature, value in zip(JACCARD_FEATURES, values)}
+            for values in zip(*(extra_data[self.columns[feature]] for feature in JACCARD_FEATURES))
+        ]
+
+    # Index de la première ligne correspondant à l'employé cible
+    def target_index(self, target_employee):
+        row = self._first_rows.get(target_employee)
+        if row is None:
+            raise KeyError(f"Employé introuvable : {target_employee}")
+        return int(row)
+
+    # Similarités par caractéristique de la ligne cible avec toutes les lignes (ou un sous-ensemble)
+    def feature_similarities(self, target_idx, rows=None):
+        features = {}
+        for feature in JACCARD_FEATURES:
+            matrix = self.matrices[feature]
+            sizes = self.row_sizes[feature]
+            if rows is not None:
+                matrix = matrix[rows]
+                sizes = sizes[rows]
+            target_vector = self.matrices[feature][target_idx]
+            intersection = np.asarray((matrix @ target_vector.T).todense()).ravel()
+            union = sizes + self.row_sizes[feature][target_idx] - intersection
+            features[feature] = np.divide(
+                intersection, union, out=np.zeros_like(intersection), where=union > 0
+            )
+
+        codes = self.education_codes if rows is None else self.education_codes[rows]
+        target_code = self.education_codes[target_idx]
+        features['education'] = ((codes == target_code) & (target_code >= 0)).astype(np.float64)
+        return features
+
+    # Code d'institution d'une valeur extérieure au moteur (-1 si elle n'est égale à aucune ligne)
+    def education_code(self, value):
+        if value is None:
+            return len(self._education_values)
+        if pd.isna(value):
+            return -1
+        return int(self._education_values.get_indexer([value])[0])
+
+    # Similarités par caractéristique d'une ligne extérieure (ensembles de jetons, institution) avec toutes les lignes
+    # (ou un sous-ensemble)
+    def external_feature_similarities(self, token_sets, education_value, rows=None):
+        features = {}
+        for feature in JACCARD_FEATURES:
+            matrix = self.matrices[feature]
+            sizes = self.row_sizes[feature]
+            if rows is not None:
+                matrix = matrix[rows]
+                sizes = sizes[rows]
+            tokens = token_sets[feature]
+            known = [self.vocabulary.ids[token] for token in tokens if token in self.vocabulary.ids]
+            target_vector = sparse.csr_matrix(
+                (np.ones(len(known)), (np.zeros(len(known), dtype=np.int64), known)), shape=(1, len(self.vocabulary))
+            )
+            intersection = np.asarray((matrix @ target_vector.T).todense()).ravel()
+            union = sizes + len(tokens) - intersection
+            features[feature] = np.divide(
+                intersection, union, out=np.zeros_like(intersection), where=union > 0
+            )
+
+        codes = self.education_codes if rows is None else self.education_codes[rows]
+        target_code = self.education_code(education_value)
+        features['education'] = ((codes == target_code) & (target_code >= 0)).astype(np.float64)
+        return features
+
+    # Similarités par caractéristique de l'employé cible, mises en cache : un changement de poids
+    # ne demande plus qu'une somme pondérée et un classement
+    def cached_feature_similarities(self, target_employee):
+        with self._feature_cache_lock:
+            features = self._feature_cache.get(target_employee)
+            if features is not None:
+                self._feature_cache.move_to_end(target_employee)
+                return features
+
+        features = self.feature_similarities(self.target_index(target_employee))
+        with self._feature_cache_lock:
+            self._feature_cache[target_employee] = features
+            while len(self._feature_cache) > FEATURE_CACHE_SIZE:
+                self._feature_cache.popitem(last=False)
+        return features
+
+    # Combinaison linéaire des similarités (même ordre d'addition que la boucle d'origine)
+    @staticmethod
+    def weighted_scores(features, weights):
+        score = features['skills'] * weights['skills']
+        score = score + features['education'] * weights['education']
+        score = score + features['training'] * weights['training']
+        score = score + features['activity'] * weights['activity']
+        return score
+
+    # Classement des employés les plus similaires à partir des scores de toutes les lignes
+    def rank(self, scores, target_employee, top_n, rows=None, names=None):
+        if names is None:
+            names = self.names if rows is None else self.names[rows]
+        mask = (names != target_employee) & (scores > 0)
+        if not mask.any():
+            return []
+
+        # Un employé présent sur plusieurs lignes garde le score de sa dernière ligne positive,
+        # et son rang d'insertion est celui de sa première ligne positive (comme le dict d'origine)
+        candidates = pd.Series(scores[mask], index=names[mask])
+        per_employee = candidates.groupby(level=0, sort=False, dropna=False).last()
+        order = np.argsort(-per_employee.to_numpy(), kind='stable')[:top_n]
+        return list(zip(per_employee.index[order], per_employee.to_numpy()[order]))
+
+    # Top-N des employés similaires à l'employé cible (rows : sous-ensemble trié de lignes candidates)
+    @profiled("similarity.top_similar", rows=lambda self, *args, **kwargs: len(self))
+    def top_similar(self, target_employee, weights, top_n, rows=None):
+        if rows is None:
+            features = self.cached_feature_similarities(target_employee)
+        else:
+            features = self.feature_similarities(self.target_index(target_employee), rows)
+        scores = self.weighted_scores(features, weights)
+        return self.rank(scores, target_employee, top_n, rows)
+
+    @profiled("similarity.top_similar_with", rows=lambda self, extra_data, *args, **kwargs: len(extra_data))
+    def top_similar_with(self, extra_data, target_employee, weights, top_n, rows=None):
+        """
+        Top-N des employés similaires lorsque des lignes supplémentaires (une nouvelle personne)
+        suivent les données du moteur, sans reconstruire le moteur : même résultat qu'un moteur
+        construit sur la concaténation. Les lignes supplémentaires sont comparées une à une.
+        rows : sous-ensemble trié des lignes du moteur à comparer (candidats LSH), toutes sinon.
+        """
+        columns = self.columns
+        extra_names = extra_data[columns['employee']].to_numpy()
+        extra_tokens = self.extra_row_tokens(extra_data)
+        extra_education = list(extra_data[columns['education']])
+
+        target_idx = self._first_rows.get(target_employee)
+        if target_idx is not None:
+            if rows is None:
+                base_features = self.cached_feature_similarities(target_employee)
+            else:
+                base_features = self.feature_similarities(target_idx, rows)
+            target_tokens = self.row_tokens(target_idx)
+            target_code = self.education_codes[target_idx]
+            education_matches = [target_code >= 0 and self.education_code(value) == target_code for value in extra_education]
+        else:
+            extra_matches = np.flatnonzero(extra_names == target_employee)
+            if len(extra_matches) == 0:
+                raise KeyError(f"Employé introuvable : {target_employee}")
+            target_idx = int(extra_matches[0])
+            target_tokens = extra_tokens[target_idx]
+            target_value = extra_education[target_idx]
+            base_features = self.external_feature_similarities(target_tokens, target_value, rows)
+            education_matches = [bool(target_value == value) for value in extra_education]
+
+        features = {}
+        for feature in JACCARD_FEATURES:
+            target_set = target_tokens[feature]
+            extra_values = []
+            for tokens in extra_tokens:
+                union = len(target_set | tokens[feature])
+                extra_values.append(len(target_set & tokens[feature]) / union if union else 0.0)
+            features[feature] = np.concatenate((base_features[feature], np.asarray(extra_values, dtype=np.float64)))
+        features['education'] = np.concatenate((base_features['education'], np.asarray(education_matches, dtype=np.float64)))
+
+        scores = self.weighted_scores(features, weights)
+        names = self.names if rows is None else self.names[rows]
+        return self.rank(scores, target_employee, top_n, names=np.concatenate((names, extra_names)))
@@ -0,0 +1,224 @@
+import argparse
+import os
+import random
+
+import fitz  # PyMuPDF
+import numpy as np
+import pandas as pd
+
+from cv_pipeline import EMPLOYEE_COLUMNS
+
+# Valeurs des colonnes, dans le style des classeurs Person NNN.xlsx
+SKILLS = [
+    "Python", "Java", "SQL", "C++", "JavaScript", "TypeScript", "React", "Angular", "Vue.js", "Node.js",
+    "Django", "Flask", "Spring Boot", "REST APIs", "GraphQL", "Docker", "Kubernetes", "Terraform", "Git",
+    "DevOps", "Microservices", "Agile Development", "HTML/CSS", "Cloud Services (AWS, Azure)", "Linux",
+    "PostgreSQL", "MongoDB", "Redis", "Kafka", "Spark", "Hadoop", "Machine Learning", "Deep Learning",
+    "TensorFlow", "PyTorch", "Pandas", "Data Visualization", "Power BI", "Tableau", "Scala", "Go", "Rust",
+    "Kotlin", "Swift", "PHP", "Laravel", "Ruby on Rails", "C#", ".NET", "UX/UI Design", "Firebase",
+    "Cybersecurity", "Networking", "Jenkins", "CI/CD", "Ansible", "Excel", "SAP", "Salesforce", "Scrum"
+]
+LEVELS = ["Débutant", "Intermédiaire", "Avancé", "Expert"]
+DEGREES = [
+    "MSc in Software Development", "BSc in Information Technology", "BSc in Software Engineering",
+    "MSc in Computer Science", "Diploma in Full Stack Development", "MSc in Data Science",
+    "BSc in Computer Science", "MBA in Technology Management", "PhD in Artificial Intelligence",
+    "Master Informatique", "Licence Informatique", "Diplôme d'ingénieur en informatique"
+]
+INSTITUTIONS = [
+    "Université Paris-Sud", "MIT", "Université de Toronto", "Stanford University", "École Polytechnique",
+    "Université de Montréal", "ETH Zürich", "Imperial College London", "Université Lyon 1", "TU München",
+    "Université de Lomé", "Institut Mines-Télécom", "Sorbonne Université", "EPFL", "Université Laval"
+]
+JOB_TITLES = [
+    "Software Developer", "Data Scientist", "System Analyst", "DevOps Engineer", "Project Manager",
+    "Data Engineer", "Frontend Developer", "Backend Developer", "Cloud Architect", "QA Engineer",
+    "Product Owner", "Security Analyst", "Machine Learning Engineer", "Mobile Developer"
+]
+COMPANIES = [
+    "Innovative Solutions", "ABC Inc", "Global Tech", "NextGen Technologies", "XYZ Corp", "TechStore Solutions",
+    "DataWorks", "CloudNine", "Alpha Systems", "Beta Consulting", "Orange Digital", "Nova Software"
+]
+KEY_PROJECTS = [
+    "Migration vers le cloud", "Mise en place de CI/CD avec Jenkins", "Système de gestion de contenu (CMS)",
+    "Intégration d'une plateforme de microservices", "Application mobile de commerce électronique",
+    "Système de gestion des utilisateurs", "Développement d'une application de gestion de tâches",
+    "Développement d'API REST pour un système de paiement", "Tableau de bord analytique",
+    "Plateforme de recommandation", "Refonte du site web", "Automatisation des tests"
+]
+ACTIVITY_KINDS = ["Webinar", "Projet", "Hackathon", "Conférence", "Cours", "Atelier"]
+ACTIVITY_TOPICS = [
+    "Modern Web Development with React", "Full Stack Web Development", "Open Source Software", "DevOps Summit",
+    "Advanced Java Programming", "Kubernetes for Developers", "Machine Learning in Production", "Data Engineering",
+    "Cloud Native Architecture", "Cybersecurity Essentials", "Agile Leadership", "Python for Data Science",
+    "Mobile Development with Kotlin", "API Design", "UX/UI Design Sprint", "Big Data with Spark"
+]
+NATIONALITIES = ["USA", "France", "Canada", "Germany", "UK", "Togo", "Bénin", "Sénégal"]
+FIRST_NAMES = ["Jean", "Marie", "Kossi", "Afi", "Paul", "Sophie", "Yao", "Ama", "Lucas", "Emma", "Koffi", "Léa"]
+LAST_NAMES = ["Dupont", "Martin", "Mensah", "Agbeko", "Bernard", "Lawson", "Durand", "Amouzou", "Petit", "Kodjo"]
+
+# Nombre de lignes par personne (une compétence par ligne, comme dans les classeurs d'origine)
+ROWS_PER_PERSON = (3, 7)
+
+
+# Valeurs tirées dans une liste, NaN hors du masque
+def _pick(rng, values, size, mask=None):
+    picked = np.array(values, dtype=object)[rng.integers(0, len(values), size)]
+    if mask is not None:
+        picked[~mask] = np.nan
+    return picked
+
+
+def generate_employees(rows, seed=0):
+    """
+    Table synthétique d'employés (colonnes de extend.main : ID, Nom, Compétence, Diplôme, ...).
+    Chaque personne occupe plusieurs lignes consécutives : une compétence par ligne, diplômes,
+    postes et activités sur les premières lignes seulement (mêmes proportions de valeurs manquantes
+    que les classeurs Person NNN.xlsx). Reproductible pour une graine donnée.
+    """
+    rng = np.random.default_rng(seed)
+    low, high = ROWS_PER_PERSON
+    person_rows = rng.integers(low, high + 1, rows // low + 1)
+    person_rows = person_rows[:np.searchsorted(np.cumsum(person_rows), rows) + 1]
+    persons = len(person_rows)
+
+    person = np.repeat(np.arange(persons), person_rows)[:rows]
+    rank = np.arange(rows) - np.concatenate(([0], np.cumsum(person_rows)[:-1]))[person]
+    ids = 1000 + np.arange(persons)
+
+    degrees = rank < rng.integers(1, 3, persons)[person]
+    jobs = rank < rng.integers(2, 4, persons)[person]
+    activities = rank < rng.integers(1, 3, persons)[person]
+    skills = rng.random(rows) >= 0.02
+
+    start_years = rng.integers(2005, 2022, rows)
+    durations = np.char.add(np.char.add(start_years.astype(str), "-"),
+                            (start_years + rng.integers(1, 5, rows)).astype(str)).astype(object)
+    durations[~jobs] = np.nan
+    activity_names = np.array([f"{kind}: {topic}" for kind in ACTIVITY_KINDS for topic in ACTIVITY_TOPICS], dtype=object)
+
+    data = pd.DataFrame({
+        "ID": ids[person],
+        "Nom": np.array([f"Person {i}" for i in ids], dtype=object)[person],
+        "Prénom": _pick(rng, FIRST_NAMES, persons)[person],
+        "Âge": rng.integers(22, 61, persons)[person],
+        "Sexe": _pick(rng, ["M", "F"], persons)[person],
+        "Nationalité": _pick(rng, NATIONALITIES, persons)[person],
+        "Compétence": _pick(rng, SKILLS, rows, skills),
+        "Niveau de Maîtrise": _pick(rng, LEVELS, rows, skills),
+        "Diplôme": _pick(rng, DEGREES, rows, degrees),
+        "Institution": _pick(rng, INSTITUTIONS, rows, degrees),
+        "Année de Obtention": np.where(degrees, rng.integers(2000, 2024, rows), np.nan),
+        "Titre du Poste": _pick(rng, JOB_TITLES, rows, jobs),
+        "Entreprise": _pick(rng, COMPANIES, rows, jobs),
+        "Durée": durations,
+        "Projets Clés": _pick(rng, KEY_PROJECTS, rows, jobs),
+        "Activity": _pick(rng, activity_names, rows, activities)
+    })
+    return data[EMPLOYEE_COLUMNS]
+
+
+# Fonction pour écrire un PDF à partir de pages de texte
+def _write_pdf(pages, fontsize=10):
+    with fitz.open() as doc:
+        for text in pages:
+            page = doc.new_page()
+            page.insert_textbox(fitz.Rect(50, 50, page.rect.width - 50, page.rect.height - 50), text, fontsize=fontsize)
+        return doc.tobytes()
+
+
+# Paragraphe de remplissage (pages supplémentaires d'un document volumineux)
+def _filler(rng, sentences=12):
+    return " ".join(
+        f"{rng.choice(KEY_PROJECTS)} réalisé avec {rng.choice(SKILLS)} et {rng.choice(SKILLS)} chez {rng.choice(COMPANIES)}."
+        for _ in range(sentences)
+    )
+
+
+def generate_cv_pdf(index=0, pages=1, seed=0):
+    """
+    CV synthétique en PDF (contenu en octets), avec les sections reconnues par cv_pipeline
+    (nom, prénom, date de naissance, expérience, compétences, éducation, langues, projets).
+    Les pages au-delà de la première contiennent des réalisations de remplissage.
+    """
+    rng = random.Random(seed * 1000003 + index)
+    start = rng.randint(2005, 2018)
+    first_page = "\n".join([
+        f"Nom: {rng.choice(LAST_NAMES)} {index}",
+        f"Prénom: {rng.choice(FIRST_NAMES)}",
+        f"Date de naissance: {rng.randint(1, 28):02d}/{rng.randint(1, 12):02d}/{rng.randint(1965, 2002)}",
+        "Expérience professionnelle",
+        f"{rng.choice(JOB_TITLES)} 01/01/{start} - 01/01/{start + rng.randint(1, 5)} Entreprise : {rng.choice(COMPANIES).split()[0]}",
+        f"Compétences: {', '.join(rng.sample(SKILLS, rng.randint(2, 6)))}",
+        f"Éducation : {rng.choice(INSTITUTIONS)}",
+        rng.choice(["Master", "Licence", "Bachelor", "Diplôme"]) + " " + rng.choice(["Informatique", "Data Science", "Génie logiciel"]),
+        "Langues: Français, Anglais",
+        f"Projets: {rng.choice(KEY_PROJECTS)}"
+    ])
+    return _write_pdf([first_page] + [f"Réalisations\n{_filler(rng)}" for _ in range(pages - 1)])
+
+
+def generate_project_pdf(index=0, pages=1, seed=0):
+    """
+    Description de projet synthétique en PDF (contenu en octets), avec les sections de
+    PROJECT_SECTIONS ; les pages supplémentaires prolongent les détails supplémentaires.
+    """
+    rng = random.Random(seed * 1000003 + index + 500000)
+    first_page = "\n".join([
+        "Nom du projet",
+        f"{rng.choice(KEY_PROJECTS)} ({index})",
+        "Nom de l'entreprise",
+        rng.choice(COMPANIES),
+        "Objectifs",
+        _filler(rng, 3),
+        "Compétences requises",
+        f"Les compétences nécessaires incluent {', '.join(rng.sample(SKILLS, rng.randint(3, 8)))}.",
+        "Détails supplémentaires",
+        _filler(rng, 4)
+    ])
+    return _write_pdf([first_page] + [_filler(rng) for _ in range(pages - 1)])
+
+
+# Fonction pour écrire une table d'employés (CSV, Excel ou Parquet selon l'extension)
+def write_employees(data, path):
+    extension = os.path.splitext(path)[1].lower()
+    if extension == ".parquet":
+        data.to_parquet(path, index=False)
+    elif extension in (".xlsx", ".xls"):
+        data.to_excel(path, index=False)
+    else:
+        data.to_csv(path, index=False)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Génération de données synthétiques (employés, CV, projets).")
+    # Options communes, acceptées après la sous-commande (employees 100 out.csv --seed 3)
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--seed", type=int, default=0, help="Graine du générateur (données reproductibles)")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    employees_parser = subparsers.add_parser("employees", parents=[common], help="Table d'employés")
+    employees_parser.add_argument("rows", type=int)
+    employees_parser.add_argument("output", help="Fichier CSV, Excel ou Parquet")
+    for command in ("cvs", "projects"):
+        documents_parser = subparsers.add_parser(command, parents=[common], help=f"PDF de {'CV' if command == 'cvs' else 'projets'}")
+        documents_parser.add_argument("count", type=int)
+        documents_parser.add_argument("directory")
+        documents_parser.add_argument("--pages", type=int, default=1)
+    args = parser.parse_args()
+
+    if args.command == "employees":
+        write_employees(generate_employees(args.rows, args.seed), args.output)
+        print(f"{args.rows} ligne(s) écrite(s) dans {args.output}")
+        return
+
+    os.makedirs(args.directory, exist_ok=True)
+    generate = generate_cv_pdf if args.command == "cvs" else generate_project_pdf
+    prefix = "cv" if args.command == "cvs" else "project"
+    for index in range(args.count):
+        with open(os.path.join(args.directory, f"{prefix}_{index:05d}.pdf"), "wb") as f:
+            f.write(generate(index, args.pages, args.seed))
+    print(f"{args.count} PDF écrit(s) dans {args.directory}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+
+# Fonction pour découper une valeur en ensemble de jetons (même sémantique que str(x).split(','))
+def tokenize_value(value):
+    if pd.isna(value):
+        return set()
+    return set(str(value).split(','))
+
+
+class TokenVocabulary:
+    """Table d'internement des jetons partagée entre colonnes : chaque jeton distinct reçoit un entier."""
+
+    def __init__(self):
+        self.tokens = []
+        self.ids = {}
+
+    def __len__(self):
+        return len(self.tokens)
+
+    def intern(self, token):
+        token_id = self.ids.get(token)
+        if token_id is None:
+            token_id = self.ids[token] = len(self.tokens)
+            self.tokens.append(token)
+        return token_id
+
+
+# Clé de catégorie fidèle à str(valeur) : dans une colonne de types mélangés, 1, 1.0 et True restent distincts
+def _category_key(value):
+    return value if isinstance(value, str) else (type(value), str(value))
+
+
+class EncodedColumn:
+    """
+    Colonne encodée par dictionnaire : un code entier (int32) par ligne vers la valeur distincte,
+    et, avec un vocabulaire, pour chaque valeur distincte la liste de ses jetons internés (format CSR).
+    Le découpage, la conversion en texte et la mise en minuscules ne sont faits qu'une fois par
+    valeur distincte ; None et les autres valeurs manquantes (NaN) restent des catégories distinctes.
+    """
+
+    def __init__(self, values, vocabulary=None):
+        values = pd.Series(values).reset_index(drop=True)
+        self.vocabulary = vocabulary
+
+        codes, uniques = pd.factorize(values)
+        if values.dtype == object and any(not isinstance(value, str) for value in uniques):
+            codes, uniques = pd.factorize(values.map(_category_key, na_action='ignore'))
+            uniques = [value if isinstance(value, str) else value[1] for value in uniques]
+        categories = list(uniques)
+
+        # Valeurs manquantes : une catégorie pour None, une par représentation des autres (NaN, NaT...)
+        missing_rows = np.flatnonzero(codes < 0)
+        missing_ids = {}
+        for row in missing_rows:
+            value = values.iat[row]
+            key = (value is None, str(value))
+            if key not in missing_ids:
+                missing_ids[key] = len(categories)
+                categories.append(value)
+            codes[row] = missing_ids[key]
+
+        self.codes = codes.astype(np.int32)
+        self.categories = categories
+
+        # Jetons internés seulement avec un vocabulaire (similarité) ; sans vocabulaire, seuls les codes servent
+        self.token_ids = self.token_indptr = None
+        if vocabulary is not None:
+            token_ids = []
+            indptr = [0]
+            for value in categories:
+                token_ids.extend(vocabulary.intern(token) for token in tokenize_value(value))
+                indptr.append(len(token_ids))
+            self.token_ids = np.asarray(token_ids, dtype=np.int32)
+            self.token_indptr = np.asarray(indptr, dtype=np.int64)
+
+    def __len__(self):
+        return len(self.codes)
+
+    # Identifiants des jetons d'une ligne
+    def row_token_ids(self, row):
+        code = self.codes[row]
+        return self.token_ids[self.token_indptr[code]:self.token_indptr[code + 1]]
+
+    # Jetons d'une ligne (ensemble de chaînes, comme tokenize_value)
+    def row_tokens(self, row):
+        tokens = self.vocabulary.tokens
+        return {tokens[token_id] for token_id in self.row_token_ids(row)}
+
+    # Matrice binaire creuse lignes × vocabulaire, obtenue en indexant la matrice des valeurs distinctes
+    def token_matrix(self):
+        category_matrix = sparse.csr_matrix(
+            (np.ones(len(self.token_ids), dtype=np.float64), self.token_ids, self.token_indptr),
+            shape=(len(self.categories), len(self.vocabulary))
+        )
+        return category_matrix[self.codes]
+
+    # Codes des valeurs en minuscules (str(valeur).lower()) et valeurs distinctes correspondantes
+    def lowered_codes(self):
+        lowered_ids, lowered = pd.factorize(pd.Series([str(value).lower() for value in self.categories], dtype=object))
+        return lowered_ids[self.codes], list(lowered)
+
+
+# Fonction pour encoder plusieurs colonnes d'un DataFrame (jetons internés dans le vocabulaire partagé s'il est fourni)
+def encode_columns(data, columns, vocabulary=None):
+    return {column: EncodedColumn(data[column], vocabulary) for column in dict.fromkeys(columns)}
+
@@ -0,0 +1,266 @@
+import argparse
+import hashlib
+import os
+from collections import Counter
+
+import faiss
+import joblib
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from sklearn.decomposition import TruncatedSVD
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.preprocessing import normalize
+
+from instrumentation import profiled
+from keyword_index import CATEGORY_COLUMNS, CATEGORY_WEIGHTS
+from token_vocabulary import EncodedColumn
+
+# Répertoire par défaut des index vectoriels persistés
+DEFAULT_VECTOR_DIR = os.environ.get("VECTOR_INDEX_DIR", os.path.join(".cache", "vectors"))
+
+# Dimension maximale de chaque catégorie après réduction (SVD)
+CATEGORY_DIMENSION = 64
+
+# Au-delà de ce nombre d'employés, recherche approximative HNSW plutôt qu'exhaustive
+HNSW_THRESHOLD = 200000
+HNSW_NEIGHBORS = 32
+HNSW_EF_SEARCH = 64
+
+_INDEX_FILE = "index.faiss"
+_MODEL_FILE = "model.joblib"
+
+
+# Texte d'une valeur distincte (les valeurs manquantes deviennent un texte vide)
+def _value_text(value):
+    return "" if pd.isna(value) else str(value)
+
+
+class _CategoryEncoder:
+    """
+    Vectorisation d'une catégorie : TF-IDF n-grammes de caractères (robuste aux variantes
+    d'écriture) et TF-IDF de mots, réduits par SVD tronquée puis normalisés (cosinus).
+    """
+
+    def __init__(self, dimension=CATEGORY_DIMENSION):
+        self.dimension = dimension
+        self.char_vectorizer = TfidfVectorizer(analyzer="char_wb", ngram_range=(3, 4), sublinear_tf=True)
+        self.word_vectorizer = TfidfVectorizer(analyzer="word", token_pattern=r"(?u)\b\w[\w+#.]*", sublinear_tf=True)
+        self.svd = None
+        self.output_dimension = 0
+
+    def _tfidf(self, texts):
+        blocks = []
+        for vectorizer in (self.char_vectorizer, self.word_vectorizer):
+            if getattr(vectorizer, "vocabulary_", None):
+                blocks.append(vectorizer.transform(texts))
+        return sparse.hstack(blocks, format="csr")
+
+    def fit(self, texts):
+        for vectorizer in (self.char_vectorizer, self.word_vectorizer):
+            try:
+                vectorizer.fit(texts)
+            except ValueError:
+                # Vocabulaire vide (catégorie sans texte exploitable)
+                vectorizer.vocabulary_ = {}
+        features = sum(len(v.vocabulary_) for v in (self.char_vectorizer, self.word_vectorizer))
+        if features > self.dimension and len(texts) > 1:
+            # Le rang de la matrice ne dépasse pas le nombre de valeurs distinctes
+            components = min(self.dimension, len(texts))
+            self.svd = TruncatedSVD(n_components=components, random_state=0).fit(self._tfidf(texts))
+            self.output_dimension = components
+        else:
+            self.output_dimension = features
+        return self
+
+    def transform(self, texts):
+        if self.output_dimension == 0:
+            return np.zeros((len(texts), 0), dtype=np.float32)
+        matrix = self._tfidf(texts)
+        vectors = self.svd.transform(matrix) if self.svd is not None else matrix.toarray()
+        return normalize(vectors).astype(np.float32)
+
+    # Même vecteur que transform([texte]) à partir des n-grammes déjà comptés du texte (une requête
+    # n'est analysée qu'une fois pour toutes les catégories ; évite le coût fixe de scikit-learn)
+    def transform_counted(self, counted):
+        vector = np.zeros(self.output_dimension, dtype=np.float64)
+        if self.output_dimension == 0:
+            return vector.astype(np.float32)
+        offset = 0
+        for vectorizer, counts in zip((self.char_vectorizer, self.word_vectorizer), counted):
+            vocabulary = vectorizer.vocabulary_
+            if not vocabulary:
+                continue
+            ids = [vocabulary[gram] for gram in counts if gram in vocabulary]
+            if ids:
+                tf = 1 + np.log([counts[gram] for gram in counts if gram in vocabulary])
+                values = tf * vectorizer.idf_[ids]
+                values /= np.sqrt(values @ values)
+                ids = np.asarray(ids) + offset
+                if self.svd is not None:
+                    vector += values @ self.svd.components_[:, ids].T
+                else:
+                    vector[ids] = values
+            offset += len(vocabulary)
+        norm = np.sqrt(vector @ vector)
+        return (vector / norm if norm > 0 else vector).astype(np.float32)
+
+
+class EmployeeVectorIndex:
+    """
+    Index vectoriel des employés pour la correspondance sémantique projet / employés.
+    Chaque catégorie (compétences, activités, éducation, formations) est vectorisée séparément ;
+    les vecteurs sont concaténés et stockés dans un index FAISS produit scalaire. Une requête est
+    vectorisée dans chaque catégorie et pondérée (3/2/1/1 par défaut) : le score d'un employé est
+    la somme pondérée des cosinus par catégorie.
+    """
+
+    def __init__(self, columns=None, dimension=CATEGORY_DIMENSION):
+        self.columns = dict(CATEGORY_COLUMNS, **(columns or {}))
+        self.encoders = {category: _CategoryEncoder(dimension) for category in self.columns}
+        self.index = None
+
+    @property
+    def dimension(self):
+        return sum(encoder.output_dimension for encoder in self.encoders.values())
+
+    def __len__(self):
+        return 0 if self.index is None else self.index.ntotal
+
+    # Vecteurs des lignes d'un DataFrame (vectorisation faite une fois par valeur distincte)
+    def _row_vectors(self, data, fit=False):
+        blocks = []
+        for category, column in self.columns.items():
+            encoded = EncodedColumn(data[column])
+            texts = [_value_text(value) for value in encoded.categories]
+            if fit:
+                self.encoders[category].fit(texts)
+            blocks.append(self.encoders[category].transform(texts)[encoded.codes])
+        return np.ascontiguousarray(np.hstack(blocks), dtype=np.float32)
+
+    def _new_index(self, size):
+        if size > HNSW_THRESHOLD:
+            base = faiss.IndexHNSWFlat(self.dimension, HNSW_NEIGHBORS, faiss.METRIC_INNER_PRODUCT)
+            base.hnsw.efSearch = HNSW_EF_SEARCH
+        else:
+            base = faiss.IndexFlatIP(self.dimension)
+        return faiss.IndexIDMap2(base)
+
+    # Construction : apprentissage des vectoriseurs et indexation de toutes les lignes
+    @profiled("vector_index.build", rows=lambda self, data, *args, **kwargs: len(data))
+    def build(self, data):
+        vectors = self._row_vectors(data, fit=True)
+        self.index = self._new_index(len(data))
+        self.index.add_with_ids(vectors, np.arange(len(data), dtype=np.int64))
+        return self
+
+    # Ajout incrémental de lignes (vectoriseurs inchangés) ; par défaut les identifiants suivent les existants
+    def add(self, data, ids=None):
+        if ids is None:
+            ids = np.arange(len(self), len(self) + len(data), dtype=np.int64)
+        self.index.add_with_ids(self._row_vectors(data), np.asarray(ids, dtype=np.int64))
+        return ids
+
+    # Vecteurs pondérés des requêtes (le même texte est projeté dans chaque catégorie)
+    def _query_vectors(self, texts, weights=None):
+        weights = dict(CATEGORY_WEIGHTS, **(weights or {}))
+        encoder = next(iter(self.encoders.values()))
+        analyzers = (encoder.char_vectorizer.build_analyzer(), encoder.word_vectorizer.build_analyzer())
+        vectors = np.empty((len(texts), self.dimension), dtype=np.float32)
+        for row, text in enumerate(texts):
+            counted = [Counter(analyzer(text)) for analyzer in analyzers]
+            vectors[row] = np.concatenate([
+                self.encoders[category].transform_counted(counted) * np.float32(weights[category])
+                for category in self.columns
+            ])
+        return vectors
+
+    @profiled("vector_index.search", rows=lambda self, texts, *args, **kwargs: len(texts))
+    def search_many(self, texts, top_n=5, weights=None):
+        """
+        k plus proches voisins de plusieurs requêtes en un seul appel FAISS.
+        Retourne une liste de couples (identifiants des lignes, scores), sans les places vides.
+        """
+        if not len(self) or not texts:
+            return [(np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)) for _ in texts]
+        scores, ids = self.index.search(self._query_vectors(list(texts), weights), min(top_n, len(self)))
+        return [(row_ids[row_ids >= 0], row_scores[row_ids >= 0]) for row_ids, row_scores in zip(ids, scores)]
+
+    def search(self, text, top_n=5, weights=None):
+        return self.search_many([text], top_n, weights)[0]
+
+    def save(self, directory):
+        os.makedirs(directory, exist_ok=True)
+        tmp_index = os.path.join(directory, f"{_INDEX_FILE}.{os.getpid()}.tmp")
+        tmp_model = os.path.join(directory, f"{_MODEL_FILE}.{os.getpid()}.tmp")
+        faiss.write_index(self.index, tmp_index)
+        joblib.dump({"columns": self.columns, "encoders": self.encoders}, tmp_model)
+        os.replace(tmp_index, os.path.join(directory, _INDEX_FILE))
+        os.replace(tmp_model, os.path.join(directory, _MODEL_FILE))
+
+    @classmethod
+    def load(cls, directory):
+        model = joblib.load(os.path.join(directory, _MODEL_FILE))
+        vector_index = cls(model["columns"])
+        vector_index.encoders = model["encoders"]
+        vector_index.index = faiss.read_index(os.path.join(directory, _INDEX_FILE))
+        return vector_index
+
+
+# Empreinte du contenu des colonnes indexées d'un jeu de données
+def dataset_key(data, columns=None):
+    columns = list(dict(CATEGORY_COLUMNS, **(columns or {})).values())
+    hashes = pd.util.hash_pandas_object(data[columns].astype(object), index=False).to_numpy()
+    return hashlib.sha256(hashes.tobytes()).hexdigest()[:32]
+
+
+# Chargement de l'index persisté pour un jeu de données, ou construction et sauvegarde
+def load_or_build_vector_index(data, key=None, directory=DEFAULT_VECTOR_DIR):
+    path = os.path.join(directory, key or dataset_key(data))
+    if os.path.exists(os.path.join(path, _INDEX_FILE)):
+        try:
+            return EmployeeVectorIndex.load(path)
+        except Exception:
+            pass
+    vector_index = EmployeeVectorIndex().build(data)
+    try:
+        vector_index.save(path)
+    except OSError:
+        pass
+    return vector_index
+
+
+def main():
+    from project_analysis import load_data
+
+    parser = argparse.ArgumentParser(description="Index vectoriel (TF-IDF + FAISS) des employés.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    build_parser = subparsers.add_parser("build", help="Construire l'index à partir d'un fichier d'employés")
+    build_parser.add_argument("employees", help="Fichier (CSV, TSV, Excel) ou répertoire de classeurs")
+    build_parser.add_argument("index_dir", help="Répertoire de l'index")
+    add_parser = subparsers.add_parser("add", help="Ajouter des employés à un index existant")
+    add_parser.add_argument("employees")
+    add_parser.add_argument("index_dir")
+    query_parser = subparsers.add_parser("query", help="Interroger l'index avec un texte de compétences requises")
+    query_parser.add_argument("index_dir")
+    query_parser.add_argument("text")
+    query_parser.add_argument("-n", "--top-n", type=int, default=5)
+    args = parser.parse_args()
+
+    if args.command == "build":
+        vector_index = EmployeeVectorIndex().build(load_data(args.employees))
+        vector_index.save(args.index_dir)
+        print(f"{len(vector_index)} employé(s) indexé(s), dimension {vector_index.dimension}")
+    elif args.command == "add":
+        vector_index = EmployeeVectorIndex.load(args.index_dir)
+        ids = vector_index.add(load_data(args.employees))
+        vector_index.save(args.index_dir)
+        print(f"{len(ids)} employé(s) ajouté(s), {len(vector_index)} au total")
+    else:
+        ids, scores = EmployeeVectorIndex.load(args.index_dir).search(args.text, args.top_n)
+        for row_id, score in zip(ids, scores):
+            print(f"{row_id}\t{score:.4f}")
+
+
+if __name__ == "__main__":
+    main()